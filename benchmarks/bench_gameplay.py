@@ -0,0 +1,85 @@
+"""
+Benchmarks for the hot paths of `farkle.gameplay`
+
+Run with ``python benchmarks/bench_gameplay.py [--output results.json]`` with
+`farkle` installed.
+"""
+import argparse
+import os
+import random
+import sys
+
+from farkle import Action, Dice, Farkle, RandomFarklePlayer, State
+from farkle.rng import DiceRNG
+
+sys.path.insert(0, os.path.dirname(__file__))
+from harness import measure, run  # noqa: E402
+
+# representative rolls for `enumerate_options`
+DICE_SETS = {
+    "farkle": [2, 2, 3, 4, 6, 6],
+    "singles": [1, 2, 3, 5, 6, 6],
+    "three_pairs": [2, 2, 3, 3, 4, 4],
+    "six_of_a_kind": [1] * 6,
+    "straight": [1, 2, 3, 4, 5, 6],
+    "one_die": [5],
+}
+
+
+def _state(faces, can_roll=0) -> State:
+    s = State(2)
+    s.rolled_dice = [Dice(f) for f in faces]
+    s.can_roll = can_roll
+    return s
+
+
+def benchmarks(scale: float = 1.0):
+    n = int(20_000 * scale)
+    out = {}
+
+    for name, faces in DICE_SETS.items():
+        s = _state(faces)
+        out[f"enumerate_options[{name}]"] = lambda s=s: measure(s.enumerate_options, n)
+    s = _state([2, 3, 5], can_roll=3)
+    out["enumerate_options[can_roll]"] = lambda: measure(s.enumerate_options, n)
+
+    fresh = State(4)
+    rng = DiceRNG(0)
+    out["State.roll"] = lambda: measure(lambda: fresh.roll(rng), n)
+    out["State.roll[global random]"] = lambda: measure(fresh.roll, n)
+
+    rolled = _state([1, 1, 5, 2, 3, 4])
+    play = Action({1: 1}, "1", 100)
+    out["State.play_dice"] = lambda: measure(lambda: rolled.play_dice(play), n)
+
+    scored = _state([5, 2, 3, 4], can_roll=4)
+    scored.turn_sum = 350
+    out["State.end_turn"] = lambda: measure(scored.end_turn, n)
+
+    n_games = max(1, int(20 * scale))
+    for n_players in (2, 4, 8):
+        for method in ("play", "play_fast"):
+            def game(n_players=n_players, method=method):
+                players = [RandomFarklePlayer(seed=i) for i in range(n_players)]
+                return getattr(Farkle(players, rng=1), method)()
+
+            out[f"Farkle.{method}[{n_players} players]"] = (
+                lambda game=game: measure(game, n_games, repeat=3)
+            )
+
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="multiply the number of calls"
+    )
+    args = parser.parse_args()
+    random.seed(0)
+    run(benchmarks(args.scale), args.output)
+
+
+if __name__ == "__main__":
+    main()
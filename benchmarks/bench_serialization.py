@@ -0,0 +1,75 @@
+"""
+Benchmarks for saving and restoring states, dice generators and games
+
+Compares the binary `to_bytes`/`from_bytes` formats with `pickle`, which is
+also what `multiprocessing` uses to send objects between processes. Run with
+``python benchmarks/bench_serialization.py [--output results.json]`` with
+`farkle` installed. Results can be compared with ``benchmarks/compare.py``.
+"""
+import argparse
+import os
+import pickle
+import sys
+
+from farkle import Farkle, RandomFarklePlayer, State
+from farkle.rng import DiceRNG
+from farkle.scoring import ROLL
+
+sys.path.insert(0, os.path.dirname(__file__))
+from harness import measure, run  # noqa: E402
+
+
+def _game() -> Farkle:
+    # a game some turns in, so its history is not empty
+    game = Farkle([RandomFarklePlayer(0), RandomFarklePlayer(1)], rng=0)
+    for _ in range(10):
+        game.step(ROLL)
+        game.player_turn()
+    return game
+
+
+def _pair(out, name, obj, dump, load, n):
+    data = dump(obj)
+    out[f"{name}.dump"] = lambda: {**measure(lambda: dump(obj), n), "size_bytes": len(data)}
+    out[f"{name}.load"] = lambda: measure(lambda: load(data), n)
+
+
+def benchmarks(scale: float = 1.0):
+    n = int(20_000 * scale)
+    out = {}
+
+    state = State(2).roll(DiceRNG(0))
+    state.scores = (1250, 300)
+    _pair(out, "State.to_bytes", state, State.to_bytes, State.from_bytes, n)
+    _pair(out, "State[pickle]", state, pickle.dumps, pickle.loads, n)
+
+    rng = DiceRNG(0)
+    rng.faces(100)
+    _pair(out, "DiceRNG.to_bytes", rng, DiceRNG.to_bytes, DiceRNG.from_bytes, n // 10)
+    _pair(out, "DiceRNG[pickle]", rng, pickle.dumps, pickle.loads, n // 10)
+
+    game = _game()
+    players = game.players
+    _pair(
+        out, "Farkle.to_bytes", game, Farkle.to_bytes,
+        lambda data: Farkle.from_bytes(data, players), n // 10,
+    )
+    _pair(out, "Farkle[pickle]", game, pickle.dumps, pickle.loads, n // 10)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="multiply the number of calls"
+    )
+    args = parser.parse_args()
+    report = run(benchmarks(args.scale), args.output)
+    for name, result in report["benchmarks"].items():
+        if "size_bytes" in result:
+            print(f"{name:<40} {result['size_bytes']:>12,} B")
+
+
+if __name__ == "__main__":
+    main()
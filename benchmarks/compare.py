@@ -0,0 +1,45 @@
+"""
+Compare two benchmark result files written by ``bench_gameplay.py``
+
+Run with ``python benchmarks/compare.py baseline.json new.json``. The exit
+status is 1 if any benchmark lost more than `--threshold` of its throughput.
+"""
+import argparse
+import json
+import sys
+
+
+def compare(baseline: dict, new: dict, threshold: float) -> bool:
+    ok = True
+    for name, old in baseline["benchmarks"].items():
+        if name not in new["benchmarks"]:
+            print(f"{name:<40} missing")
+            continue
+        result = new["benchmarks"][name]
+        change = result["ops_per_sec"] / old["ops_per_sec"] - 1
+        regressed = change < -threshold
+        ok = ok and not regressed
+        print(
+            f"{name:<40} {old['ops_per_sec']:>12,.1f} -> {result['ops_per_sec']:>12,.1f} "
+            f"ops/s ({change:+.1%}) "
+            f"{old['retained_bytes_per_op']:,.0f} -> {result['retained_bytes_per_op']:,.0f} B/op"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("baseline")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    sys.exit(0 if compare(baseline, new, args.threshold) else 1)
+
+
+if __name__ == "__main__":
+    main()
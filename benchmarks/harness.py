@@ -0,0 +1,114 @@
+"""
+A small, dependency free benchmark harness
+
+Each benchmark is a zero argument callable. `measure` reports its throughput,
+the number of blocks and bytes its results keep alive and the peak memory of
+a single call, and `run` collects the results of many benchmarks into a JSON
+document that can be compared across versions with ``benchmarks/compare.py``.
+
+tracemalloc only sees the memory that is held when it is asked, not every
+allocation made and freed in between, so no metric here is an allocation
+count. The peak of a call is the best measure of its short-lived churn.
+"""
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, Optional
+
+import farkle
+
+
+def measure(func: Callable[[], object], number: int, repeat: int = 5) -> Dict[str, float]:
+    """
+    Benchmark `func`
+
+    Parameters
+    ----------
+    func: Callable[[], object]
+        The operation to benchmark
+    number: int
+        The number of calls per timing run
+    repeat: int, default=5
+        The number of timing runs, the fastest is reported
+
+    Returns
+    -------
+    results: Dict[str, float]
+        ``ops_per_sec``: calls per second in the fastest run.
+        ``retained_blocks_per_op``: memory blocks still held per call, and
+        ``retained_bytes_per_op``: their size. Both are summed over the
+        files whose memory grew between a tracemalloc snapshot taken before
+        the calls and one taken after them, with the results of every call
+        kept alive. Blocks freed again before the second snapshot are not
+        seen, `peak_bytes_per_op` covers those.
+        ``peak_bytes_per_op``: the most memory a single call held at once
+        above what was held before it started, the largest over the calls.
+        This is the working memory of one operation, results included
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+
+    # memory is measured separately as tracing slows every allocation down
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot().filter_traces(ignore)
+    # the results are kept so the second snapshot still sees them, so the
+    # peak of each call is taken from the memory held just before it
+    results = []
+    peak = 0
+    for _ in range(number):
+        held, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = func()
+        _, high = tracemalloc.get_traced_memory()
+        peak = max(peak, high - held)
+        results.append(result)
+    del result
+    after = tracemalloc.take_snapshot().filter_traces(ignore)
+    tracemalloc.stop()
+    del results
+
+    grown = [d for d in after.compare_to(before, "filename") if d.size_diff > 0]
+    return {
+        "ops_per_sec": number / best,
+        "retained_blocks_per_op": sum(max(d.count_diff, 0) for d in grown) / number,
+        "retained_bytes_per_op": sum(d.size_diff for d in grown) / number,
+        "peak_bytes_per_op": peak,
+    }
+
+
+def run(
+        benchmarks: Dict[str, Callable[[], Dict[str, float]]], output: Optional[str] = None
+) -> dict:
+    """
+    Run every benchmark and optionally write the results to `output` as JSON
+    """
+    report = {
+        "meta": {
+            "farkle": farkle.__version__,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "benchmarks": {},
+    }
+    for name, bench in benchmarks.items():
+        result = bench()
+        report["benchmarks"][name] = result
+        print(
+            f"{name:<40} {result['ops_per_sec']:>12,.1f} ops/s "
+            f"{result['retained_blocks_per_op']:>8,.1f} blocks/op "
+            f"{result['retained_bytes_per_op']:>10,.1f} B/op "
+            f"{result['peak_bytes_per_op']:>12,} B peak/op"
+        )
+
+    if output is not None:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
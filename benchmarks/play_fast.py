@@ -0,0 +1,36 @@
+"""
+Games per second of `Farkle.play` against the headless `Farkle.play_fast`
+
+Run with ``python benchmarks/play_fast.py`` with `farkle` installed
+"""
+import random
+import time
+
+from farkle import Farkle, RandomFarklePlayer
+
+
+def games_per_second(method: str, n_players=2, n=300, repeat=5) -> float:
+    # best of `repeat` runs over the same seeded games
+    best = float("inf")
+    for _ in range(repeat):
+        random.seed(42)
+        start = time.perf_counter()
+        for _ in range(n):
+            game = Farkle([RandomFarklePlayer() for _ in range(n_players)])
+            getattr(game, method)()
+        best = min(best, time.perf_counter() - start)
+    return n / best
+
+
+def main():
+    for n_players in (2, 4, 8):
+        slow = games_per_second("play", n_players)
+        fast = games_per_second("play_fast", n_players)
+        print(
+            f"{n_players} players: play {slow:,.0f} games/s, "
+            f"play_fast {fast:,.0f} games/s ({fast / slow:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
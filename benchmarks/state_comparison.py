@@ -0,0 +1,138 @@
+"""
+Memory and throughput comparison of the compact `farkle.State` against the
+original deepcopy-based implementation
+
+Run with ``python benchmarks/state_comparison.py`` with `farkle` installed
+"""
+import copy
+import random
+import time
+import tracemalloc
+from typing import Dict, List
+
+from farkle import Action, State
+
+
+class LegacyDice(object):
+    def __init__(self, value=None):
+        self.value = value
+        self.unicode_dice = {
+            1: "\u2680",
+            2: "\u2681",
+            3: "\u2682",
+            4: "\u2683",
+            5: "\u2684",
+            6: "\u2685",
+        }
+        if value is None:
+            self.roll()
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def roll(self):
+        value = random.randint(1, 6)
+        self.value = value
+        return value
+
+
+class LegacyState:
+    """The `State` class as it was before the compact representation"""
+    current_round: int
+    scores: Dict[int, int]
+    can_roll: int
+    rolled_dice: List[LegacyDice]
+    turn_sum: int
+
+    def __init__(self, n_players):
+        self._n_players = n_players
+        self.current_round = 0
+        self.scores = {i: 0 for i in range(self._n_players)}
+        self.can_roll = 6
+        self.rolled_dice = []
+        self.turn_sum = 0
+
+    def __dir__(self):
+        return ["current_round", "scores", "can_roll", "rolled_dice", "turn_sum"]
+
+    @property
+    def __dict__(self) -> dict:
+        return {k: getattr(self, k) for k in dir(self)}
+
+    @__dict__.setter
+    def __dict__(self, val: dict):
+        for (k, v) in val.items():
+            setattr(self, k, copy.deepcopy(v))
+
+    def __copy__(self):
+        out = LegacyState(self._n_players)
+        out.__dict__ = self.__dict__
+        return out
+
+    @property
+    def current_player(self) -> int:
+        return self.current_round % self._n_players
+
+    def end_turn(self, forced=False):
+        out = LegacyState(self._n_players)
+        out.current_round = self.current_round + 1
+        out.scores = copy.deepcopy(self.scores)
+        if not forced:
+            out.scores[self.current_player] += self.turn_sum
+        return out
+
+    def roll(self):
+        out = copy.copy(self)
+        out.rolled_dice = [LegacyDice() for _ in range(self.can_roll)]
+        out.can_roll = 0
+        return out
+
+    def play_dice(self, action):
+        out = copy.copy(self)
+        out.turn_sum += action.value
+        n_played = sum(action.used.values())
+        out.can_roll = len(self.rolled_dice) - n_played
+        if out.can_roll == 0:
+            out.can_roll = 6
+        for k, v in action.used.items():
+            for _ in range(v):
+                out.rolled_dice.remove(LegacyDice(k))
+        return out
+
+
+def _turn(cls, n_players):
+    # one roll, one scored die and the end of the turn: a transition of each kind
+    rolled = cls(n_players).roll()
+    face = rolled.rolled_dice[0].value
+    played = rolled.play_dice(Action({face: 1}, str(face), 0))
+    return played.end_turn()
+
+
+def throughput(cls, n_players=4, n=20_000):
+    random.seed(42)
+    start = time.perf_counter()
+    for _ in range(n):
+        _turn(cls, n_players)
+    return 3 * n / (time.perf_counter() - start)
+
+
+def memory(cls, n_players=4, n=10_000):
+    random.seed(42)
+    tracemalloc.start()
+    states = [cls(n_players).roll() for _ in range(n)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del states
+    return size / n
+
+
+def main():
+    for cls in (LegacyState, State):
+        print(
+            f"{cls.__name__:>12}: {throughput(cls):>10,.0f} transitions/s, "
+            f"{memory(cls):>6,.0f} bytes per rolled state"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,4 +3,8 @@
 __version__ = "0.1.0"
 __author__ = "Spencer Lyon <spencerlyon2@gmail.com>"
 
-from .gameplay import Action, State, Farkle, RandomFarklePlayer, HumanFarklePlayer, Dice
+from .gameplay import (
+    Action, State, Farkle, RandomFarklePlayer, HumanFarklePlayer, ThresholdFarklePlayer, Dice,
+)
+from .scoring import RuleSet, scoring_options
+from .solver import OptimalFarklePlayer
@@ -0,0 +1,320 @@
+"""
+A NumPy engine that plays many independent games of Farkle in lockstep
+
+The games follow exactly the same rules as `farkle.Farkle` with the default
+`RuleSet`, but all of the game state lives in arrays with one row per game,
+every roll in a step is drawn with a single call to the random number
+generator and the scoring options are looked up from a table built from
+`farkle.scoring`.
+
+Actions are indices into `farkle.scoring.ACTIONS`. A vectorized policy is any
+callable ``policy(sim, rows, mask)`` that receives the `BatchFarkle`
+instance, the indices of the games waiting for a decision and a boolean
+legality mask of shape ``(len(rows), len(ACTIONS))`` and returns one action
+index per row.
+
+Games can also be given ids that key their dice: games with the same id roll
+the same faces on the same roll of the same turn, whatever was rolled before,
+so that batches of games played by different policies can be compared on
+common random numbers, like `farkle.rng.CommonDiceRNG` does for `Farkle`.
+"""
+from typing import Callable, Optional
+
+import numpy as np
+
+from .scoring import (
+    ACTIONS, ROLL, STOP, action_index, all_dice_counts, highest_scoring, scoring_options,
+)
+
+N_ACTIONS = len(ACTIONS)
+ROLL_INDEX = action_index(ROLL)
+STOP_INDEX = action_index(STOP)
+
+Policy = Callable[["BatchFarkle", np.ndarray, np.ndarray], np.ndarray]
+
+
+def _build_tables():
+    # multisets are located by treating the counts as a base 7 number
+    ordinal = np.full(7 ** 6, -1, dtype=np.int16)
+    counts = list(all_dice_counts())
+    mask = np.zeros((len(counts), N_ACTIONS), dtype=bool)
+    # the action `threshold_policy` scores with, -1 when none scores
+    best = np.full(len(counts), -1, dtype=np.int64)
+    for i, c in enumerate(counts):
+        ordinal[np.dot(c, _RADIX)] = i
+        for action in scoring_options(c):
+            mask[i, action_index(action)] = True
+        top = highest_scoring(scoring_options(c))
+        if top is not None:
+            best[i] = action_index(top)
+
+    used = np.zeros((N_ACTIONS, 6), dtype=np.int8)
+    value = np.zeros(N_ACTIONS, dtype=np.int64)
+    for i, action in enumerate(ACTIONS):
+        for k, v in action.used.items():
+            used[i, k - 1] = v
+        value[i] = action.value
+
+    return ordinal, mask, used, value, best
+
+
+_RADIX = 7 ** np.arange(6)
+_ORDINAL, _MASK, _USED, _VALUE, _BEST = _build_tables()
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    # the splitmix64 finalizer, wrapping around on overflow
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def keyed_faces(key: int, game: np.ndarray, turn: np.ndarray, roll: np.ndarray) -> np.ndarray:
+    """
+    Six faces, from 0 to 5, for each roll identified by its game id, turn and
+    roll within the turn
+
+    The faces are a hash of `key` and the identifiers, so any roll of any
+    game can be drawn on its own and in any order
+
+    Returns
+    -------
+    faces: np.ndarray
+        An ``(N, 6)`` array of faces
+    """
+    h = np.full(len(game), key, dtype=np.uint64)
+    for part in (game, turn, roll):
+        h = _mix(h + np.asarray(part, dtype=np.uint64) * _GOLDEN)
+    x = _mix(h[:, None] + (np.arange(1, 7, dtype=np.uint64) * _GOLDEN))
+    # the top 32 bits scaled onto the six faces
+    return ((x >> np.uint64(32)) * np.uint64(6) >> np.uint64(32)).astype(np.int64)
+
+
+def legal_mask(
+        dice: np.ndarray, can_roll: np.ndarray, out: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Vectorized version of `State.enumerate_options`
+
+    Parameters
+    ----------
+    dice: np.ndarray
+        An ``(N, 6)`` array of dice counts
+    can_roll: np.ndarray
+        An ``(N,)`` array with the number of dice each game can roll
+    out: Optional[np.ndarray]
+        An ``(N, len(ACTIONS))`` boolean array to write the result into
+
+    Returns
+    -------
+    mask : np.ndarray
+        An ``(N, len(ACTIONS))`` boolean array marking the legal actions. A
+        row with no legal actions is bankrupt.
+    """
+    mask = np.take(_MASK, _ORDINAL[dice @ _RADIX], axis=0, out=out)
+    can = can_roll > 0
+    mask[:, ROLL_INDEX] = can
+    mask[:, STOP_INDEX] = can
+    return mask
+
+
+def random_policy(rng: Optional[np.random.Generator] = None) -> Policy:
+    """
+    A vectorized policy that picks uniformly among the legal actions, like
+    `farkle.RandomFarklePlayer`
+
+    Parameters
+    ----------
+    rng: Optional[np.random.Generator]
+        The generator used to draw choices. A fresh, unseeded one is used
+        when not given
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    def policy(sim: "BatchFarkle", rows: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        cumulative = np.cumsum(mask, axis=1, dtype=np.int8)
+        pick = (rng.random(len(rows)) * cumulative[:, -1]).astype(np.int8)
+        return np.argmax(cumulative > pick[:, None], axis=1)
+
+    return policy
+
+
+def threshold_policy(thresholds) -> Policy:
+    """
+    A vectorized policy that plays like `farkle.ThresholdFarklePlayer`
+
+    The scoring action worth the most is played while there is one, chosen by
+    `farkle.scoring.highest_scoring` as the player does, and the turn is then
+    banked when the turn sum reaches the threshold for the number of dice
+    that could be rolled.
+
+    Parameters
+    ----------
+    thresholds: array_like
+        Six thresholds, for 1 to 6 dice left to roll, or an ``(n_games, 6)``
+        array with the thresholds of every game
+    """
+    table = np.asarray(thresholds, dtype=np.int64)
+    if table.shape[-1:] != (6,) or table.ndim > 2:
+        raise ValueError("Need six thresholds, or six per game")
+
+    def policy(sim: "BatchFarkle", rows: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        best = _BEST[_ORDINAL[sim.dice[rows] @ _RADIX]]
+        limits = table[rows] if table.ndim == 2 else table[None, :]
+        # games without a scoring action always have dice left to roll
+        left = sim.can_roll[rows] - 1
+        stop = sim.turn_sum[rows] >= np.take_along_axis(limits, left[:, None], axis=1)[:, 0]
+        return np.where(best >= 0, best, np.where(stop, STOP_INDEX, ROLL_INDEX))
+
+    return policy
+
+
+class BatchFarkle(object):
+    """
+    Plays `n_games` independent games of Farkle at once
+
+    Parameters
+    ----------
+    n_games: int
+        The number of games to play
+    n_players: int
+        The number of players in each game
+    policies: Policy or list of Policy
+        A single vectorized policy used for every seat, or one per seat
+    points_to_win: int, default=10_000
+        The score needed to end a game
+    seed: Optional[int or np.random.Generator]
+        Seed for the dice
+    game_ids: Optional[np.ndarray]
+        An id for every game. When given, the dice of each roll are a hash of
+        the game id, turn and roll within the turn, see `keyed_faces`, so
+        games with the same id and seed see the same dice. The dice are drawn
+        from `rng` in order when not given
+    """
+
+    def __init__(
+            self,
+            n_games: int,
+            n_players: int,
+            policies,
+            points_to_win: int = 10_000,
+            seed=None,
+            game_ids: Optional[np.ndarray] = None,
+    ):
+        if callable(policies):
+            policies = [policies] * n_players
+        if len(policies) != n_players:
+            raise ValueError("Need one policy per player")
+
+        self.n_games = n_games
+        self.n_players = n_players
+        self.policies = list(policies)
+        self.points_to_win = points_to_win
+        self.rng = np.random.default_rng(seed)
+        if game_ids is not None:
+            game_ids = np.asarray(game_ids, dtype=np.int64)
+            if game_ids.shape != (n_games,):
+                raise ValueError("Need one id per game")
+            self._key = int(self.rng.integers(2 ** 63))
+        self.game_ids = game_ids
+        self.reset()
+
+    def reset(self):
+        n = self.n_games
+        self.scores = np.zeros((n, self.n_players), dtype=np.int64)
+        self.dice = np.zeros((n, 6), dtype=np.int64)
+        self.turn_sum = np.zeros(n, dtype=np.int64)
+        self.can_roll = np.full(n, 6, dtype=np.int64)
+        self.current_round = np.zeros(n, dtype=np.int64)
+        self.done = np.zeros(n, dtype=bool)
+        self._rolls = np.zeros(n, dtype=np.int64)  # rolls so far in the turn
+        # every turn starts with a roll of all six dice
+        self._must_roll = np.ones(n, dtype=bool)
+
+    @property
+    def current_player(self) -> np.ndarray:
+        return self.current_round % self.n_players
+
+    def _roll(self, rows: np.ndarray):
+        n = len(rows)
+        if self.game_ids is None:
+            faces = self.rng.integers(0, 6, size=(n, 6))
+        else:
+            faces = keyed_faces(
+                self._key, self.game_ids[rows], self.current_round[rows], self._rolls[rows]
+            )
+            self._rolls[rows] += 1
+        faces[np.arange(6) >= self.can_roll[rows, None]] = 6  # dice not rolled
+        faces += 7 * np.arange(n)[:, None]
+        counts = np.bincount(faces.ravel(), minlength=7 * n).reshape(n, 7)
+        self.dice[rows] = counts[:, :6]
+        self.can_roll[rows] = 0
+
+    def _end_turn(self, rows: np.ndarray, forced: bool):
+        if not forced:
+            self.scores[rows, self.current_player[rows]] += self.turn_sum[rows]
+        self.current_round[rows] += 1
+        self.turn_sum[rows] = 0
+        self.can_roll[rows] = 6
+        self.dice[rows] = 0
+        self._rolls[rows] = 0
+        self._must_roll[rows] = True
+
+        # the winner is checked once everybody has had their turn in the round
+        finished = rows[self.current_round[rows] % self.n_players == 0]
+        over = (self.scores[finished] >= self.points_to_win).any(axis=1)
+        self.done[finished[over]] = True
+
+    def _play_dice(self, rows: np.ndarray, actions: np.ndarray):
+        self.dice[rows] -= _USED[actions]
+        self.turn_sum[rows] += _VALUE[actions]
+        can_roll = self.dice[rows].sum(axis=1)
+        can_roll[can_roll == 0] = 6
+        self.can_roll[rows] = can_roll
+
+    def step(self):
+        """Advance every unfinished game by one decision"""
+        rolling = np.flatnonzero(self._must_roll & ~self.done)
+        if len(rolling):
+            self._roll(rolling)
+            self._must_roll[rolling] = False
+
+        rows = np.flatnonzero(~self.done)
+        mask = legal_mask(self.dice[rows], self.can_roll[rows])
+        bankrupt = ~mask.any(axis=1)
+        self._end_turn(rows[bankrupt], forced=True)
+        rows, mask = rows[~bankrupt], mask[~bankrupt]
+
+        actions = np.empty(len(rows), dtype=np.int64)
+        player = self.current_player[rows]
+        for p, policy in enumerate(self.policies):
+            seat = player == p
+            if seat.any():
+                actions[seat] = policy(self, rows[seat], mask[seat])
+
+        if not mask[np.arange(len(rows)), actions].all():
+            raise ValueError("A policy chose an illegal action")
+
+        roll = actions == ROLL_INDEX
+        self._must_roll[rows[roll]] = True
+        self._end_turn(rows[actions == STOP_INDEX], forced=False)
+        scoring = ~roll & (actions != STOP_INDEX)
+        self._play_dice(rows[scoring], actions[scoring])
+
+    def play(self) -> np.ndarray:
+        """
+        Play every game to the end
+
+        Returns
+        -------
+        winners : np.ndarray
+            An ``(n_games, n_players)`` boolean array marking the players that
+            reached `points_to_win`, matching the dict returned by
+            `Farkle.play`
+        """
+        while not self.done.all():
+            self.step()
+        return self.scores >= self.points_to_win
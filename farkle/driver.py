@@ -0,0 +1,59 @@
+"""
+Play many `Farkle` games at once with batched decisions
+
+Every game is advanced until its next decision. All pending decisions that
+belong to the same player object are then handed to that player's
+`FarklePlayer.act_batch` in a single call, so a model shared across
+hundreds of games runs one inference per round of decisions instead of one
+per decision.
+"""
+from typing import Dict, List
+
+from .gameplay import Farkle
+
+
+def play_batched(games: List[Farkle]) -> List[Dict[int, bool]]:
+    """
+    Play every game in `games` to the end
+
+    Parameters
+    ----------
+    games: List[Farkle]
+        The games to play. Players may be shared between games and seats
+
+    Returns
+    -------
+    winners: List[Dict[int, bool]]
+        The result of each game, as returned by `Farkle.play`
+    """
+    results: List[Dict[int, bool]] = [{} for _ in games]
+    generators = [game.decisions() for game in games]
+
+    # game index -> (player_num, state, choices)
+    pending = {}
+    for i, gen in enumerate(generators):
+        try:
+            pending[i] = next(gen)
+        except StopIteration as stop:
+            results[i] = stop.value
+
+    while pending:
+        # group the decisions by the player object that has to make them
+        groups: Dict[int, List[int]] = {}
+        for i, (player_num, _, _) in pending.items():
+            groups.setdefault(id(games[i].players[player_num]), []).append(i)
+
+        for indices in groups.values():
+            first = indices[0]
+            player = games[first].players[pending[first][0]]
+            actions = player.act_batch(
+                [pending[i][1] for i in indices], [pending[i][2] for i in indices]
+            )
+            for i, action in zip(indices, actions):
+                try:
+                    pending[i] = generators[i].send(action)
+                except StopIteration as stop:
+                    results[i] = stop.value
+                    del pending[i]
+
+    return results
@@ -0,0 +1,177 @@
+"""
+Encode states as fixed width feature vectors for learned players
+
+A `StateEncoder` writes the features of a `State` straight into a NumPy
+buffer the caller allocated once, and encodes a list of states with a few
+vectorized assignments rather than one per state. Every row holds, as
+``float32``:
+
+* ``dice``: 42 one-hot values, 7 per face for 0 to 6 dice showing it
+* ``scores``: the score of every seat divided by `points_to_win`, starting
+  with the player to act and going on in seat order
+* ``turn_sum``: the points at stake divided by `points_to_win`
+* ``can_roll``: the number of dice that can be rolled divided by 6
+
+`StateEncoder.layout` maps each name to its slice of the row.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .gameplay import State
+from .scoring import all_dice_counts
+
+# counts from 0 to 6 for each face
+_DICE_FEATURES = 6 * 7
+
+
+def _one_hot_dice() -> Tuple[Dict[tuple, int], np.ndarray]:
+    # a row of one-hot features for every possible dice counts tuple
+    counts = list(all_dice_counts())
+    table = np.zeros((len(counts), _DICE_FEATURES), dtype=np.float32)
+    for row, c in zip(table, counts):
+        row[np.arange(6) * 7 + c] = 1
+    return {c: i for i, c in enumerate(counts)}, table
+
+
+class StateEncoder(object):
+    """
+    Parameters
+    ----------
+    n_players: int
+        The number of seats of the games to encode
+    points_to_win: int, default=10_000
+        Scores and turn sums are divided by it
+    cache_size: int, default=0
+        Keep the rows of up to this many states and copy them out when the
+        same state comes again in `encode`. States are keyed on the scores
+        seen from the seat to act and `State.turn_key`, which is all the row
+        depends on, so states that look the same from that seat share a row.
+        No cache when 0
+
+    Attributes
+    ----------
+    size: int
+        The number of features of a row
+    layout: Dict[str, slice]
+        The slice of a row holding each feature
+    """
+
+    def __init__(self, n_players: int, points_to_win: int = 10_000, cache_size: int = 0):
+        self.n_players = n_players
+        self.points_to_win = points_to_win
+        self.cache_size = cache_size
+        scores = _DICE_FEATURES + n_players
+        self.layout = {
+            "dice": slice(0, _DICE_FEATURES),
+            "scores": slice(_DICE_FEATURES, scores),
+            "turn_sum": slice(scores, scores + 1),
+            "can_roll": slice(scores + 1, scores + 2),
+        }
+        self.size = scores + 2
+        self._dice_index, self._dice_table = _one_hot_dice()
+        self._scale = 1 / points_to_win
+        self._cache: Dict[tuple, np.ndarray] = {}
+
+    def empty(self, n: Optional[int] = None) -> np.ndarray:
+        """A buffer for one row, or for `n` rows"""
+        shape = (self.size,) if n is None else (n, self.size)
+        return np.empty(shape, dtype=np.float32)
+
+    def _relative_scores(self, state: State) -> Tuple[int, ...]:
+        scores = state.scores
+        player = state.current_round % self.n_players
+        return scores[player:] + scores[:player]
+
+    def _tail(self, scores: Tuple[int, ...], state: State) -> List[float]:
+        # the features after the dice
+        scale = self._scale
+        out = [s * scale for s in scores]
+        out.append(state.turn_sum * scale)
+        out.append(state.can_roll / 6)
+        return out
+
+    def encode(self, state: State, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Encode one state
+
+        Parameters
+        ----------
+        state: State
+            The state to encode
+        out: Optional[np.ndarray]
+            A ``float32`` buffer of `size` values to write to. A new one is
+            allocated when not given
+
+        Returns
+        -------
+        row: np.ndarray
+            `out`, holding the features
+        """
+        if out is None:
+            out = self.empty()
+        scores = self._relative_scores(state)
+        if self.cache_size:
+            key = (scores, state.turn_key())
+            row = self._cache.get(key)
+            if row is not None:
+                out[:] = row
+                return out
+
+        out[:_DICE_FEATURES] = self._dice_table[self._dice_index[state.dice_counts]]
+        out[_DICE_FEATURES:] = self._tail(scores, state)
+
+        if self.cache_size:
+            if len(self._cache) >= self.cache_size:
+                # drop the oldest entry
+                del self._cache[next(iter(self._cache))]
+            self._cache[key] = out.copy()
+        return out
+
+    def encode_batch(
+            self, states: Sequence[State], out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Encode many states at once
+
+        Parameters
+        ----------
+        states: Sequence[State]
+            The states to encode, all with `n_players` seats
+        out: Optional[np.ndarray]
+            A ``float32`` buffer of at least ``len(states)`` rows of `size`
+            values. A new one is allocated when not given
+
+        Returns
+        -------
+        rows: np.ndarray
+            The first ``len(states)`` rows of `out`, one per state
+        """
+        n = len(states)
+        if out is None:
+            out = self.empty(n)
+        elif out.shape[0] < n or out.shape[1:] != (self.size,):
+            raise ValueError(f"Need a buffer of at least {n} rows of {self.size} values")
+        out = out[:n]
+
+        index = self._dice_index
+        columns = np.array(
+            [(index[s.dice_counts], s.current_round, s.turn_sum, s.can_roll) for s in states],
+            dtype=np.int64,
+        ).reshape(n, 4)
+        scores = np.array([s.scores for s in states], dtype=np.int64).reshape(n, -1)
+        seats = (columns[:, 1:2] + np.arange(self.n_players)) % self.n_players
+
+        # scaled in double precision like `encode`, so the rows come out the same
+        tail = np.empty((n, self.n_players + 2))
+        tail[:, :-2] = np.take_along_axis(scores, seats, axis=1)
+        tail[:, -2] = columns[:, 2]
+        tail[:, :-1] *= self._scale
+        tail[:, -1] = columns[:, 3] / 6
+        np.take(self._dice_table, columns[:, 0], axis=0, out=out[:, :_DICE_FEATURES])
+        out[:, _DICE_FEATURES:] = tail
+        return out
+
+    def clear_cache(self):
+        """Forget the cached rows"""
+        self._cache.clear()
@@ -0,0 +1,175 @@
+"""
+A vectorized, gym-style reinforcement learning environment over `Farkle`
+games played with the default `RuleSet`
+
+The learning agent plays one seat in each of `n_envs` independent games and
+the other seats are played by ordinary `FarklePlayer` objects. Actions are
+indices into the fixed action space `farkle.scoring.ACTIONS`, and every step
+comes with a boolean mask of the legal actions in each game.
+
+Observations, masks, rewards and done flags are written into buffers that are
+allocated once and returned from every call to `reset` and `step`, so copy
+them if they need to outlive the next step. Each observation row holds:
+
+* the score of every seat
+* the turn sum
+* the number of dice that can be rolled
+* the number of rolled dice showing each face
+"""
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .batch import N_ACTIONS, legal_mask
+from .gameplay import Farkle, FarklePlayer, RandomFarklePlayer
+from .rng import DiceRNG
+from .scoring import ACTIONS
+
+
+class FarkleVectorEnv(object):
+    """
+    Parameters
+    ----------
+    n_envs: int
+        The number of games played side by side
+    n_players: int, default=2
+        The number of seats in each game
+    agent_seat: int, default=0
+        The seat played by the agent
+    opponents: Optional[Sequence[FarklePlayer]]
+        The players of the other seats, in seat order. They are shared by all
+        games. `RandomFarklePlayer`s seeded from `seed` are used when not
+        given
+    points_to_win: int, default=10_000
+        Passed on to `Farkle`
+    seed: Optional[int]
+        Seeds the dice of every game and the default opponents. Drawn from
+        the module level `random` generator when not given, like `DiceRNG`
+
+    Attributes
+    ----------
+    observation_size: int
+        The length of an observation row
+    n_actions: int
+        The size of the action space
+    """
+
+    def __init__(
+            self,
+            n_envs: int,
+            n_players: int = 2,
+            agent_seat: int = 0,
+            opponents: Optional[Sequence[FarklePlayer]] = None,
+            points_to_win: int = 10_000,
+            seed: Optional[int] = None,
+    ):
+        root = DiceRNG(seed)
+        if opponents is None:
+            opponents = [RandomFarklePlayer(root.seed + 1 + i) for i in range(n_players - 1)]
+        if len(opponents) != n_players - 1:
+            raise ValueError("Need one opponent per seat besides the agent's")
+
+        self.n_envs = n_envs
+        self.n_players = n_players
+        self.agent_seat = agent_seat
+        self.observation_size = n_players + 8
+        self.n_actions = N_ACTIONS
+
+        # the agent's seat is never asked to act by the game itself
+        players: List[Optional[FarklePlayer]] = list(opponents)
+        players.insert(agent_seat, None)
+        rngs = root.spawn(n_envs)
+        self.games = [Farkle(players, points_to_win, rng=rng) for rng in rngs]
+        self._decisions = [None] * n_envs
+        self._last_score = np.zeros(n_envs, dtype=np.int64)
+
+        self._obs = np.zeros((n_envs, self.observation_size), dtype=np.float32)
+        self._mask = np.zeros((n_envs, N_ACTIONS), dtype=bool)
+        self._reward = np.zeros(n_envs, dtype=np.float32)
+        self._done = np.zeros(n_envs, dtype=bool)
+        self._dice = np.zeros((n_envs, 6), dtype=np.int64)
+        self._can_roll = np.zeros(n_envs, dtype=np.int64)
+        self._rows = np.arange(n_envs)
+
+    def _advance(self, i: int, action=None) -> bool:
+        # play game `i` until the agent has to act, returns whether it ended
+        game = self.games[i]
+        gen = self._decisions[i]
+        try:
+            decision = next(gen) if action is None else gen.send(action)
+            while decision[0] != self.agent_seat:
+                player_num, state, choices = decision
+                decision = gen.send(game.players[player_num].act(state, choices))
+        except StopIteration:
+            return True
+
+        state = decision[1]
+        row = self._obs[i]
+        row[:self.n_players] = state.scores
+        row[self.n_players] = state.turn_sum
+        row[self.n_players + 1] = state.can_roll
+        row[self.n_players + 2:] = state.dice_counts
+        self._dice[i] = state.dice_counts
+        self._can_roll[i] = state.can_roll
+        return False
+
+    def _start(self, i: int):
+        # a game can end before the agent gets a decision, when its turns
+        # all go bankrupt on the first roll, so start over until it gets one
+        while True:
+            self.games[i].reset()
+            self._decisions[i] = self.games[i].decisions()
+            self._last_score[i] = 0
+            if not self._advance(i):
+                return
+
+    def reset(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Start a new game in every environment
+
+        Returns
+        -------
+        obs, mask: Tuple[np.ndarray, np.ndarray]
+            The ``(n_envs, observation_size)`` observations and the
+            ``(n_envs, n_actions)`` legal action masks
+        """
+        for i in range(self.n_envs):
+            self._start(i)
+        legal_mask(self._dice, self._can_roll, out=self._mask)
+        return self._obs, self._mask
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Play one action in every environment
+
+        Finished games are restarted straight away, so the returned
+        observation of a done environment is the first one of its next game.
+
+        Parameters
+        ----------
+        actions: np.ndarray
+            One index into `farkle.scoring.ACTIONS` per environment
+
+        Returns
+        -------
+        obs, mask, reward, done: Tuple[np.ndarray, ...]
+            The observations and legal action masks for the next decision,
+            the points the agent banked since its previous decision and
+            whether the game ended
+        """
+        actions = np.asarray(actions)
+        if not self._mask[self._rows, actions].all():
+            raise ValueError("An action is not legal in its environment")
+
+        seat = self.agent_seat
+        for i in range(self.n_envs):
+            done = self._advance(i, ACTIONS[actions[i]])
+            score = self.games[i].state.scores[seat]
+            self._reward[i] = score - self._last_score[i]
+            self._last_score[i] = score
+            self._done[i] = done
+            if done:
+                self._start(i)
+
+        legal_mask(self._dice, self._can_roll, out=self._mask)
+        return self._obs, self._mask, self._reward, self._done
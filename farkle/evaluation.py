@@ -0,0 +1,335 @@
+"""
+Compare players with as few games as the evidence allows
+
+Games are played in pairs: the same dice, from a `CommonDiceRNG` keyed by
+turn and roll, are rolled once with the first player in the first seat and
+once with the seats swapped. This cancels the first player advantage and most
+of the luck of the dice, so each pair says more than two independent games.
+`common_random_games` plays any number of seatings on the same dice in the
+same way, for paired comparisons with `paired_difference`.
+
+`sprt` plays pairs until a sequential probability ratio test can tell
+whether one player beats the other at a given win rate, and `League` keeps
+Elo ratings for many players and picks the next match where the outcome is
+the least certain.
+"""
+import math
+import random
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .gameplay import Farkle, FarklePlayer
+from .rng import CommonDiceRNG
+
+PlayerFactory = Callable[[], FarklePlayer]
+
+
+def play_pair(
+        first: PlayerFactory,
+        second: PlayerFactory,
+        seed: int,
+        pair: int = 0,
+        points_to_win: int = 10_000,
+) -> Tuple[float, float]:
+    """
+    Play `first` against `second` from both seats with the same dice
+
+    Both games roll from ``CommonDiceRNG(seed, spawn_key=(pair,))``, so the
+    first player rolls in the second game the dice the second player rolled
+    in the first
+
+    Returns
+    -------
+    scores: Tuple[float, float]
+        The score of `first` in each game: 1 for a win, 0.5 for a tie and 0
+        for a loss
+    """
+    out = []
+    for seat, seats in enumerate(((first, second), (second, first))):
+        rng = CommonDiceRNG(seed, spawn_key=(pair,))
+        game = Farkle([f() for f in seats], points_to_win, rng=rng)
+        game.play_fast()
+        mine, theirs = game.state.scores[seat], game.state.scores[1 - seat]
+        out.append(1.0 if mine > theirs else 0.5 if mine == theirs else 0.0)
+    return out[0], out[1]
+
+
+def common_random_games(
+        configurations: Sequence[Sequence[PlayerFactory]],
+        n_games: int,
+        seed: Optional[int] = None,
+        points_to_win: int = 10_000,
+        start: int = 0,
+) -> List[List[Tuple[int, ...]]]:
+    """
+    Play every configuration of players on the same dice
+
+    Game ``g`` of every configuration rolls from
+    ``CommonDiceRNG(seed, spawn_key=(g,))``, so all configurations see the
+    same faces on the same roll of the same turn, and the differences between
+    their results come from the players rather than the dice.
+
+    Parameters
+    ----------
+    configurations: Sequence[Sequence[PlayerFactory]]
+        The seatings to compare, each a player factory per seat
+    n_games: int
+        The number of games each configuration plays
+    seed: Optional[int]
+        Seeds the dice. A random seed is chosen if not given
+    points_to_win: int, default=10_000
+        Passed on to `Farkle`
+    start: int, default=0
+        The number of the first game, to continue an earlier run
+
+    Returns
+    -------
+    scores: List[List[Tuple[int, ...]]]
+        The final scores of every game, one list per configuration
+    """
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    out: List[List[Tuple[int, ...]]] = [[] for _ in configurations]
+    for g in range(start, start + n_games):
+        for scores, factories in zip(out, configurations):
+            rng = CommonDiceRNG(seed, spawn_key=(g,))
+            game = Farkle([f() for f in factories], points_to_win, rng=rng)
+            game.play_fast()
+            scores.append(game.state.scores)
+    return out
+
+
+def paired_difference(
+        a: Sequence[Tuple[int, ...]], b: Sequence[Tuple[int, ...]], seat: int = 0
+) -> Tuple[float, float]:
+    """
+    The difference in the win rate of `seat` between two configurations
+
+    Parameters
+    ----------
+    a, b: Sequence[Tuple[int, ...]]
+        The final scores of the same games, as returned per configuration by
+        `common_random_games`
+    seat: int, default=0
+        The seat to compare. A tie for the best score counts as half a win
+
+    Returns
+    -------
+    difference: float
+        The mean of the win of `seat` in `a` minus its win in `b`
+    standard_error: float
+        The standard error of the mean, from the paired differences
+    """
+    if len(a) != len(b) or len(a) < 2:
+        raise ValueError("Need the scores of the same two or more games")
+
+    def won(final):
+        best = max(final)
+        return 0.0 if final[seat] < best else 1.0 / final.count(best)
+
+    diffs = [won(x) - won(y) for x, y in zip(a, b)]
+    n = len(diffs)
+    mean = sum(diffs) / n
+    variance = sum((d - mean) ** 2 for d in diffs) / (n - 1)
+    return mean, math.sqrt(variance / n)
+
+
+class SPRTResult(NamedTuple):
+    """
+    Attributes
+    ----------
+    decision: Optional[str]
+        ``"H1"`` when the first player wins at the rate `p1`, ``"H0"`` when it
+        wins at the rate `p0`, ``None`` when `max_games` ran out first
+    llr: float
+        The final log likelihood ratio of H1 against H0
+    n_games: int
+        The number of games played
+    score: float
+        The share of the points won by the first player
+    """
+    decision: Optional[str]
+    llr: float
+    n_games: int
+    score: float
+
+
+def _pentanomial_llr(counts: List[int], p0: float, p1: float) -> float:
+    # the normal approximation of the GSPRT on pair scores. The variance
+    # also counts one pair of every score, which keeps it from collapsing to
+    # zero after a few equal pairs and fades as pairs are played
+    n = sum(counts)
+    scores = (0.0, 0.25, 0.5, 0.75, 1.0)
+    mean = sum(c * x for c, x in zip(counts, scores)) / n
+    var = sum((c + 1) * (x - mean) ** 2 for c, x in zip(counts, scores)) / (n + 5)
+    return n * (p1 - p0) * (2 * mean - p0 - p1) / (2 * var)
+
+
+def sprt(
+        first: PlayerFactory,
+        second: PlayerFactory,
+        p0: float = 0.5,
+        p1: float = 0.55,
+        alpha: float = 0.05,
+        beta: float = 0.05,
+        max_games: int = 100_000,
+        points_to_win: int = 10_000,
+        seed: Optional[int] = None,
+) -> SPRTResult:
+    """
+    Test whether `first` wins at rate `p1` rather than `p0` against `second`
+
+    Games are played in seat swapped pairs, see `play_pair`. The two games
+    of a pair share their dice and are far from independent, so the pair is
+    the trial: its score, the mean of its two games, takes one of five
+    values, and the log likelihood ratio of the generalized SPRT is that of
+    a normal model with the mean and variance of these pentanomial
+    frequencies, as chess engine testers use. The test stops as soon as it
+    leaves the Wald bounds. A tie counts as half a win.
+
+    Parameters
+    ----------
+    first, second: PlayerFactory
+        Zero argument callables that build a fresh player
+    p0, p1: float, default=0.5, 0.55
+        The expected scores per game of the null and the alternative
+        hypothesis
+    alpha, beta: float, default=0.05
+        The accepted chances of deciding H1 when H0 holds and the reverse
+    max_games: int, default=100_000
+        Give up without a decision after this many games
+    points_to_win: int, default=10_000
+        Passed on to `Farkle`
+    seed: Optional[int]
+        Seeds the dice. A random seed is chosen if not given
+
+    Returns
+    -------
+    result: SPRTResult
+    """
+    if not 0 < p0 < p1 < 1:
+        raise ValueError("Need 0 < p0 < p1 < 1")
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    lower = math.log(beta / (1 - alpha))
+    upper = math.log((1 - beta) / alpha)
+
+    # the number of pairs scoring 0, 0.25, 0.5, 0.75 and 1
+    counts = [0] * 5
+    llr = 0.0
+    points = 0.0
+    n_games = 0
+    while n_games < max_games:
+        pair = sum(play_pair(first, second, seed, n_games // 2, points_to_win))
+        counts[int(pair * 2)] += 1
+        points += pair
+        n_games += 2
+        llr = _pentanomial_llr(counts, p0, p1)
+        if llr >= upper:
+            return SPRTResult("H1", llr, n_games, points / n_games)
+        if llr <= lower:
+            return SPRTResult("H0", llr, n_games, points / n_games)
+    return SPRTResult(None, llr, n_games, points / max(n_games, 1))
+
+
+def expected_score(rating: float, other: float) -> float:
+    """The Elo expected score of a player rated `rating` against `other`"""
+    return 1 / (1 + 10 ** ((other - rating) / 400))
+
+
+class League(object):
+    """
+    Elo ratings for a pool of players, updated from seat swapped pairs
+
+    Parameters
+    ----------
+    players: Dict[str, PlayerFactory]
+        The players of the league by name
+    k: float, default=16.0
+        The Elo update step per game
+    points_to_win: int, default=10_000
+        Passed on to `Farkle`
+    seed: Optional[int]
+        Seeds the dice. A random seed is chosen if not given
+
+    Attributes
+    ----------
+    ratings: Dict[str, float]
+        The current rating of every player, starting at 1500
+    games: Dict[Tuple[str, str], int]
+        The number of games played between each pair of players, keyed by
+        the names in the order of `players`. `play` and `information` take
+        the two names in either order
+    """
+
+    def __init__(
+            self,
+            players: Dict[str, PlayerFactory],
+            k: float = 16.0,
+            points_to_win: int = 10_000,
+            seed: Optional[int] = None,
+    ):
+        if len(players) < 2:
+            raise ValueError("A league needs at least two players")
+        self.players = dict(players)
+        self.k = k
+        self.points_to_win = points_to_win
+        self.seed = random.SystemRandom().getrandbits(64) if seed is None else seed
+        self.ratings = {name: 1500.0 for name in players}
+        names = list(players)
+        self.games = {
+            (a, b): 0 for i, a in enumerate(names) for b in names[i + 1:]
+        }
+        self._order = {name: i for i, name in enumerate(names)}
+        self._n_pairs = 0
+
+    def _pair(self, a: str, b: str) -> Tuple[str, str]:
+        # the key of `games` for the two players, in either order
+        if a == b or a not in self._order or b not in self._order:
+            raise ValueError(f"Not a pair of players in the league: {a!r}, {b!r}")
+        return (a, b) if self._order[a] < self._order[b] else (b, a)
+
+    def information(self, a: str, b: str) -> float:
+        """
+        How much a pair of games between `a` and `b` is expected to tell
+
+        The variance of the outcome, which is largest between evenly rated
+        players, discounted by the number of games the two already played
+        """
+        pair = self._pair(a, b)
+        p = expected_score(self.ratings[a], self.ratings[b])
+        return p * (1 - p) / math.sqrt(1 + self.games[pair])
+
+    def next_match(self) -> Tuple[str, str]:
+        """The pair of players whose next match is the most informative"""
+        return max(self.games, key=lambda pair: self.information(*pair))
+
+    def play(self, a: str, b: str) -> Tuple[float, float]:
+        """Play a seat swapped pair between `a` and `b` and update the ratings"""
+        pair = self._pair(a, b)
+        scores = play_pair(
+            self.players[a], self.players[b], self.seed, self._n_pairs, self.points_to_win
+        )
+        self._n_pairs += 1
+        for score in scores:
+            change = self.k * (score - expected_score(self.ratings[a], self.ratings[b]))
+            self.ratings[a] += change
+            self.ratings[b] -= change
+        self.games[pair] += 2
+        return scores
+
+    def run(self, n_pairs: int) -> Dict[str, float]:
+        """
+        Play `n_pairs` of the most informative matches, one after another
+
+        Returns
+        -------
+        ratings: Dict[str, float]
+            The ratings after the last match
+        """
+        for _ in range(n_pairs):
+            self.play(*self.next_match())
+        return self.ratings
+
+    def standings(self) -> List[Tuple[str, float]]:
+        """The players and their ratings, best first"""
+        return sorted(self.ratings.items(), key=lambda item: -item[1])
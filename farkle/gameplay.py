@@ -1,21 +1,18 @@
 import abc
-import copy
-from collections import Counter
+import json
 import random
+import struct
 import time
-from typing import Dict, List, Tuple, NamedTuple, Optional
+from numbers import Integral
+from typing import Dict, Generator, List, Sequence, Tuple, Optional, Union
 
-
-class Action(NamedTuple):
-    used: Dict[int, int]
-    name: str
-    value: int
-
-    def __str__(self):
-        if self.name.lower() in ["roll", "stop"]:
-            return self.name
-        else:
-            return f"Play {self.name} to score {self.value}"
+from .instrument import Instrumentation, action_type
+from .rng import DiceRNG
+from .scoring import (
+    Action, BANKRUPT, DEFAULT_RULES, DiceCounts, ROLL, RuleSet, STOP, _rule_set, highest_scoring,
+    play_counts,
+)
+from .trajectory import Trajectory
 
 
 class Dice(object):
@@ -25,72 +22,187 @@ class Dice(object):
 
     The dice can take the values 1, 2, 3, 4, 5, 6
 
-    The dice keeps track of the most recently rolled value in the
-    `value` property. This value is `None` until the dice is rolled.
+    Dice are immutable flyweights: there is exactly one instance per face,
+    so `Dice(3) is Dice(3)`, and `Dice()` returns the instance of a randomly
+    rolled face. The glyphs used to print them are shared by the class.
 
     Methods
     -------
     roll :
-        Rolls the dice and gives a random integer
+        Rolls a dice and gives the instance for the rolled face
     """
+    __slots__ = ("value",)
 
-    def __init__(self, value: Optional[int] = None):
-        self.value = value
-        self.unicode_dice = {
-            1: "\u2680",
-            2: "\u2681",
-            3: "\u2682",
-            4: "\u2683",
-            5: "\u2684",
-            6: "\u2685",
-        }
+    value: int
+    unicode_dice = {
+        1: "\u2680",
+        2: "\u2681",
+        3: "\u2682",
+        4: "\u2683",
+        5: "\u2684",
+        6: "\u2685",
+    }
+
+    def __new__(cls, value: Optional[int] = None):
         if value is None:
-            self.roll()
+            value = random.randint(1, 6)
+        try:
+            return _DICE_BY_VALUE[value]
+        except KeyError:
+            raise ValueError(f"A dice can not show {value}") from None
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Dice are immutable")
 
     def __eq__(self, other: "Dice"):
         return self.value == other.value
 
-    def __repr__(self):
-        if self.value is None:
-            msg = "The dice has not been rolled"
-        else:
-            msg = f"{self.unicode_dice[self.value]}"
+    def __hash__(self):
+        return self.value
 
-        return msg
+    def __reduce__(self):
+        return Dice, (self.value,)
 
-    def roll(self):
+    def __repr__(self):
+        return self.unicode_dice[self.value]
+
+    def roll(self, rng: Optional[DiceRNG] = None) -> "Dice":
         """
-        Rolls the dice and reset the current value
+        Rolls a dice
+
+        Parameters
+        ----------
+        rng: Optional[DiceRNG]
+            The source of the roll. The module level `random` generator is
+            used when not given
 
         Returns
         -------
-        value : int
-            The number rolled by the dice
+        dice : Dice
+            The shared instance for the number rolled
         """
-        value = random.randint(1, 6)
-        self.value = value
+        if rng is None:
+            return Dice()
+        return _DICE[rng.faces(1)[0] - 1]
+
+
+def _make_dice(value: int) -> Dice:
+    out = object.__new__(Dice)
+    object.__setattr__(out, "value", value)
+    return out
+
+
+_DICE: Tuple[Dice, ...] = tuple(_make_dice(value) for value in range(1, 7))
+_DICE_BY_VALUE: Dict[int, Dice] = {d.value: d for d in _DICE}
+
 
-        return value
+_NO_DICE: DiceCounts = (0,) * 6
+
+# n_players, current_round, can_roll, dice, turn_sum, size of the rules,
+# followed by the scores and the rules
+_STATE = struct.Struct("<HIB6BIH")
+
+
+# (dice counts, can_roll, turn_sum)
+TurnKey = Tuple[DiceCounts, int, int]
+# (n_players, current_round, scores, can_roll, dice counts, turn_sum, rules)
+StateKey = Tuple[int, int, Tuple[int, ...], int, DiceCounts, int, RuleSet]
+
+
+def _may_stop(rules: RuleSet, turn_sum: int, score: int) -> bool:
+    # players without points may have to reach an opening score
+    return not rules.min_opening_score or turn_sum >= rules.min_opening_score or score > 0
+
+
+def _pack_rules(rules: RuleSet) -> bytes:
+    # the default rules, by far the most common, take no space
+    return b"" if rules is DEFAULT_RULES else json.dumps(rules.params()).encode()
+
+
+def _unpack_rules(data) -> RuleSet:
+    return _rule_set(json.loads(bytes(data))) if len(data) else DEFAULT_RULES
+
+
+# magic, version, points_to_win, sizes of the state, rng and history
+_GAME = struct.Struct("<4sBqIII")
+_GAME_MAGIC = b"FKGM"
+_GAME_VERSION = 1
+
+
+def _count_dice(dice: List[Dice]) -> DiceCounts:
+    counts = [0] * 6
+    for d in dice:
+        counts[d.value - 1] += 1
+    return tuple(counts)
 
 
 class State:
+    """
+    A compact, slotted snapshot of a Farkle game
+
+    The scores are held in a tuple with one entry per player and the rolled
+    dice are held as a 6 slot count vector (see `farkle.scoring`), so the
+    transition methods (`roll`, `play_dice` and `end_turn`) build the new
+    state directly without copying any containers. States are treated as
+    values: the transition methods never modify `self`.
+
+    `rolled_dice` and `scores` may still be assigned to, which is convenient
+    when setting up a state by hand. As states can change, they are not
+    hashable. Caches key them on `key` or, for what only matters to the rest
+    of the turn, on `turn_key`.
+
+    Parameters
+    ----------
+    n_players: int
+        The number of players
+    rules: Optional[RuleSet]
+        The scoring rules of the game, `farkle.scoring.DEFAULT_RULES` when
+        not given. They are passed on to every following state
+    """
+    __slots__ = (
+        "_n_players", "current_round", "_scores", "can_roll", "_dice", "turn_sum", "_rules"
+    )
+
     # public game state
     current_round: int
-    scores: Dict[int, int]
     can_roll: int
-    rolled_dice: List[Dice]
     turn_sum: int
 
     # internal state
     _n_players: int
+    _scores: Tuple[int, ...]
+    _dice: DiceCounts
+    _rules: RuleSet
 
-    def __init__(self, n_players):
+    def __init__(self, n_players, rules: Optional[RuleSet] = None):
         self._n_players = n_players
         self.current_round = 0
-        self.scores = {i: 0 for i in range(self._n_players)}
+        self._scores = (0,) * n_players
         self.can_roll = 6
-        self.rolled_dice = []
+        self._dice = _NO_DICE
         self.turn_sum = 0
+        self._rules = DEFAULT_RULES if rules is None else rules
+
+    @classmethod
+    def _make(
+            cls,
+            n_players: int,
+            current_round: int,
+            scores: Tuple[int, ...],
+            can_roll: int,
+            dice: DiceCounts,
+            turn_sum: int,
+            rules: RuleSet = DEFAULT_RULES,
+    ) -> "State":
+        out = cls.__new__(cls)
+        out._n_players = n_players
+        out.current_round = current_round
+        out._scores = scores
+        out.can_roll = can_roll
+        out._dice = dice
+        out.turn_sum = turn_sum
+        out._rules = rules
+        return out
 
     def __dir__(self):
         return [
@@ -108,15 +220,125 @@ class State:
     @__dict__.setter
     def __dict__(self, val: dict):
         for (k, v) in val.items():
-            setattr(self, k, copy.deepcopy(v))
+            setattr(self, k, v)
 
     def __repr__(self):
-        return f"Round: {self.current_round}. Score: {self.scores}"
+        return f"Round: {self.current_round}. Score: {dict(enumerate(self._scores))}"
+
+    def __eq__(self, other):
+        if not isinstance(other, State):
+            return NotImplemented
+        return (
+            self._n_players == other._n_players
+            and self.current_round == other.current_round
+            and self._scores == other._scores
+            and self.can_roll == other.can_roll
+            and self._dice == other._dice
+            and self.turn_sum == other.turn_sum
+            and self._rules == other._rules
+        )
+
+    __hash__ = None
+
+    def key(self) -> StateKey:
+        """
+        A hashable snapshot of every field that `==` compares, equal for
+        equal states
+        """
+        return (
+            self._n_players, self.current_round, self._scores, self.can_roll, self._dice,
+            self.turn_sum, self._rules,
+        )
+
+    def turn_key(self) -> TurnKey:
+        """The part of the state that the value of the rest of the turn depends on"""
+        return self._dice, self.can_roll, self.turn_sum
+
+    def __reduce__(self):
+        return type(self).from_bytes, (self.to_bytes(),)
+
+    def to_bytes(self) -> bytes:
+        """
+        A compact binary copy of the state, see `State.from_bytes`
+
+        A two player state of the default rules takes 35 bytes
+        """
+        rules = _pack_rules(self._rules)
+        n = self._n_players
+        return b"".join((
+            _STATE.pack(
+                n, self.current_round, self.can_roll, *self._dice, self.turn_sum, len(rules)
+            ),
+            struct.pack(f"<{n}q", *self._scores),
+            rules,
+        ))
+
+    @classmethod
+    def _unpack_from(cls, data, offset: int = 0) -> Tuple["State", int]:
+        try:
+            n, current_round, can_roll, *dice, turn_sum, n_rules = _STATE.unpack_from(
+                data, offset
+            )
+            offset += _STATE.size
+            scores = struct.unpack_from(f"<{n}q", data, offset)
+        except struct.error:
+            raise ValueError("The saved state is cut short") from None
+        offset += 8 * n
+        if len(data) < offset + n_rules:
+            raise ValueError("The saved state is cut short")
+        rules = _unpack_rules(data[offset:offset + n_rules])
+        state = cls._make(n, current_round, scores, can_roll, tuple(dice), turn_sum, rules)
+        return state, offset + n_rules
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "State":
+        """
+        Rebuild a state saved with `State.to_bytes`
+
+        Raises
+        ------
+        ValueError
+            If `data` is cut short
+        """
+        return cls._unpack_from(data)[0]
 
     def __copy__(self) -> "State":
-        out = State(self._n_players)
-        out.__dict__ = self.__dict__
-        return out
+        return State._make(
+            self._n_players,
+            self.current_round,
+            self._scores,
+            self.can_roll,
+            self._dice,
+            self.turn_sum,
+            self._rules,
+        )
+
+    @property
+    def rules(self) -> RuleSet:
+        return self._rules
+
+    @property
+    def scores(self) -> Tuple[int, ...]:
+        return self._scores
+
+    @scores.setter
+    def scores(self, val):
+        if isinstance(val, dict):
+            val = [val[i] for i in range(self._n_players)]
+        self._scores = tuple(val)
+
+    @property
+    def dice_counts(self) -> DiceCounts:
+        """The number of rolled dice showing each face"""
+        return self._dice
+
+    @property
+    def rolled_dice(self) -> List[Dice]:
+        return [_DICE[face] for face in range(6) for _ in range(self._dice[face])]
+
+    @rolled_dice.setter
+    def rolled_dice(self, val: List[Dice]):
+        self._dice = _count_dice(val)
 
     @property
     def current_player(self) -> int:
@@ -140,120 +362,121 @@ class State:
             A new instance of the state is returned recording updated score,
             refreshed dice, and reset current sum
         """
-
-        out = State(self._n_players)
-        out.current_round = self.current_round + 1
-        out.scores = copy.deepcopy(self.scores)
-
+        scores = self._scores
         if not forced:
-            out.scores[self.current_player] += self.turn_sum
-        return out
-
-    def roll(self) -> "State":
-        out = copy.copy(self)
-        out.rolled_dice = [Dice() for _ in range(self.can_roll)]
-        out.can_roll = 0  # mark that only actions are to consider scores
-        return out
-
-    def play_dice(self, action: Action) -> "State":
-        # TODO: validate that the chosen dice exist
-        out = copy.copy(self)
-
-        # add value to the current sum
-        out.turn_sum += action.value
+            player = self.current_player
+            scores = (
+                scores[:player] + (scores[player] + self.turn_sum,) + scores[player + 1:]
+            )
+        return State._make(
+            self._n_players, self.current_round + 1, scores, 6, _NO_DICE, 0, self._rules
+        )
 
-        n_played = sum(action.used.values())
+    def roll(self, rng: Optional[DiceRNG] = None) -> "State":
+        """
+        Roll the dice that can be rolled
 
-        # update number of dice that can be rolled
-        out.can_roll = len(self.rolled_dice) - n_played
-        if out.can_roll == 0:
-            # can pick them all up!
-            out.can_roll = 6
+        Parameters
+        ----------
+        rng: Optional[DiceRNG]
+            The source of the dice. The module level `random` generator is
+            used when not given
 
-        # Remove the played dice from `rolled_dice`
-        for k, v in action.used.items():
-            for _ in range(v):
-                out.rolled_dice.remove(Dice(k))
+        Returns
+        -------
+        new_state: State
+            A new instance of the state holding the rolled dice
+        """
+        if rng is None:
+            dice = [0] * 6
+            for _ in range(self.can_roll):
+                dice[random.randint(1, 6) - 1] += 1
+            dice = tuple(dice)
+        else:
+            dice = rng.roll_counts(self.can_roll, self.current_round)
+
+        # can_roll of 0 marks that only actions are to consider scores
+        return State._make(
+            self._n_players,
+            self.current_round,
+            self._scores,
+            0,
+            dice,
+            self.turn_sum,
+            self._rules,
+        )
 
-        return out
+    def play_dice(self, action: Action) -> "State":
+        # Remove the played dice from `rolled_dice` and add their value
+        dice, can_roll, turn_sum = play_counts(self._dice, self.turn_sum, action, self._rules)
+        return State._make(
+            self._n_players,
+            self.current_round,
+            self._scores,
+            can_roll,
+            dice,
+            turn_sum,
+            self._rules,
+        )
 
     def enumerate_options(
-            self, rolled_dice: Optional[List[Dice]] = None
+            self,
+            rolled_dice: Optional[List[Dice]] = None,
+            out: Optional[List[Action]] = None,
     ) -> List[Action]:
         """
         Given a list of dice, it computes all of the possible ways
         that one can score
 
+        The scoring actions are looked up in the table compiled for the
+        state's `RuleSet`, so this is a single dict lookup per call
+
         Parameters
         ----------
         rolled_dice: Optional[List[Dice]]
             A list of dice for which to enumerate options. If None are passed
             then `self.rolled_dice` is used
+        out: Optional[List[Action]]
+            A list to clear and fill with the options instead of allocating a
+            new one
 
         Returns
         -------
         opportunities : List[Action]
             A list of valid actions for a player
         """
-        rolled: List[Dice] = self.rolled_dice
-        if rolled_dice is not None:
-            rolled = rolled_dice
-
-        dice_counts = Counter([d.value for d in rolled])
-        opportunities: List[Action] = []
-
-        # Single dice opportunities
-        if dice_counts[1] > 0:
-            opportunities.append(Action({1: 1}, "1", 100))
-
-        if dice_counts[5] > 0:
-            opportunities.append(Action({5: 1}, "5", 50))
-
-        # Three pairs
-        pairs = []
-        for i in range(1, 7):
-            if dice_counts[i] >= 2:
-                pairs.append(i)
-        if len(pairs) == 3:
-            opportunities.append(Action({i: 2 for i in pairs}, f"Three pairs", 1500))
-
-        # Three of a kind
-        if dice_counts[1] >= 3:
-            opportunities.append(Action({1: 3}, "Three 1's", 1000))
-        for i in range(2, 7):
-            if dice_counts[i] >= 3:
-                opportunities.append(Action({i: 3}, f"Three {i}'s", i * 100))
-
-        for i in range(1, 7):
-            # Four of a kind
-            if dice_counts[i] >= 4:
-                opportunities.append(Action({i: 4}, f"Four {i}'s", 1000))
-
-            # Five of a kind
-            if dice_counts[i] >= 5:
-                opportunities.append(Action({i: 5}, f"Five {i}'s", 2000))
-
-            # Six of a kind
-            if dice_counts[i] == 6:
-                opportunities.append(Action({i: 6}, f"Six {i}'s", 3000))
-
-        # Straight
-        if all([dice_counts[i] > 0 for i in range(1, 7)]):
-            opportunities.append(
-                Action({i: 1 for i in range(1, 7)}, "1-2-3-4-5-6", 3000)
-            )
+        if rolled_dice is None:
+            opportunities = self._rules.table[self._dice]
+        else:
+            opportunities = self._rules.options(_count_dice(rolled_dice))
+
+        if out is None:
+            out = list(opportunities)
+        else:
+            out[:] = opportunities
 
         # can_roll is zero iff I just rolled. If there are no opportunities, we
         # must be bankrupt for this round
-        if len(opportunities) == 0 and self.can_roll == 0:
-            # oops
-            return []
-
         if self.can_roll > 0:
-            opportunities.append((Action({}, "roll", 0)))
-            opportunities.append(Action({}, "stop", 0))
+            out.append(ROLL)
+            score = self._scores[self.current_round % self._n_players]
+            if _may_stop(self._rules, self.turn_sum, score):
+                out.append(STOP)
+
+        return out
+
 
-        return opportunities
+def _transition(state: State, action: Action, rng: Optional[DiceRNG]) -> State:
+    used, name, value = action
+    if name.lower() == "stop":
+        return state.end_turn(forced=False)
+    elif name.lower() == "roll":
+        return state.roll(rng)
+    elif name.lower() == "bankrupt":
+        return state.end_turn(forced=True)
+    else:
+        # otherwise the player used some dice
+        return state.play_dice(action)
 
 
 class FarklePlayer(abc.ABC):
@@ -263,6 +486,30 @@ class FarklePlayer(abc.ABC):
     def act(self, state: State, choices: List[Action]) -> Action:
         pass
 
+    def act_batch(
+            self, states: List[State], choices_list: List[List[Action]]
+    ) -> List[Action]:
+        """
+        Choose actions for many decisions at once
+
+        `farkle.driver.play_batched` calls this with the pending decisions of
+        many games. The default calls `act` for each one; players backed by a
+        model can override it to run a single batched inference.
+
+        Parameters
+        ----------
+        states: List[State]
+            The state of each decision
+        choices_list: List[List[Action]]
+            The valid actions of each decision
+
+        Returns
+        -------
+        actions: List[Action]
+            One chosen action per decision
+        """
+        return [self.act(s, c) for s, c in zip(states, choices_list)]
+
     def __str__(self):
         return self.name
 
@@ -271,10 +518,57 @@ class FarklePlayer(abc.ABC):
 
 
 class RandomFarklePlayer(FarklePlayer):
+    """
+    Picks uniformly among the available actions
+
+    Parameters
+    ----------
+    seed: Optional[int]
+        Seeds a private generator for the choices. The module level `random`
+        generator is used when not given
+    """
     name = "random_robot"
 
+    def __init__(self, seed: Optional[int] = None):
+        self._random = random if seed is None else random.Random(seed)
+
     def act(self, state: State, choices: List[Action]) -> Action:
-        return random.choice(choices)
+        return self._random.choice(choices)
+
+
+class ThresholdFarklePlayer(FarklePlayer):
+    """
+    Keeps scoring dice and banks once the turn sum reaches a threshold
+
+    As long as the rolled dice can score, the scoring action worth the most
+    is played, the first one listed on ties (`highest_scoring`). Then the
+    turn is banked if `turn_sum` is at least the threshold for the number of
+    dice that could be rolled next, and the dice are rolled otherwise. `farkle.batch` has the
+    same policy for many games at once in `threshold_policy`.
+
+    Parameters
+    ----------
+    thresholds: Sequence[int] or int
+        The turn sum to bank at with 1, 2, ... 6 dice left to roll. A single
+        number is used for every number of dice
+    """
+    name = "threshold_robot"
+
+    def __init__(self, thresholds: Union[int, Sequence[int]]):
+        if isinstance(thresholds, Integral):
+            thresholds = (thresholds,) * 6
+        thresholds = tuple(int(t) for t in thresholds)
+        if len(thresholds) != 6:
+            raise ValueError("Need one threshold for each number of dice, from 1 to 6")
+        self.thresholds = thresholds
+
+    def act(self, state: State, choices: List[Action]) -> Action:
+        best = highest_scoring(choices)
+        if best is not None:
+            return best
+        if state.turn_sum >= self.thresholds[state.can_roll - 1] and STOP in choices:
+            return STOP
+        return ROLL
 
 
 class HumanFarklePlayer(FarklePlayer):
@@ -301,75 +595,204 @@ class HumanFarklePlayer(FarklePlayer):
 class Farkle(object):
     """
     The Farkle game is executed from this class
+
+    Parameters
+    ----------
+    players: List[FarklePlayer]
+        One player per seat
+    points_to_win: int, default=10_000
+        The game ends after the round in which a player reaches this score
+    verbose: bool, default=False
+        Print the progress of the game
+    rng: Optional[DiceRNG or int]
+        The source of the dice, or a seed for one. Playing again with the same
+        seed (and deterministic players) replays the same game
+    instrumentation: Optional[Instrumentation]
+        Collects counters, timings and step callbacks from `step` and
+        `player_turn`. Can also be attached later by setting the attribute
+    rules: Optional[RuleSet]
+        A variant of the scoring rules, `farkle.scoring.DEFAULT_RULES` when
+        not given
     """
 
-    def __init__(self, players, points_to_win=10_000, verbose: bool = False):
+    def __init__(
+            self,
+            players,
+            points_to_win=10_000,
+            verbose: bool = False,
+            rng: Optional[Union[DiceRNG, int]] = None,
+            instrumentation: Optional[Instrumentation] = None,
+            rules: Optional[RuleSet] = None,
+    ):
         self.points_to_win = points_to_win
         self.players = players
         self._have_human = any(map(lambda x: isinstance(x, HumanFarklePlayer), players))
         self.verbose = verbose or self._have_human
         self.n_players = len(players)
-        self._state = State(self.n_players)
-        self._history: List[Tuple[State, Action]] = []
+        self.rng = rng if isinstance(rng, DiceRNG) else DiceRNG(rng)
+        self.instrumentation = instrumentation
+        self.rules = DEFAULT_RULES if rules is None else rules
+        self._state = State(self.n_players, self.rules)
+        self._history = Trajectory(self.n_players, self._state)
 
     @property
     def state(self) -> State:
         return self._state
 
+    @property
+    def history(self) -> Trajectory:
+        """The ``(state, action)`` pairs played so far, oldest first"""
+        return self._history
+
     def set_state(self, action: Action, new_state: State):
-        self._history.append((self.state, action))
+        self._history.append(self.state, action)
         self._state = new_state
 
     def reset(self):
-        self._state = State(self.n_players)
-        self._history = []
+        self._state = State(self.n_players, self.rules)
+        self._history = Trajectory(self.n_players, self._state)
+
+    def __reduce__(self):
+        return type(self).from_bytes, (self.to_bytes(), self.players, self.verbose)
+
+    def to_bytes(self) -> bytes:
+        """
+        The state, dice generator and history of the game, see `Farkle.from_bytes`
+
+        The players, `verbose` and the instrumentation are not included
+        """
+        parts = (self._state.to_bytes(), self.rng.to_bytes(), self._history.to_bytes())
+        header = _GAME.pack(
+            _GAME_MAGIC, _GAME_VERSION, self.points_to_win, *(len(p) for p in parts)
+        )
+        return b"".join((header, *parts))
+
+    @classmethod
+    def from_bytes(
+            cls,
+            data: bytes,
+            players,
+            verbose: bool = False,
+            instrumentation: Optional[Instrumentation] = None,
+    ) -> "Farkle":
+        """
+        Rebuild a game saved with `Farkle.to_bytes`
+
+        The game continues exactly where it was saved, rolling the same dice
+
+        Parameters
+        ----------
+        data: bytes
+            The saved game
+        players: List[FarklePlayer]
+            The players to continue with, one per seat
+        verbose, instrumentation:
+            As for `Farkle`
+
+        Raises
+        ------
+        ValueError
+            If `data` is not a saved game or is cut short
+        """
+        try:
+            magic, version, points_to_win, *sizes = _GAME.unpack_from(data, 0)
+        except struct.error:
+            raise ValueError("Not a saved farkle game") from None
+        if magic != _GAME_MAGIC or version != _GAME_VERSION:
+            raise ValueError("Not a saved farkle game")
+        if len(data) < _GAME.size + sum(sizes):
+            raise ValueError("The saved game is cut short")
+        data = memoryview(data)
+        offset = _GAME.size
+        parts = []
+        for size in sizes:
+            parts.append(data[offset:offset + size])
+            offset += size
+
+        state = State.from_bytes(parts[0])
+        if state._n_players != len(players):
+            raise ValueError(f"The game was saved with {state._n_players} players")
+        game = cls(
+            players, points_to_win, verbose, DiceRNG.from_bytes(parts[1]),
+            instrumentation, state.rules,
+        )
+        game._state = state
+        game._history = Trajectory.from_bytes(parts[2])
+        return game
 
     def step(self, action: Action) -> State:
-        used, name, value = action
-        if name.lower() == "stop":
-            new_state = self.state.end_turn(forced=False)
-        elif name.lower() == "roll":
-            new_state = self.state.roll()
-        elif name.lower() == "bankrupt":
-            new_state = self.state.end_turn(forced=True)
-        else:
-            # otherwise the player used some dice
-            new_state = self.state.play_dice(action)
+        if self.instrumentation is not None:
+            return self._instrumented_step(action)
 
+        new_state = _transition(self.state, action, self.rng)
         self.set_state(action, new_state)
         return new_state
 
+    def _instrumented_step(self, action: Action) -> State:
+        inst = self.instrumentation
+        state = self.state
+        start = time.perf_counter()
+        new_state = _transition(state, action, self.rng)
+        inst.transition_time += time.perf_counter() - start
+        inst.counts[action_type(action)] += 1
+
+        self.set_state(action, new_state)
+        for callback in inst.callbacks:
+            callback(self, state, action, new_state)
+        return new_state
+
     def player_turn(self, choices: Optional[List[Action]] = None):
         """
         Lets each player play a turn and then prints the updated
         scores at the end of the turn
         """
+        if self.instrumentation is not None:
+            return self._instrumented_turn(choices)
+
         current_player_num = self.state.current_player
         current_player = self.players[current_player_num]
 
         if choices is None:
             choices = self.state.enumerate_options()
-        if len(choices) == 0:
-            # bankrupt... bummer
-            self.step(Action({}, "bankrupt", 0))
-            return
-        action = current_player.act(self.state, choices)
-        self.step(action)
+        while len(choices) > 0:
+            action = current_player.act(self.state, choices)
+            self.step(action)
+
+            # check if player chose to stop
+            if current_player_num != self.state.current_player:
+                return
+
+            # otherwise, let the player continue the turn
+            choices = self.state.enumerate_options()
+
+        # no actions left: bankrupt... bummer
+        self.step(BANKRUPT)
+
+    def _instrumented_turn(self, choices: Optional[List[Action]] = None):
+        # the same turn as `player_turn`, timing the options and the player
+        inst = self.instrumentation
+        clock = time.perf_counter
+        current_player_num = self.state.current_player
+        current_player = self.players[current_player_num]
 
-        # check if player chose to stop
-        if current_player_num != self.state.current_player:
-            return
+        if choices is None:
+            start = clock()
+            choices = self.state.enumerate_options()
+            inst.options_time += clock() - start
+        while len(choices) > 0:
+            start = clock()
+            action = current_player.act(self.state, choices)
+            inst.act_time += clock() - start
+            self.step(action)
 
-        # check if player has no actions
-        next_choices = self.state.enumerate_options()
-        if len(next_choices) == 0:
-            self.step(Action({}, "bankrupt", 0))
-            return
+            if current_player_num != self.state.current_player:
+                return
 
-        # otherwise, let the player continue the turn
-        self.player_turn(next_choices)
+            start = clock()
+            choices = self.state.enumerate_options()
+            inst.options_time += clock() - start
 
-        return None
+        self.step(BANKRUPT)
 
     def _print_score(self):
         for i in range(self.n_players):
@@ -379,7 +802,7 @@ class Farkle(object):
         """Play a game of Farkle"""
         while True:
             # check end_game
-            winners = {k: v >= self.points_to_win for k, v in self.state.scores.items()}
+            winners = {k: v >= self.points_to_win for k, v in enumerate(self.state.scores)}
 
             if any(winners.values()):
                 if self.verbose:
@@ -398,9 +821,82 @@ class Farkle(object):
                 if self.verbose:
                     current_player = self.players[self.state.current_player]
                     print(f"It is {current_player}'s turn")
-                self.step(Action({}, "roll", 0))
+                self.step(ROLL)
                 self.player_turn()
 
+    def decisions(self) -> Generator[Tuple[int, State, List[Action]], Action, Dict[int, bool]]:
+        """
+        Play a game of Farkle as a generator of decisions
+
+        Rather than asking the players, the generator yields
+        ``(player_num, state, choices)`` every time a player has to act and
+        expects the chosen action to be sent back. Every step goes through
+        `step`, so the game is recorded as in `play`.
+
+        Returns
+        -------
+        winners: Dict[int, bool]
+            Whether each player reached `points_to_win`, as the value of the
+            final `StopIteration`
+        """
+        while not any(score >= self.points_to_win for score in self.state.scores):
+            for _ in range(self.n_players):
+                player_num = self.state.current_player
+                self.step(ROLL)
+                choices = self.state.enumerate_options()
+                while len(choices) > 0:
+                    self.step((yield player_num, self.state, choices))
+                    if player_num != self.state.current_player:
+                        break
+                    choices = self.state.enumerate_options()
+                else:
+                    self.step(BANKRUPT)
+
+        return {k: v >= self.points_to_win for k, v in enumerate(self.state.scores)}
+
+    def play_fast(self) -> Dict[int, bool]:
+        """
+        Play a game of Farkle without recording history or printing
+
+        The game follows the same sequence of rolls and decisions as `play`,
+        so with the same random seed it ends in the same state. The turn loop
+        is iterative, the win condition is only checked against the player
+        whose turn just ended, and one list of choices is refilled for every
+        decision, so players must not keep a reference to it between calls.
+        `instrumentation` is not used.
+        The game ends once the round in which a player reaches
+        `points_to_win` is complete, exactly as in `play`.
+
+        Returns
+        -------
+        winners: Dict[int, bool]
+            Whether each player reached `points_to_win`
+        """
+        players = self.players
+        rng = self.rng
+        points_to_win = self.points_to_win
+        state = self._state
+        choices: List[Action] = []
+        game_over = any(score >= points_to_win for score in state.scores)
+
+        while not game_over:
+            for _ in range(self.n_players):
+                player_num = state.current_player
+                player = players[player_num]
+                state = state.roll(rng)
+                while True:
+                    if not state.enumerate_options(out=choices):
+                        state = state.end_turn(forced=True)
+                        break
+                    state = _transition(state, player.act(state, choices), rng)
+                    if state.current_player != player_num:
+                        break
+
+                game_over = game_over or state.scores[player_num] >= points_to_win
+
+        self._state = state
+        return {k: v >= points_to_win for k, v in enumerate(state.scores)}
+
 
 if __name__ == "__main__":
     # p1 = HumanFarklePlayer("Spencer")
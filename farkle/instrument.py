@@ -0,0 +1,68 @@
+"""
+Optional counters, timers and callbacks for `Farkle` games
+
+Attach an `Instrumentation` to a game to see how many actions of each kind
+are played and whether time goes to the engine or to the players' `act`
+calls. A game without one only pays for a single ``is None`` check per step
+and per turn.
+"""
+from typing import Callable, Dict, List
+
+from .scoring import Action
+
+# called as callback(game, state, action, new_state) after every step
+StepCallback = Callable[[object, object, Action, object], None]
+
+ACTION_TYPES = ("roll", "stop", "bankrupt", "score")
+
+
+def action_type(action: Action) -> str:
+    """Classify an action as roll, stop, bankrupt or score"""
+    name = action.name.lower()
+    return name if name in ("roll", "stop", "bankrupt") else "score"
+
+
+class Instrumentation(object):
+    """
+    Counters and timers collected while a `Farkle` game is played
+
+    Attributes
+    ----------
+    counts: Dict[str, int]
+        The number of steps of each of the `ACTION_TYPES`
+    options_time: float
+        Seconds spent in `State.enumerate_options`
+    act_time: float
+        Seconds spent in the players' `act` methods
+    transition_time: float
+        Seconds spent computing new states
+    callbacks: List[StepCallback]
+        Called after every step
+    """
+
+    def __init__(self):
+        self.callbacks: List[StepCallback] = []
+        self.reset()
+
+    def reset(self):
+        """Zero every counter and timer, keeping the callbacks"""
+        self.counts: Dict[str, int] = {t: 0 for t in ACTION_TYPES}
+        self.options_time = 0.0
+        self.act_time = 0.0
+        self.transition_time = 0.0
+
+    def on_step(self, callback: StepCallback) -> StepCallback:
+        """Register `callback`, can be used as a decorator"""
+        self.callbacks.append(callback)
+        return callback
+
+    def summary(self) -> dict:
+        return {
+            **self.counts,
+            "options_time": self.options_time,
+            "act_time": self.act_time,
+            "transition_time": self.transition_time,
+        }
+
+    def __repr__(self):
+        return f"Instrumentation({self.summary()})"
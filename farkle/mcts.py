@@ -0,0 +1,202 @@
+"""
+A Monte Carlo Tree Search player
+
+The search runs over the turn of the player to act and maximizes the points
+banked at the end of that turn. Rolls are chance nodes: each visit samples
+the outcome from a `DiceRNG`. Search states are the small tuples of
+`State.turn_key`, ``(dice counts, can_roll, turn_sum)``, and the moves
+mirror `State.play_dice`, `State.roll` and `State.end_turn` on them, so no
+`State` is copied during search.
+
+Nodes are stored in a transposition table keyed on that tuple. The same turn
+situation reached by different orders of play shares its statistics, and
+the table is kept between calls to `act`, so every decision starts from the
+tree grown by the previous ones.
+
+The search plays by the `RuleSet` of the state it is given. Actions are
+indices into `rules.actions`, and one table is kept per rule set and per
+turn sum needed before stopping, which differs while a player has not yet
+reached `min_opening_score`.
+"""
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .gameplay import FarklePlayer, State, TurnKey
+from .rng import DiceRNG
+from .scoring import (
+    Action, DEFAULT_RULES, DiceCounts, ROLL, RuleSet, STOP, play_counts,
+)
+
+
+def _opening(state: State) -> int:
+    # the turn sum the player to act needs before they may stop
+    if state.scores[state.current_player] > 0:
+        return 0
+    return state.rules.min_opening_score
+
+
+class _Node(object):
+    __slots__ = ("visits", "actions", "counts", "totals")
+
+    def __init__(self, actions: List[int]):
+        self.visits = 0
+        self.actions = actions
+        self.counts = [0] * len(actions)
+        self.totals = [0.0] * len(actions)
+
+
+class MCTSFarklePlayer(FarklePlayer):
+    """
+    Chooses actions with UCT search over the current turn
+
+    Parameters
+    ----------
+    iterations: Optional[int], default=1_000
+        The number of simulations per decision
+    time_limit: Optional[float]
+        Seconds of search per decision. When given, `iterations` is ignored
+    exploration: float, default=500.0
+        The UCT exploration constant, in points
+    max_nodes: int, default=1_000_000
+        The transposition tables are cleared when they grow beyond this
+        size in total
+    rng: Optional[DiceRNG or int]
+        Samples roll outcomes and rollout choices
+
+    Attributes
+    ----------
+    table: Dict[TurnKey, _Node]
+        The transposition table of the rules and opening score of the last
+        search
+    """
+    name = "mcts_robot"
+
+    def __init__(
+            self,
+            iterations: Optional[int] = 1_000,
+            time_limit: Optional[float] = None,
+            exploration: float = 500.0,
+            max_nodes: int = 1_000_000,
+            rng=None,
+    ):
+        if iterations is None and time_limit is None:
+            raise ValueError("Need an iteration or a time budget")
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.max_nodes = max_nodes
+        self.rng = rng if isinstance(rng, DiceRNG) else DiceRNG(rng)
+        self._tables: Dict[Tuple[RuleSet, int], Dict[TurnKey, _Node]] = {}
+        self._use(DEFAULT_RULES, 0)
+
+    def _use(self, rules: RuleSet, opening: int):
+        # point the search at the rules and opening score of a state
+        self.rules = rules
+        self.opening = opening
+        self.table = self._tables.setdefault((rules, opening), {})
+        self._roll_index = rules.action_index(ROLL)
+        self._stop_index = rules.action_index(STOP)
+
+    def _options(self, counts: DiceCounts, can_roll: int, turn_sum: int) -> List[int]:
+        # mirrors State.enumerate_options
+        out = [self.rules.action_index(a) for a in self.rules.table[counts]]
+        if can_roll > 0:
+            out.append(self._roll_index)
+            if turn_sum >= self.opening:
+                out.append(self._stop_index)
+        return out
+
+    def _rollout(self, counts: DiceCounts, can_roll: int, turn_sum: int) -> float:
+        # uniformly random play until the turn ends
+        rng = self.rng
+        rules = self.rules
+        while True:
+            options = rules.table[counts]
+            if can_roll == 0:
+                if not options:
+                    return 0.0
+                action = rng.choice(options)
+                counts, can_roll, turn_sum = play_counts(counts, turn_sum, action, rules)
+                continue
+
+            may_stop = turn_sum >= self.opening
+            pick = rng.randrange(len(options) + 1 + may_stop)
+            if pick == len(options):
+                counts, can_roll = rng.roll_counts(can_roll), 0
+            elif pick == len(options) + 1:
+                return float(turn_sum)
+            else:
+                counts, can_roll, turn_sum = play_counts(counts, turn_sum, options[pick], rules)
+
+    def _select(self, node: _Node) -> int:
+        best, best_score = 0, -math.inf
+        log_visits = math.log(node.visits + 1)
+        for i, n in enumerate(node.counts):
+            if n == 0:
+                return i
+            score = node.totals[i] / n + self.exploration * math.sqrt(log_visits / n)
+            if score > best_score:
+                best, best_score = i, score
+        return best
+
+    def _simulate(self, key: TurnKey) -> float:
+        node = self.table.get(key)
+        if node is None:
+            self.table[key] = _Node(self._options(*key))
+            return self._rollout(*key)
+        if not node.actions:
+            return 0.0  # bankrupt
+
+        i = self._select(node)
+        action = node.actions[i]
+        counts, can_roll, turn_sum = key
+        if action == self._stop_index:
+            value = float(turn_sum)
+        elif action == self._roll_index:
+            value = self._simulate((self.rng.roll_counts(can_roll), 0, turn_sum))
+        else:
+            played = play_counts(counts, turn_sum, self.rules.actions[action], self.rules)
+            value = self._simulate(played)
+
+        node.visits += 1
+        node.counts[i] += 1
+        node.totals[i] += value
+        return value
+
+    def search(self, state: State) -> Dict[int, Tuple[int, float]]:
+        """
+        Run the search from `state`
+
+        Returns
+        -------
+        stats: Dict[int, Tuple[int, float]]
+            The visit count and mean value of each action at the root, keyed
+            by index into `state.rules.actions`
+        """
+        self._use(state.rules, _opening(state))
+        if sum(len(t) for t in self._tables.values()) > self.max_nodes:
+            self._tables.clear()
+            self._use(state.rules, _opening(state))
+
+        key = state.turn_key()
+        if key not in self.table:
+            self._simulate(key)
+        if self.time_limit is not None:
+            deadline = time.perf_counter() + self.time_limit
+            while time.perf_counter() < deadline:
+                self._simulate(key)
+        else:
+            for _ in range(self.iterations):
+                self._simulate(key)
+
+        node = self.table[key]
+        return {
+            a: (n, total / n if n else 0.0)
+            for a, n, total in zip(node.actions, node.counts, node.totals)
+        }
+
+    def act(self, state: State, choices: List[Action]) -> Action:
+        stats = self.search(state)
+        index = state.rules.action_index
+        return max(choices, key=lambda a: stats.get(index(a), (0, 0.0)))
@@ -0,0 +1,191 @@
+"""
+Exact odds of a single roll of the dice
+
+For each number of dice from 1 to 6 the table gives the probability of
+rolling no scoring dice (a farkle), the distribution of the most points that
+can be set aside from the roll and the chance that each scoring action is
+offered. Every value is an exact `Fraction`, computed by enumerating each
+multiset of dice with its multinomial probability.
+
+The tables are computed once and saved as JSON in a cache directory, by
+default ``~/.cache/farkle`` or the directory named by the ``FARKLE_CACHE``
+environment variable. The file name contains a digest of the scoring table,
+so a change to the scoring rules never reads stale odds and each `RuleSet`
+gets a file of its own.
+"""
+import hashlib
+import json
+import os
+from fractions import Fraction
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional
+
+from .scoring import (
+    Action, DEFAULT_RULES, DiceCounts, RuleSet, remove_used, roll_probabilities,
+)
+
+_VERSION = 1
+
+
+class RollOdds(NamedTuple):
+    """
+    The odds of rolling `n_dice` dice
+
+    Attributes
+    ----------
+    n_dice: int
+        The number of dice rolled
+    farkle: Fraction
+        The probability that no dice score
+    best_score: Dict[int, Fraction]
+        The probability of each value of the most points that can be set
+        aside from the roll, with 0 for a farkle
+    action_probability: Dict[int, Fraction]
+        The probability that each scoring action is offered, keyed by index
+        into `rules.actions`. Actions that can not be offered are left out
+    rules: RuleSet
+        The scoring rules of the roll
+    """
+    n_dice: int
+    farkle: Fraction
+    best_score: Dict[int, Fraction]
+    action_probability: Dict[int, Fraction]
+    rules: RuleSet = DEFAULT_RULES
+
+    @property
+    def expected_best_score(self) -> Fraction:
+        return sum((p * v for v, p in self.best_score.items()), Fraction(0))
+
+    def action_value(self, action: Action) -> Fraction:
+        """The expected points `action` adds to a roll, offered or not"""
+        try:
+            i = self.rules.action_index(action)
+        except ValueError:
+            return Fraction(0)
+        return self.action_probability.get(i, Fraction(0)) * action.value
+
+
+@lru_cache(maxsize=None)
+def best_score(counts: DiceCounts, rules: RuleSet = DEFAULT_RULES) -> int:
+    """The most points that can be set aside from `counts`"""
+    best = 0
+    for action in rules.options(counts):
+        best = max(best, action.value + best_score(remove_used(counts, action), rules))
+    return best
+
+
+def _compute(n_dice: int, rules: RuleSet) -> RollOdds:
+    farkle = Fraction(0)
+    best: Dict[int, Fraction] = {}
+    offered: Dict[int, Fraction] = {}
+    for counts, p in roll_probabilities(n_dice).items():
+        options = rules.options(counts)
+        if not options:
+            farkle += p
+        score = best_score(counts, rules)
+        best[score] = best.get(score, Fraction(0)) + p
+        for action in options:
+            i = rules.action_index(action)
+            offered[i] = offered.get(i, Fraction(0)) + p
+    return RollOdds(
+        n_dice, farkle, dict(sorted(best.items())), dict(sorted(offered.items())), rules
+    )
+
+
+def _cache_path(
+        cache_dir: Optional[str], rules: RuleSet, prefix: str = f"odds-v{_VERSION}",
+        suffix: str = ".json",
+) -> str:
+    # also used by `farkle.solver` to cache solved policies
+    if cache_dir is None:
+        cache_dir = os.environ.get(
+            "FARKLE_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "farkle")
+        )
+    table = repr((rules.actions, sorted(rules.table.items()), rules.params())).encode()
+    digest = hashlib.blake2b(table, digest_size=8).hexdigest()
+    return os.path.join(cache_dir, f"{prefix}-{digest}{suffix}")
+
+
+def _dump(table: Dict[int, RollOdds], path: str):
+    def encode(d):
+        return {str(k): str(v) for k, v in d.items()}
+
+    data = {
+        str(n): {
+            "farkle": str(odds.farkle),
+            "best_score": encode(odds.best_score),
+            "action_probability": encode(odds.action_probability),
+        }
+        for n, odds in table.items()
+    }
+    _write_atomic(path, json.dumps(data).encode())
+
+
+def _write_atomic(path: str, data: bytes):
+    # write then rename, so a concurrent reader never sees half a file. Also
+    # used by `farkle.solver`
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _load(path: str, rules: RuleSet) -> Dict[int, RollOdds]:
+    def decode(d):
+        return {int(k): Fraction(v) for k, v in d.items()}
+
+    with open(path) as f:
+        data = json.load(f)
+    return {
+        int(n): RollOdds(
+            int(n), Fraction(odds["farkle"]), decode(odds["best_score"]),
+            decode(odds["action_probability"]), rules,
+        )
+        for n, odds in data.items()
+    }
+
+
+@lru_cache(maxsize=None)
+def odds_table(
+        cache_dir: Optional[str] = None, rules: RuleSet = DEFAULT_RULES
+) -> Dict[int, RollOdds]:
+    """
+    The `RollOdds` of rolling 1 to 6 dice, keyed by the number of dice
+
+    Parameters
+    ----------
+    cache_dir: Optional[str]
+        Where the tables are saved, see the module documentation. The tables
+        are computed without being saved when the directory can not be
+        written to
+    rules: RuleSet, default=DEFAULT_RULES
+        The scoring rules the odds are computed for
+
+    Returns
+    -------
+    table: Dict[int, RollOdds]
+        The table is cached and must not be modified
+    """
+    path = _cache_path(cache_dir, rules)
+    try:
+        return _load(path, rules)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    table = {n: _compute(n, rules) for n in range(1, 7)}
+    try:
+        _dump(table, path)
+    except OSError:
+        pass
+    return table
+
+
+def roll_odds(
+        n_dice: int, cache_dir: Optional[str] = None, rules: RuleSet = DEFAULT_RULES
+) -> RollOdds:
+    """The `RollOdds` of rolling `n_dice` dice, between 1 and 6"""
+    try:
+        return odds_table(cache_dir, rules)[n_dice]
+    except KeyError:
+        raise ValueError(f"Can only roll 1 to 6 dice, not {n_dice}") from None
@@ -0,0 +1,277 @@
+"""
+A replay buffer in shared memory for multi-process self-play
+
+Transitions are stored as fixed width NumPy records in a
+`multiprocessing.shared_memory` block, so worker processes write them
+straight into memory the learner can read and nothing is pickled on the way.
+
+The block is split into one ring per writer. A writer is the only process
+that touches its ring and its counter, so appends need no lock. The sampler
+reads the counters and draws from the records written so far through views
+of the block that are not copied. A record that a writer is overwriting
+while it is being sampled can be read half written; keep the rings large
+enough that a ring does not wrap around during one sampling call.
+
+Every game in a buffer is played with the same `RuleSet`, which is kept in
+the header of the block. Actions are stored as indices into `rules.actions`.
+
+A buffer is pickled as the name of its block, so it can be passed to worker
+processes, which attach to the same memory. Before Python 3.13, only attach
+from processes started by `multiprocessing`, which share the creator's
+resource tracker; an unrelated process would free the block when it exits.
+"""
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+from .gameplay import Farkle, State
+from .scoring import DEFAULT_RULES, Action, RuleSet, _rule_set
+
+_MAGIC = 0x464B5242  # "FKRB"
+# magic, n_players, n_writers, ring capacity, followed by the rule parameters
+_HEADER_SIZE = 4 + len(RuleSet._PARAMS)
+
+
+def transition_dtype(n_players: int) -> np.dtype:
+    """The record of one ``(state, action, reward, next_state, done)`` step"""
+    state = [
+        ("scores", np.int32, (n_players,)),
+        ("current_round", np.int32),
+        ("can_roll", np.int8),
+        ("dice", np.int8, (6,)),
+        ("turn_sum", np.int32),
+    ]
+    return np.dtype(
+        [("state", state), ("action", np.int16), ("reward", np.float32),
+         ("next_state", state), ("done", np.bool_)],
+        align=True,
+    )
+
+
+def _encode(state: State) -> tuple:
+    return (state.scores, state.current_round, state.can_roll,
+            state.dice_counts, state.turn_sum)
+
+
+def decode_state(record: np.void, rules: RuleSet = DEFAULT_RULES) -> State:
+    """
+    Rebuild the `State` stored in the ``state`` or ``next_state`` field of a
+    record from a buffer of games played with `rules`
+    """
+    return State._make(
+        len(record["scores"]),
+        int(record["current_round"]),
+        tuple(int(s) for s in record["scores"]),
+        int(record["can_roll"]),
+        tuple(int(c) for c in record["dice"]),
+        int(record["turn_sum"]),
+        rules,
+    )
+
+
+def decode_action(record: np.void, rules: RuleSet = DEFAULT_RULES) -> Action:
+    """The action of a record from a buffer of games played with `rules`"""
+    return rules.actions[record["action"]]
+
+
+class SharedReplayBuffer(object):
+    """
+    Parameters
+    ----------
+    capacity: int
+        The number of transitions kept by each writer
+    n_players: int, default=2
+        The number of players in the games stored
+    n_writers: int, default=1
+        The number of processes that append to the buffer
+    name: Optional[str]
+        The name of the shared memory block, chosen by the system when not
+        given
+    rules: Optional[RuleSet]
+        The scoring rules of the games stored, `farkle.scoring.DEFAULT_RULES`
+        when not given. Pass `buffer.rules` to `decode_state` and
+        `decode_action`
+
+    The process that creates the buffer owns the memory and should call
+    `unlink` once every process is done with it.
+    """
+
+    def __init__(
+            self,
+            capacity: int,
+            n_players: int = 2,
+            n_writers: int = 1,
+            name: Optional[str] = None,
+            rules: Optional[RuleSet] = None,
+    ):
+        rules = DEFAULT_RULES if rules is None else rules
+        dtype = transition_dtype(n_players)
+        size = 8 * (_HEADER_SIZE + n_writers) + dtype.itemsize * capacity * n_writers
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self._setup(shm, dtype, n_writers, capacity, rules)
+        self._header[:] = (_MAGIC, n_players, n_writers, capacity, *rules.params().values())
+        self._counts[:] = 0
+        self._owner = True
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedReplayBuffer":
+        """Open the buffer created under `name` by another process"""
+        try:
+            # only the creating process may remove the block (Python 3.13+)
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=name)
+        header = np.ndarray(_HEADER_SIZE, dtype=np.int64, buffer=shm.buf)
+        magic, n_players, n_writers, capacity, *params = (int(h) for h in header)
+        if magic != _MAGIC:
+            shm.close()
+            raise ValueError(f"{name} is not a farkle replay buffer")
+        del header
+
+        params = dict(zip(RuleSet._PARAMS, params))
+        params["combinations"] = bool(params["combinations"])
+        out = cls.__new__(cls)
+        out._setup(shm, transition_dtype(n_players), n_writers, capacity, _rule_set(params))
+        out._owner = False
+        return out
+
+    def _setup(self, shm, dtype, n_writers, capacity, rules):
+        self._shm = shm
+        self.name = shm.name
+        self.rules = rules
+        self.dtype = dtype
+        self.n_players = dtype["state"]["scores"].shape[0]
+        self.n_writers = n_writers
+        self.capacity = capacity
+        self._header = np.ndarray(_HEADER_SIZE, dtype=np.int64, buffer=shm.buf)
+        self._counts = np.ndarray(
+            n_writers, dtype=np.int64, buffer=shm.buf, offset=8 * _HEADER_SIZE
+        )
+        self.records = np.ndarray(
+            (n_writers, capacity), dtype=dtype, buffer=shm.buf,
+            offset=8 * (_HEADER_SIZE + n_writers),
+        )
+
+    def __reduce__(self):
+        return type(self).attach, (self.name,)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    def __len__(self) -> int:
+        return int(self.sizes().sum())
+
+    def __repr__(self):
+        return f"SharedReplayBuffer({self.name!r}, {len(self)} transitions)"
+
+    def sizes(self) -> np.ndarray:
+        """The number of transitions currently held by each writer's ring"""
+        return np.minimum(self._counts, self.capacity)
+
+    def writer(self, i: int) -> "ReplayWriter":
+        """The appender of ring `i`. Use each ring from one process only"""
+        if not 0 <= i < self.n_writers:
+            raise ValueError(f"No writer {i} in a buffer of {self.n_writers}")
+        return ReplayWriter(self, i)
+
+    def sample(
+            self, batch_size: int, rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        """
+        Draw `batch_size` transitions uniformly, with replacement
+
+        Returns
+        -------
+        batch: np.ndarray
+            A copy of the drawn records, of dtype `transition_dtype`
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        sizes = self.sizes()
+        total = sizes.sum()
+        if total == 0:
+            raise ValueError("The buffer is empty")
+        flat = rng.integers(total, size=batch_size)
+        ring = np.searchsorted(np.cumsum(sizes), flat, side="right")
+        offset = flat - (np.cumsum(sizes) - sizes)[ring]
+        return self.records[ring, offset]
+
+    def close(self):
+        """Release this process' views of the memory"""
+        self._header = self._counts = self.records = None
+        self._shm.close()
+
+    def unlink(self):
+        """Free the shared memory block"""
+        self._shm.unlink()
+
+
+class ReplayWriter(object):
+    """Appends transitions to one ring of a `SharedReplayBuffer`"""
+
+    def __init__(self, buffer: SharedReplayBuffer, index: int):
+        self.buffer = buffer
+        self.index = index
+        self._ring = buffer.records[index]
+        self._counts = buffer._counts
+        self._rules = buffer.rules
+
+    def _check_rules(self, rules: RuleSet):
+        if rules != self._rules:
+            raise ValueError(f"The buffer stores games of {self._rules!r}, not {rules!r}")
+
+    def append(
+            self,
+            state: State,
+            action: Action,
+            reward: float,
+            next_state: State,
+            done: bool = False,
+    ):
+        """
+        Raises
+        ------
+        ValueError
+            If `state` is played with other rules than the buffer, or
+            `action` is not one of theirs. Nothing is written
+        """
+        self._check_rules(state.rules)
+        i = self.index
+        n = self._counts[i]
+        self._ring[n % len(self._ring)] = (
+            _encode(state), self._rules.action_index(action), reward, _encode(next_state), done
+        )
+        # publish the record only after it is written
+        self._counts[i] = n + 1
+
+    def add_game(self, game: Farkle, done: Optional[bool] = None):
+        """
+        Append every step in the history of `game`
+
+        The reward of a step is the change in the score of the player who
+        acted, and the last step is marked done when the game has ended or
+        when `done` says so.
+
+        Raises
+        ------
+        ValueError
+            If `game` is played with other rules than the buffer. Nothing is
+            written
+        """
+        self._check_rules(game.rules)
+        if done is None:
+            done = game.state.current_round % game.n_players == 0 and any(
+                s >= game.points_to_win for s in game.state.scores
+            )
+
+        steps = list(game.history) + [(game.state, None)]
+        last = len(steps) - 2
+        for i, ((state, action), (next_state, _)) in enumerate(zip(steps, steps[1:])):
+            seat = state.current_round % game.n_players
+            reward = next_state.scores[seat] - state.scores[seat]
+            self.append(state, action, reward, next_state, done and i == last)
@@ -0,0 +1,252 @@
+"""
+Stream the results of many games to chunked files with bounded memory
+
+`stream_results` plays games one at a time and yields a record per game and,
+optionally, one per step. A `ResultWriter` collects the records of each
+table in columns and writes them out every `chunk_size` records, as CSV,
+NPZ (needs NumPy) or Parquet (needs pyarrow) files. `read_chunks` and
+`read_records` read a table back lazily, one file at a time.
+
+Every column holds integers. The ``games`` table has the columns
+
+* ``game``: the number of the game in the stream
+* ``rounds``: the number of turns played
+* ``steps``: the number of actions played
+* ``score_i`` and ``won_i`` for every seat ``i``
+
+and the ``steps`` table has
+
+* ``game`` and ``step``: the game and the position of the step in it
+* ``player`` and ``round``: who acted, in which turn
+* ``action``: the index of the action in `RuleSet.actions`
+* ``score``, ``turn_sum`` and ``can_roll``: the state the action was played in
+"""
+import csv
+import glob
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .gameplay import Farkle
+
+# (table name, record)
+Record = Tuple[str, Dict[str, int]]
+
+FORMATS = ("csv", "npz", "parquet")
+
+
+def stream_results(
+        games: Iterable[Farkle], steps: bool = False, start: int = 0
+) -> Iterator[Record]:
+    """
+    Play every game in `games` and yield its records
+
+    Parameters
+    ----------
+    games: Iterable[Farkle]
+        The games to play. Pass a generator to keep only one game in memory
+    steps: bool, default=False
+        Also yield a ``steps`` record for every action played
+    start: int, default=0
+        The number of the first game
+
+    Yields
+    ------
+    record: Record
+        A ``("games", record)`` pair once a game is over, preceded by its
+        ``("steps", record)`` pairs when `steps` is set
+    """
+    for number, game in enumerate(games, start):
+        winners = game.play()
+        history = game.history
+        if steps:
+            index = game.rules.action_index
+            for i, (state, action) in enumerate(history):
+                player = state.current_player
+                yield "steps", {
+                    "game": number,
+                    "step": i,
+                    "player": player,
+                    "round": state.current_round,
+                    "action": index(action),
+                    "score": state.scores[player],
+                    "turn_sum": state.turn_sum,
+                    "can_roll": state.can_roll,
+                }
+
+        record = {"game": number, "rounds": game.state.current_round, "steps": len(history)}
+        for seat, score in enumerate(game.state.scores):
+            record[f"score_{seat}"] = score
+        for seat in range(game.n_players):
+            record[f"won_{seat}"] = int(winners[seat])
+        yield "games", record
+
+
+def _write_csv(path: str, columns: Dict[str, List[int]]):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        writer.writerows(zip(*columns.values()))
+
+
+def _write_npz(path: str, columns: Dict[str, List[int]]):
+    import numpy as np
+
+    np.savez(path, **{k: np.asarray(v, dtype=np.int64) for k, v in columns.items()})
+
+
+def _write_parquet(path: str, columns: Dict[str, List[int]]):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    pq.write_table(pa.table({k: pa.array(v, pa.int64()) for k, v in columns.items()}), path)
+
+
+_WRITERS = {"csv": _write_csv, "npz": _write_npz, "parquet": _write_parquet}
+
+
+class ResultWriter(object):
+    """
+    Write records to one series of chunk files per table
+
+    The chunks of table ``name`` are written to
+    ``directory/name-00000.format``, ``directory/name-00001.format``...
+
+    Parameters
+    ----------
+    directory: str
+        Where the files are written. Created if needed
+    format: str, default="csv"
+        One of `FORMATS`
+    chunk_size: int, default=100_000
+        The number of records of a table held in memory before they are
+        written to a file
+
+    Every record of a table must have the same columns as its first one,
+    otherwise `write` raises ValueError. Write games with different numbers
+    of players to different tables.
+    """
+
+    def __init__(self, directory: str, format: str = "csv", chunk_size: int = 100_000):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown format {format!r}, use one of {FORMATS}")
+        if format == "npz":
+            import numpy  # noqa: F401
+        elif format == "parquet":
+            import pyarrow  # noqa: F401
+
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.format = format
+        self.chunk_size = chunk_size
+        self._columns: Dict[str, Dict[str, List[int]]] = {}
+        self._names: Dict[str, Tuple[str, ...]] = {}
+        self._chunks: Dict[str, int] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, table: str, record: Dict[str, int]):
+        names = self._names.get(table)
+        if names is None:
+            if not record:
+                raise ValueError(f"A record of table {table!r} has no columns")
+            names = self._names[table] = tuple(record)
+        elif len(record) != len(names) or any(k not in record for k in names):
+            raise ValueError(
+                f"The record has the columns {sorted(record)}, "
+                f"table {table!r} has {sorted(names)}"
+            )
+        columns = self._columns.get(table)
+        if columns is None:
+            columns = self._columns[table] = {k: [] for k in names}
+        for k, v in record.items():
+            columns[k].append(v)
+        if len(columns[names[0]]) >= self.chunk_size:
+            self._flush(table)
+
+    def write_all(self, records: Iterable[Record]):
+        """Write every ``(table, record)`` pair from `records`"""
+        for table, record in records:
+            self.write(table, record)
+
+    def _flush(self, table: str):
+        columns = self._columns.pop(table)
+        if not next(iter(columns.values())):
+            return
+        chunk = self._chunks.get(table, 0)
+        self._chunks[table] = chunk + 1
+        path = os.path.join(self.directory, f"{table}-{chunk:05d}.{self.format}")
+        _WRITERS[self.format](path, columns)
+
+    def close(self):
+        """Write the records still held in memory"""
+        for table in list(self._columns):
+            self._flush(table)
+
+
+def _read_csv(path: str) -> Dict[str, List[int]]:
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        names = next(reader)
+        columns = list(zip(*([int(v) for v in row] for row in reader)))
+    if not columns:
+        return {k: [] for k in names}
+    return {k: list(v) for k, v in zip(names, columns)}
+
+
+def _read_npz(path: str):
+    import numpy as np
+
+    with np.load(path) as data:
+        return {k: data[k] for k in data.files}
+
+
+def _read_parquet(path: str):
+    import pyarrow.parquet as pq
+
+    return pq.read_table(path).to_pydict()
+
+
+_READERS = {"csv": _read_csv, "npz": _read_npz, "parquet": _read_parquet}
+
+
+def read_chunks(directory: str, table: str, format: Optional[str] = None) -> Iterator[dict]:
+    """
+    Read the chunks of `table` written by a `ResultWriter`, one at a time
+
+    Parameters
+    ----------
+    directory: str
+        The directory the writer wrote to
+    table: str
+        The name of the table, ``"games"`` or ``"steps"`` for the records of
+        `stream_results`
+    format: Optional[str]
+        The format of the files. Found from the files when not given
+
+    Yields
+    ------
+    columns: dict
+        Maps each column name to its values in the chunk: lists for CSV and
+        Parquet files and arrays for NPZ files
+    """
+    formats = FORMATS if format is None else (format,)
+    for fmt in formats:
+        paths = sorted(glob.glob(os.path.join(glob.escape(directory), f"{table}-*.{fmt}")))
+        if paths:
+            for path in paths:
+                yield _READERS[fmt](path)
+            return
+
+
+def read_records(
+        directory: str, table: str, format: Optional[str] = None
+) -> Iterator[Dict[str, int]]:
+    """Read `table` back one record at a time, see `read_chunks`"""
+    for columns in read_chunks(directory, table, format):
+        names = list(columns)
+        for row in zip(*columns.values()):
+            yield {k: int(v) for k, v in zip(names, row)}
@@ -0,0 +1,340 @@
+"""
+A seeded source of dice rolls that draws faces in large blocks
+
+`DiceRNG` generates a block of random bytes with a single call, keeps the
+ones that map evenly onto the six faces and then hands faces out from that
+buffer, so rolling dice does not cost a call into the random module per die.
+Each generator is fully determined by its seed and spawn key, which makes any
+game replayable and lets independent child streams be derived for parallel
+games.
+
+`CommonDiceRNG` hands out the same faces for the same roll of the same turn,
+however many dice the players rolled before, so games played by different
+players on the same stream can be compared roll for roll.
+"""
+import hashlib
+import json
+import operator
+import random
+import struct
+from typing import List, Optional, Tuple
+
+from .scoring import DiceCounts
+
+# bytes below 252 map evenly onto the six faces, the rest are dropped
+_FACE_TABLE = bytes(b % 6 for b in range(256))
+_REJECTED = bytes(range(252, 256))
+
+# the Mersenne Twister state: 624 words and the position in them
+_MT_STATE = struct.Struct("<625I")
+_LENGTH = struct.Struct("<I")
+
+
+def _derive(seed: int, spawn_key: Tuple[int, ...]) -> int:
+    digest = hashlib.blake2b(repr((seed, spawn_key)).encode(), digest_size=16).digest()
+    return int.from_bytes(digest, "little")
+
+
+class DiceRNG(object):
+    """
+    A reproducible, block-buffered generator of dice faces
+
+    Parameters
+    ----------
+    seed: Optional[int]
+        The root seed, any integer type. When not given one is drawn from the
+        module level `random` generator, so `random.seed` still makes games
+        reproducible
+    spawn_key: Tuple[int, ...], default=()
+        Identifies a child stream of `seed`, see `spawn`
+    block_size: int, default=4096
+        The number of random bytes drawn at a time
+    """
+
+    def __init__(
+            self,
+            seed: Optional[int] = None,
+            spawn_key: Tuple[int, ...] = (),
+            block_size: int = 4096,
+    ):
+        if seed is None:
+            seed = random.getrandbits(64)
+        # NumPy integers give the same stream as the equal Python int
+        self.seed = operator.index(seed)
+        self.spawn_key = tuple(operator.index(k) for k in spawn_key)
+        self.block_size = block_size
+        self._random = random.Random(_derive(self.seed, self.spawn_key))
+        self._buffer = b""
+        self._pos = 0
+        self._n_children = 0
+
+    def __repr__(self):
+        return f"DiceRNG(seed={self.seed}, spawn_key={self.spawn_key})"
+
+    def __eq__(self, other):
+        if not isinstance(other, DiceRNG):
+            return NotImplemented
+        return self.getstate() == other.getstate()
+
+    __hash__ = None
+
+    def __reduce__(self):
+        return type(self).from_bytes, (self.to_bytes(),)
+
+    def getstate(self) -> tuple:
+        """Everything needed to continue the stream, see `setstate`"""
+        return (
+            self.seed,
+            self.spawn_key,
+            self.block_size,
+            self._n_children,
+            self._random.getstate(),
+            self._buffer[self._pos:],
+        )
+
+    def setstate(self, state: tuple):
+        """Continue the stream from a state returned by `getstate`"""
+        seed, spawn_key, block_size, n_children, random_state, buffer = state
+        self.seed = seed
+        self.spawn_key = tuple(spawn_key)
+        self.block_size = block_size
+        self._n_children = n_children
+        self._random.setstate(random_state)
+        self._buffer = bytes(buffer)
+        self._pos = 0
+
+    def to_bytes(self) -> bytes:
+        """
+        A compact binary copy of the generator's state
+
+        `DiceRNG.from_bytes` on the result gives a generator that continues
+        with exactly the same rolls
+        """
+        seed, spawn_key, block_size, n_children, random_state, buffer = (
+            DiceRNG.getstate(self)
+        )
+        version, words, gauss_next = random_state
+        header = json.dumps(
+            [seed, spawn_key, block_size, n_children, version, gauss_next]
+            + self._header_extra()
+        ).encode()
+        return b"".join((
+            _LENGTH.pack(len(header)), header,
+            _MT_STATE.pack(*words),
+            _LENGTH.pack(len(buffer)), buffer,
+        ))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "DiceRNG":
+        """
+        Rebuild a generator saved with `to_bytes`
+
+        Raises
+        ------
+        ValueError
+            If `data` is cut short
+        """
+        try:
+            offset = _LENGTH.size
+            (size,) = _LENGTH.unpack_from(data, 0)
+            seed, spawn_key, block_size, n_children, version, gauss_next, *extra = json.loads(
+                bytes(data[offset:offset + size])
+            )
+            offset += size
+            words = _MT_STATE.unpack_from(data, offset)
+            offset += _MT_STATE.size
+            (size,) = _LENGTH.unpack_from(data, offset)
+        except struct.error:
+            raise ValueError("The saved generator is cut short") from None
+        offset += _LENGTH.size
+        if len(data) < offset + size:
+            raise ValueError("The saved generator is cut short")
+        buffer = bytes(data[offset:offset + size])
+
+        kind = CommonDiceRNG if extra else DiceRNG
+        out = kind.__new__(kind)
+        out._random = random.Random()
+        DiceRNG.setstate(out, (
+            seed, spawn_key, block_size, n_children, (version, words, gauss_next), buffer
+        ))
+        out._restore_extra(extra)
+        return out
+
+    def _header_extra(self) -> list:
+        # the state of subclasses, saved in the header of `to_bytes`
+        return []
+
+    def _restore_extra(self, extra: list):
+        pass
+
+    def _refill(self, n: int):
+        # keep the unused faces and top the buffer up to at least `n`
+        buffer = self._buffer[self._pos:]
+        while len(buffer) < n:
+            block = self._random.getrandbits(8 * self.block_size)
+            buffer += block.to_bytes(self.block_size, "little").translate(
+                _FACE_TABLE, _REJECTED
+            )
+        self._buffer = buffer
+        self._pos = 0
+
+    def _take(self, n: int) -> bytes:
+        if self._pos + n > len(self._buffer):
+            self._refill(n)
+        pos = self._pos
+        self._pos = pos + n
+        return self._buffer[pos:pos + n]
+
+    def roll_counts(self, n: int, turn: Optional[int] = None) -> DiceCounts:
+        """
+        Roll `n` dice
+
+        Parameters
+        ----------
+        n: int
+            The number of dice
+        turn: Optional[int]
+            The turn the dice are rolled in. Not used here, `CommonDiceRNG`
+            keys its rolls by it
+
+        Returns
+        -------
+        counts: DiceCounts
+            The number of dice showing each face
+        """
+        counts = [0] * 6
+        for face in self._take(n):
+            counts[face] += 1
+        return tuple(counts)
+
+    def faces(self, n: int) -> List[int]:
+        """Roll `n` dice and return their faces, from 1 to 6"""
+        return [face + 1 for face in self._take(n)]
+
+    def randrange(self, n: int) -> int:
+        """A random integer from 0 to ``n - 1`` from this generator's stream"""
+        return self._random.randrange(n)
+
+    def choice(self, seq):
+        """Pick an element of `seq` using this generator's stream"""
+        return seq[self._random.randrange(len(seq))]
+
+    def spawn(self, n: int = 1) -> List["DiceRNG"]:
+        """
+        Create `n` independent child generators
+
+        Children are numbered in the order they are spawned, so the k-th
+        child of a given generator is always the same stream
+        """
+        start = self._n_children
+        self._n_children += n
+        return [
+            type(self)(self.seed, self.spawn_key + (i,), self.block_size)
+            for i in range(start, start + n)
+        ]
+
+
+class CommonDiceRNG(DiceRNG):
+    """
+    Dice keyed by turn and by roll within the turn, for common random numbers
+
+    A `DiceRNG` hands out faces in order, so once a player rolls fewer dice
+    than another would have, every later roll of the game differs. Here each
+    turn gets its own fixed slab of faces, `ROLLS_PER_TURN` rolls of six, and
+    the k-th roll of a turn takes its dice from the start of the k-th slot
+    whatever was rolled before. Games played on generators with the same seed
+    and spawn key, by different players, then see the same dice on the same
+    roll of the same turn, and their results differ by the players' choices
+    rather than by luck. Key a generator per game with ``spawn_key=(game,)``.
+
+    Turns must come in increasing order; turns that are skipped still use up
+    their slab, so the dice of a turn do not depend on the turns before it.
+    Going back to turn 0, as a game does after `Farkle.reset`, starts the
+    stream over, so the new game sees the same dice as the first one.
+    Rolls past `ROLLS_PER_TURN` in one turn come from a child stream keyed by
+    the turn and roll.
+
+    Parameters
+    ----------
+    seed: Optional[int]
+        The root seed, see `DiceRNG`
+    spawn_key: Tuple[int, ...], default=()
+        Identifies a child stream of `seed`, one per game
+    block_size: int, default=4096
+        The number of random bytes drawn at a time
+    """
+    ROLLS_PER_TURN = 16
+
+    def __init__(
+            self,
+            seed: Optional[int] = None,
+            spawn_key: Tuple[int, ...] = (),
+            block_size: int = 4096,
+    ):
+        super().__init__(seed, spawn_key, block_size)
+        self._turn = -1
+        self._roll = 0
+        self._slab = b""
+
+    def __repr__(self):
+        return f"CommonDiceRNG(seed={self.seed}, spawn_key={self.spawn_key})"
+
+    def getstate(self) -> tuple:
+        return super().getstate() + (self._turn, self._roll, self._slab)
+
+    def setstate(self, state: tuple):
+        super().setstate(state[:6])
+        self._turn, self._roll, self._slab = state[6:]
+
+    def _header_extra(self) -> list:
+        return [self._turn, self._roll, self._slab.hex()]
+
+    def _restore_extra(self, extra: list):
+        turn, roll, slab = extra
+        self._turn, self._roll, self._slab = turn, roll, bytes.fromhex(slab)
+
+    def _keyed(self, n: int, turn: Optional[int]) -> bytes:
+        # the faces of the next roll of `turn`, or of the current turn
+        if turn is None:
+            turn = max(self._turn, 0)
+        if turn != self._turn:
+            if turn == 0 and self._turn > 0:
+                self.restart()
+            elif turn < self._turn:
+                raise ValueError(f"Turn {turn} was already rolled, now in turn {self._turn}")
+            size = 6 * self.ROLLS_PER_TURN
+            while self._turn < turn:
+                self._slab = self._take(size)
+                self._turn += 1
+            self._roll = 0
+        roll = self._roll
+        self._roll = roll + 1
+        if roll < self.ROLLS_PER_TURN and n <= 6:
+            return self._slab[6 * roll:6 * roll + n]
+        return DiceRNG(self.seed, self.spawn_key + (turn, roll), self.block_size)._take(n)
+
+    def restart(self):
+        """Go back to the start of the stream, before the first turn"""
+        self._random.seed(_derive(self.seed, self.spawn_key))
+        self._buffer = b""
+        self._pos = 0
+        self._n_children = 0
+        self._turn = -1
+        self._roll = 0
+        self._slab = b""
+
+    def roll_counts(self, n: int, turn: Optional[int] = None) -> DiceCounts:
+        """
+        Roll `n` dice, the next roll of `turn`
+
+        When `turn` is not given the roll belongs to the last turn rolled in,
+        or to the first turn
+        """
+        counts = [0] * 6
+        for face in self._keyed(n, turn):
+            counts[face] += 1
+        return tuple(counts)
+
+    def faces(self, n: int) -> List[int]:
+        """Roll `n` dice of the current turn and return their faces, from 1 to 6"""
+        return [face + 1 for face in self._keyed(n, None)]
@@ -0,0 +1,503 @@
+"""
+Precomputed scoring rules for Farkle
+
+Every roll of up to six dice is one of 924 multisets (923 if the empty roll is
+left out). Instead of re-checking every scoring rule on each call, the scoring
+options for all of them are computed once at import time and stored in a table
+keyed on the dice counts.
+
+Variants of the rules are described by a `RuleSet`, which is compiled into a
+table of its own in the same way.
+
+The canonical key for a set of dice is a tuple of six counts, where entry
+``i`` is the number of dice showing face ``i + 1``.
+"""
+from fractions import Fraction
+from functools import lru_cache
+from itertools import product
+from math import factorial
+from types import MappingProxyType
+from typing import Dict, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+DiceCounts = Tuple[int, int, int, int, int, int]
+_NO_COUNTS: DiceCounts = (0,) * 6
+
+
+class _Action(NamedTuple):
+    used: Mapping[int, int]
+    name: str
+    value: int
+
+
+class Action(_Action):
+    """
+    A scoring, roll, stop or bankrupt action
+
+    Actions are shared by every entry of the scoring tables, so `used` is
+    kept as a read-only view of the dice counts the action sets aside.
+    """
+    __slots__ = ()
+
+    def __new__(cls, used: Mapping[int, int], name: str, value: int):
+        return super().__new__(cls, MappingProxyType(dict(used)), name, value)
+
+    @classmethod
+    def _make(cls, iterable):
+        return cls(*iterable)
+
+    def __getnewargs__(self):
+        # a mappingproxy cannot be pickled
+        return dict(self.used), self.name, self.value
+
+    def __repr__(self):
+        return f"Action(used={dict(self.used)}, name={self.name!r}, value={self.value})"
+
+    def __str__(self):
+        if self.name.lower() in ["roll", "stop"]:
+            return self.name
+        else:
+            return f"Play {self.name} to score {self.value}"
+
+
+ROLL = Action({}, "roll", 0)
+STOP = Action({}, "stop", 0)
+BANKRUPT = Action({}, "bankrupt", 0)
+
+
+def remove_used(counts: Sequence[int], action: Action) -> DiceCounts:
+    """
+    The dice left after setting aside the dice used by `action`
+
+    Parameters
+    ----------
+    counts: Sequence[int]
+        The dice counts to play from
+    action: Action
+        The action played. Roll, stop and bankrupt use no dice
+
+    Returns
+    -------
+    left: DiceCounts
+        The dice left
+
+    Raises
+    ------
+    ValueError
+        If `action` uses dice that are not in `counts`
+    """
+    left = list(counts)
+    for k, v in action.used.items():
+        if left[k - 1] < v:
+            raise ValueError(f"Cannot play {action.name}, the dice were not rolled")
+        left[k - 1] -= v
+    return tuple(left)
+
+
+def highest_scoring(options: Sequence[Action]) -> Optional[Action]:
+    """
+    The scoring action worth the most among `options`, the first listed on
+    ties, or None when none of them uses dice. `ThresholdFarklePlayer` and
+    `farkle.batch.threshold_policy` both play this action
+    """
+    best = None
+    for action in options:
+        if action.used and (best is None or action.value > best.value):
+            best = action
+    return best
+
+
+def dice_to_roll(left: Sequence[int]) -> int:
+    """
+    The number of dice that can be rolled with `left` set on the table: all
+    of them, or all six again once every die has scored (hot dice)
+    """
+    return sum(left) or 6
+
+
+def play_counts(
+        counts: Sequence[int], turn_sum: int, action: Action, rules: "RuleSet"
+) -> Tuple[DiceCounts, int, int]:
+    """
+    Score `action` from `counts` with `turn_sum` at stake
+
+    Every transition that scores dice, in `State.play_dice`, the search
+    states and the solver, goes through here, so they agree on hot dice
+
+    Returns
+    -------
+    left, can_roll, turn_sum: Tuple[DiceCounts, int, int]
+        The dice left, the number of dice that can be rolled next and the
+        new turn sum, with `rules.hot_dice_bonus` added when every die has
+        scored
+
+    Raises
+    ------
+    ValueError
+        If `action` uses dice that are not in `counts`
+    """
+    left = remove_used(counts, action)
+    turn_sum += action.value
+    if not any(left):
+        # can pick them all up!
+        turn_sum += rules.hot_dice_bonus
+    return left, dice_to_roll(left), turn_sum
+
+
+class RuleSet(object):
+    """
+    A variant of the scoring rules, compiled into a scoring table
+
+    The point values of the combinations can be changed, and a value of 0
+    removes a combination from the game. Building a `RuleSet` applies the
+    rules to every multiset of dice up front, so games played with a variant
+    look their options up exactly like games played with the default rules.
+
+    Parameters
+    ----------
+    three_pairs: int, default=1500
+    four_of_a_kind: int, default=1000
+    five_of_a_kind: int, default=2000
+    six_of_a_kind: int, default=3000
+    straight: int, default=3000
+        The points scored by each combination
+    min_opening_score: int, default=0
+        A player with no points can only stop once their turn sum reaches
+        this score
+    hot_dice_bonus: int, default=0
+        Points added to the turn sum when every rolled die has been scored
+        and all six can be rolled again
+    combinations: bool, default=False
+        Offer every set of disjoint scoring groups as a single action worth
+        their summed value, e.g. "Three 2's + 1" for 300, instead of one
+        group per action. See `_combine`
+
+    Rule sets are immutable, as the table is compiled from the parameters and
+    rule sets are used as cache keys. Build a new one to change a rule.
+
+    `Farkle`, `State`, `farkle.search.SearchState` and
+    `farkle.trajectory.Trajectory` play and record games of any rule set, and
+    `farkle.odds`, `farkle.solver`, `farkle.mcts` and `farkle.replay` follow
+    the rules of the games or states they are given. The NumPy engines of
+    `farkle.batch` and `farkle.env`, and the runners built on them or on
+    default games (`farkle.sweep`, `farkle.evaluation`,
+    `farkle.tournament`), only play the default rules.
+    """
+    _PARAMS = (
+        "three_pairs", "four_of_a_kind", "five_of_a_kind", "six_of_a_kind",
+        "straight", "min_opening_score", "hot_dice_bonus", "combinations",
+    )
+
+    def __init__(
+            self,
+            three_pairs: int = 1500,
+            four_of_a_kind: int = 1000,
+            five_of_a_kind: int = 2000,
+            six_of_a_kind: int = 3000,
+            straight: int = 3000,
+            min_opening_score: int = 0,
+            hot_dice_bonus: int = 0,
+            combinations: bool = False,
+    ):
+        self.three_pairs = three_pairs
+        self.four_of_a_kind = four_of_a_kind
+        self.five_of_a_kind = five_of_a_kind
+        self.six_of_a_kind = six_of_a_kind
+        self.straight = straight
+        self.min_opening_score = min_opening_score
+        self.hot_dice_bonus = hot_dice_bonus
+        self.combinations = combinations
+        self.table: Dict[DiceCounts, Tuple[Action, ...]] = {
+            counts: _score(counts, self) for counts in all_dice_counts()
+        }
+        if combinations:
+            self.table = _combine(self.table)
+        self._actions = None
+        self._action_index = None
+        self._frozen = True
+
+    def __setattr__(self, key, value):
+        # the lazily built private lookups can still be filled in
+        if getattr(self, "_frozen", False) and not key.startswith("_"):
+            raise AttributeError("RuleSet is immutable, build a new one to change a rule")
+        object.__setattr__(self, key, value)
+
+    def __delattr__(self, key):
+        raise AttributeError("RuleSet is immutable, build a new one to change a rule")
+
+    def params(self) -> Dict[str, int]:
+        """The arguments the rule set was built with"""
+        return {k: getattr(self, k) for k in self._PARAMS}
+
+    def __eq__(self, other):
+        if not isinstance(other, RuleSet):
+            return NotImplemented
+        return self is other or self.params() == other.params()
+
+    def __hash__(self):
+        return hash(tuple(self.params().values()))
+
+    def __repr__(self):
+        changed = ", ".join(
+            f"{k}={v}" for k, v in self.params().items() if v != DEFAULT_RULES.params()[k]
+        )
+        return f"RuleSet({changed})"
+
+    def __reduce__(self):
+        return _rule_set, (self.params(),)
+
+    def options(self, counts: Sequence[int]) -> Tuple[Action, ...]:
+        """`scoring_options` under these rules"""
+        try:
+            return self.table[tuple(counts)]
+        except KeyError:
+            raise ValueError(f"Not a valid set of dice counts: {counts}") from None
+
+    @property
+    def actions(self) -> Tuple[Action, ...]:
+        """
+        `ACTIONS` with the point values of these rules, in the same order,
+        followed by the combined actions when `combinations` is set
+
+        Actions these rules never offer, such as a combination turned off
+        with a value of 0, keep their place so indices match across rule
+        sets, and are worth 0
+        """
+        if self._actions is None:
+            seen = {}
+            for options in self.table.values():
+                for action in options:
+                    seen.setdefault(_action_key(action), action)
+            actions = [seen.pop(_action_key(a), a._replace(value=0)) for a in ACTIONS]
+            self._actions = (*actions, *seen.values())
+        return self._actions
+
+    def action_index(self, action: Action) -> int:
+        """`action_index` into `actions`"""
+        if self._action_index is None:
+            self._action_index = {_action_key(a): i for i, a in enumerate(self.actions)}
+        try:
+            return self._action_index[_action_key(action)]
+        except KeyError:
+            raise ValueError(f"Unknown action: {action}") from None
+
+
+def _rule_set(params: Dict[str, int]) -> RuleSet:
+    # compiling a table takes tens of milliseconds, so every state, game or
+    # file decoded with the same rules shares one RuleSet
+    return _cached_rule_set(tuple(sorted(params.items())))
+
+
+@lru_cache(maxsize=None)
+def _cached_rule_set(params: Tuple[Tuple[str, int], ...]) -> RuleSet:
+    params = dict(params)
+    if params == DEFAULT_RULES.params():
+        return DEFAULT_RULES
+    return RuleSet(**params)
+
+
+def _score(counts: DiceCounts, rules: RuleSet) -> Tuple[Action, ...]:
+    """
+    Apply the scoring rules to a single multiset of dice
+
+    Parameters
+    ----------
+    counts: DiceCounts
+        The number of dice showing each face
+    rules: RuleSet
+        The point values of the combinations
+
+    Returns
+    -------
+    opportunities : Tuple[Action, ...]
+        Every single scoring group that can be played from `counts`
+    """
+    dice_counts = dict(zip(range(1, 7), counts))
+    opportunities = []
+
+    # Single dice opportunities
+    if dice_counts[1] > 0:
+        opportunities.append(Action({1: 1}, "1", 100))
+
+    if dice_counts[5] > 0:
+        opportunities.append(Action({5: 1}, "5", 50))
+
+    # Three pairs
+    pairs = [i for i in range(1, 7) if dice_counts[i] >= 2]
+    if len(pairs) == 3 and rules.three_pairs:
+        opportunities.append(Action({i: 2 for i in pairs}, "Three pairs", rules.three_pairs))
+
+    # Three of a kind
+    if dice_counts[1] >= 3:
+        opportunities.append(Action({1: 3}, "Three 1's", 1000))
+    for i in range(2, 7):
+        if dice_counts[i] >= 3:
+            opportunities.append(Action({i: 3}, f"Three {i}'s", i * 100))
+
+    for i in range(1, 7):
+        # Four of a kind
+        if dice_counts[i] >= 4 and rules.four_of_a_kind:
+            opportunities.append(Action({i: 4}, f"Four {i}'s", rules.four_of_a_kind))
+
+        # Five of a kind
+        if dice_counts[i] >= 5 and rules.five_of_a_kind:
+            opportunities.append(Action({i: 5}, f"Five {i}'s", rules.five_of_a_kind))
+
+        # Six of a kind
+        if dice_counts[i] == 6 and rules.six_of_a_kind:
+            opportunities.append(Action({i: 6}, f"Six {i}'s", rules.six_of_a_kind))
+
+    # Straight
+    if all(dice_counts[i] > 0 for i in range(1, 7)) and rules.straight:
+        opportunities.append(Action({i: 1 for i in range(1, 7)}, "1-2-3-4-5-6", rules.straight))
+
+    return tuple(opportunities)
+
+
+def _combine(
+        table: Dict[DiceCounts, Tuple[Action, ...]]
+) -> Dict[DiceCounts, Tuple[Action, ...]]:
+    """
+    Turn a table of single scoring groups into one of combined actions
+
+    For every multiset of dice that can be split entirely into scoring
+    groups, the split worth the most points is found once by dynamic
+    programming over the sub-multisets. The options of a roll are then the
+    best split of each of its scoring sub-multisets, so a roll offers one
+    action per distinct set of dice that can be kept.
+    """
+    # best split of exactly `counts`, as (value, groups), or None
+    best: Dict[DiceCounts, Optional[Tuple[int, Tuple[Action, ...]]]] = {_NO_COUNTS: (0, ())}
+    # visit smaller multisets first so every remainder is already solved
+    for counts in sorted(table, key=sum):
+        if counts == _NO_COUNTS:
+            continue
+        found = None
+        for group in table[counts]:
+            split = best[remove_used(counts, group)]
+            if split is not None and (found is None or group.value + split[0] > found[0]):
+                found = (group.value + split[0], (group, *split[1]))
+        best[counts] = found
+
+    def as_action(split):
+        value, groups = split
+        if len(groups) == 1:
+            return groups[0]
+        groups = sorted(groups, key=lambda g: (-g.value, g.name))
+        used: Dict[int, int] = {}
+        for group in groups:
+            for k, v in group.used.items():
+                used[k] = used.get(k, 0) + v
+        return Action(dict(sorted(used.items())), " + ".join(g.name for g in groups), value)
+
+    actions = {kept: as_action(split) for kept, split in best.items() if split and split[1]}
+    return {
+        counts: tuple(
+            actions[kept] for kept in product(*(range(c + 1) for c in counts))
+            if kept in actions
+        )
+        for counts in table
+    }
+
+
+def all_dice_counts(max_dice: int = 6):
+    """
+    Iterate over every multiset of at most `max_dice` dice
+
+    Yields
+    ------
+    counts : DiceCounts
+        The canonical counts key of each multiset
+    """
+    for counts in product(range(max_dice + 1), repeat=6):
+        if sum(counts) <= max_dice:
+            yield counts
+
+
+@lru_cache(maxsize=None)
+def roll_probabilities(n_dice: int) -> Dict[DiceCounts, Fraction]:
+    """
+    The exact probability of every outcome of rolling `n_dice` dice
+
+    Parameters
+    ----------
+    n_dice: int
+        The number of dice rolled, between 0 and 6
+
+    Returns
+    -------
+    probabilities : Dict[DiceCounts, Fraction]
+        Maps the counts key of each possible outcome to its multinomial
+        probability. The dict is cached and must not be modified.
+    """
+    out = {}
+    for counts in all_dice_counts(n_dice):
+        if sum(counts) == n_dice:
+            ways = factorial(n_dice)
+            for c in counts:
+                ways //= factorial(c)
+            out[counts] = Fraction(ways, 6 ** n_dice)
+    return out
+
+
+# The standard rules. Their table backs `scoring_options`
+DEFAULT_RULES = RuleSet()
+_SCORING_TABLE: Dict[DiceCounts, Tuple[Action, ...]] = DEFAULT_RULES.table
+
+
+def scoring_options(counts: Sequence[int]) -> Tuple[Action, ...]:
+    """
+    Look up the scoring actions available for a set of dice
+
+    Parameters
+    ----------
+    counts: Sequence[int]
+        A length 6 vector with the number of dice showing each face
+
+    Returns
+    -------
+    opportunities : Tuple[Action, ...]
+        The scoring actions (excluding roll and stop) for the dice. The
+        tuple is shared and must not be modified.
+    """
+    try:
+        return _SCORING_TABLE[tuple(counts)]
+    except KeyError:
+        raise ValueError(f"Not a valid set of dice counts: {counts}") from None
+
+
+def _action_key(action: Action):
+    return action.name, tuple(sorted(action.used.items()))
+
+
+def _catalogue() -> Tuple[Action, ...]:
+    seen = {}
+    for options in _SCORING_TABLE.values():
+        for action in options:
+            seen.setdefault(_action_key(action), action)
+    return (*seen.values(), ROLL, STOP, BANKRUPT)
+
+
+# Every distinct action that can be offered to a player, in a fixed order.
+# Scoring actions come first, followed by roll, stop and bankrupt
+ACTIONS: Tuple[Action, ...] = _catalogue()
+_ACTION_INDEX = {_action_key(a): i for i, a in enumerate(ACTIONS)}
+
+
+def action_index(action: Action) -> int:
+    """
+    Find the position of an action within `ACTIONS`
+
+    Parameters
+    ----------
+    action: Action
+        Any scoring, roll, stop or bankrupt action
+
+    Returns
+    -------
+    index : int
+        The index of the action in the fixed, global action space
+    """
+    try:
+        return _ACTION_INDEX[_action_key(action)]
+    except KeyError:
+        raise ValueError(f"Unknown action: {action}") from None
@@ -0,0 +1,153 @@
+"""
+A mutable game state with make/unmake moves for search
+
+`State` transitions build a new state on every step, which is what a game
+wants but is wasteful for a search that explores thousands of hypothetical
+steps and then walks back. `SearchState` holds the same fields in place:
+`apply` changes them and pushes an undo record, and `undo` pops it and
+restores the previous position, so a depth first search needs no `State` per
+node.
+
+It is not free of allocations: every `apply` builds the undo record tuple,
+and a scoring action also builds the tuple of dice left. Keeping the dice in
+a list updated in place with a preallocated undo stack was measured slower,
+as restoring the list on `undo` costs more than the small tuples.
+
+An undo record holds the action, the dice before it and the `can_roll` and
+`turn_sum` before it. That is all that changes within a turn; a stop also
+adds the turn sum to the player's score and moves to the next round, which
+`undo` reverses from the same record.
+"""
+from typing import List, Optional, Tuple
+
+from .gameplay import State, _NO_DICE, _may_stop
+from .rng import DiceRNG
+from .scoring import (
+    Action, DEFAULT_RULES, DiceCounts, ROLL, RuleSet, STOP, play_counts,
+)
+
+# (action, dice, can_roll, turn_sum) from before the action
+_Undo = Tuple[Action, DiceCounts, int, int]
+
+
+class SearchState(object):
+    """
+    A game position that is changed in place by `apply` and `undo`
+
+    Parameters
+    ----------
+    n_players: int
+        The number of players
+    rules: Optional[RuleSet]
+        The scoring rules, `farkle.scoring.DEFAULT_RULES` when not given
+    rng: Optional[DiceRNG or int]
+        Rolls the dice when `apply` is given a roll without an outcome
+    """
+    __slots__ = (
+        "n_players", "current_round", "scores", "can_roll", "dice", "turn_sum",
+        "rules", "rng", "_stack",
+    )
+
+    def __init__(
+            self,
+            n_players: int,
+            rules: Optional[RuleSet] = None,
+            rng: Optional[DiceRNG] = None,
+    ):
+        self.n_players = n_players
+        self.current_round = 0
+        self.scores: List[int] = [0] * n_players
+        self.can_roll = 6
+        self.dice: DiceCounts = _NO_DICE
+        self.turn_sum = 0
+        self.rules = DEFAULT_RULES if rules is None else rules
+        self.rng = rng if isinstance(rng, DiceRNG) else DiceRNG(rng)
+        self._stack: List[_Undo] = []
+
+    @classmethod
+    def from_state(cls, state: State, rng: Optional[DiceRNG] = None) -> "SearchState":
+        out = cls(len(state.scores), state.rules, rng)
+        out.current_round = state.current_round
+        out.scores = list(state.scores)
+        out.can_roll = state.can_roll
+        out.dice = state.dice_counts
+        out.turn_sum = state.turn_sum
+        return out
+
+    def to_state(self) -> State:
+        """The current position as a `State`"""
+        return State._make(
+            self.n_players, self.current_round, tuple(self.scores), self.can_roll,
+            self.dice, self.turn_sum, self.rules,
+        )
+
+    def __repr__(self):
+        return f"SearchState({self.to_state()!r}, depth={self.depth})"
+
+    @property
+    def depth(self) -> int:
+        """The number of actions that can be undone"""
+        return len(self._stack)
+
+    @property
+    def current_player(self) -> int:
+        return self.current_round % self.n_players
+
+    def options(self, out: Optional[List[Action]] = None) -> List[Action]:
+        """The actions available, as `State.enumerate_options` would list them"""
+        opportunities = self.rules.table[self.dice]
+        if out is None:
+            out = list(opportunities)
+        else:
+            out[:] = opportunities
+        if self.can_roll > 0:
+            out.append(ROLL)
+            if _may_stop(self.rules, self.turn_sum, self.scores[self.current_player]):
+                out.append(STOP)
+        return out
+
+    def apply(self, action: Action, outcome: Optional[DiceCounts] = None):
+        """
+        Play `action` in place
+
+        Parameters
+        ----------
+        action: Action
+            Any action `State` transitions accept: a scoring action, roll,
+            stop or bankrupt
+        outcome: Optional[DiceCounts]
+            The dice counts a roll comes up with. Drawn from `rng` when not
+            given, so a search can enumerate or sample chance outcomes
+        """
+        dice, can_roll, turn_sum = self.dice, self.can_roll, self.turn_sum
+        if action.used:
+            played = play_counts(dice, turn_sum, action, self.rules)
+            self._stack.append((action, dice, can_roll, turn_sum))
+            self.dice, self.can_roll, self.turn_sum = played
+            return
+
+        self._stack.append((action, dice, can_roll, turn_sum))
+        name = action.name.lower()
+        if name == "roll":
+            self.dice = self.rng.roll_counts(can_roll) if outcome is None else outcome
+            self.can_roll = 0
+        else:
+            # stop or bankrupt
+            if name == "stop":
+                self.scores[self.current_round % self.n_players] += turn_sum
+            self.current_round += 1
+            self.dice = _NO_DICE
+            self.can_roll = 6
+            self.turn_sum = 0
+
+    def undo(self) -> Action:
+        """Take back the last action given to `apply`, and return it"""
+        action, self.dice, self.can_roll, turn_sum = self._stack.pop()
+        if not action.used:
+            name = action.name.lower()
+            if name != "roll":
+                self.current_round -= 1
+                if name == "stop":
+                    self.scores[self.current_round % self.n_players] -= turn_sum
+        self.turn_sum = turn_sum
+        return action
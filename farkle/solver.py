@@ -0,0 +1,407 @@
+"""
+Solve for the turn policy that maximizes the expected points banked in a turn
+
+A turn is described by the dice left on the table, the number of dice that
+may be rolled and the points at stake (`turn_sum`). Because every scoring
+action adds at least 50 points, values at a given turn sum only depend on
+values at higher turn sums, so sweeping the turn sums from high to low solves
+the Bellman equations exactly. Turn sums above `max_turn_sum` are treated as
+banked straight away.
+
+The solution is stored in a `TurnPolicy`, which maps every decision point to
+the best action with a dict lookup and a list index. A policy is solved for
+one `RuleSet`. The turn sum does not say whether a player has opened yet, so
+`min_opening_score` is left to `OptimalFarklePlayer`, which plays the best
+action it is offered when the policy would stop too early.
+
+Solving the full table takes a few seconds, so `default_policy` saves it in
+the cache directory used by `farkle.odds`, once per `RuleSet`, and every
+later process only loads it. Tables are stored as plain arrays behind a JSON
+header, see `TurnPolicy.to_bytes`, so loading one never runs code.
+"""
+import json
+import struct
+import sys
+from array import array
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .gameplay import FarklePlayer, State
+from .odds import _cache_path, _write_atomic
+from .scoring import (
+    Action,
+    DEFAULT_RULES,
+    DiceCounts,
+    ROLL,
+    RuleSet,
+    STOP,
+    _rule_set,
+    all_dice_counts,
+    dice_to_roll,
+    play_counts,
+    roll_probabilities,
+)
+
+STEP = 50  # every score in the game is a multiple of 50
+_VERSION = 2
+_MAGIC = b"FKPL"
+# magic, version, size of the JSON header
+_POLICY_HEADER = struct.Struct("<4sHI")
+
+# (dice counts, whether the dice may be rolled)
+PolicyKey = Tuple[DiceCounts, bool]
+
+
+class SolveReport(NamedTuple):
+    """
+    Convergence information from `solve`
+
+    Attributes
+    ----------
+    sweeps: int
+        The number of value iteration sweeps performed
+    residuals: List[float]
+        The largest change in any value during each sweep
+    converged: bool
+        Whether the last residual was within the tolerance
+    """
+    sweeps: int
+    residuals: List[float]
+    converged: bool
+
+
+class TurnPolicy(object):
+    """
+    A solved table of optimal actions
+
+    Parameters
+    ----------
+    actions: Dict[PolicyKey, array]
+        The index into `rules.actions` of the best action, for every key and
+        every multiple of 50 up to `max_turn_sum`
+    values: Dict[PolicyKey, array]
+        The expected points banked by playing optimally from each decision
+    max_turn_sum: int
+        The largest turn sum in the table
+    report: Optional[SolveReport]
+        How the table was computed
+    rules: Optional[RuleSet]
+        The scoring rules the table was solved for,
+        `farkle.scoring.DEFAULT_RULES` when not given
+    """
+
+    def __init__(
+            self,
+            actions: Dict[PolicyKey, array],
+            values: Dict[PolicyKey, array],
+            max_turn_sum: int,
+            report: Optional[SolveReport] = None,
+            rules: Optional[RuleSet] = None,
+    ):
+        self.actions = actions
+        self.values = values
+        self.max_turn_sum = max_turn_sum
+        self.report = report
+        self.rules = DEFAULT_RULES if rules is None else rules
+
+    def _index(self, turn_sum: int) -> int:
+        return min(turn_sum, self.max_turn_sum) // STEP
+
+    def best_action(self, state: State) -> Action:
+        """The optimal action in `state`"""
+        key = (state.dice_counts, state.can_roll > 0)
+        return self.rules.actions[self.actions[key][self._index(state.turn_sum)]]
+
+    def value(self, state: State) -> float:
+        """The expected points banked this turn when playing optimally from `state`"""
+        key = (state.dice_counts, state.can_roll > 0)
+        return self.values[key][self._index(state.turn_sum)]
+
+    def action_value(self, state: State, action: Action) -> float:
+        """
+        The expected points banked this turn by playing `action` in `state`
+        and playing optimally afterwards
+        """
+        if action.used:
+            left, _, turn_sum = play_counts(state.dice_counts, state.turn_sum, action, self.rules)
+            if turn_sum > self.max_turn_sum:
+                return float(turn_sum)
+            return self.values[(left, True)][turn_sum // STEP]
+        if action == ROLL:
+            k = self._index(state.turn_sum)
+            return sum(
+                float(p) * self.values[(counts, False)][k]
+                for counts, p in roll_probabilities(state.can_roll).items()
+            )
+        return float(state.turn_sum)
+
+    @property
+    def turn_value(self) -> float:
+        """The expected points banked in a turn, before the first roll"""
+        return self.values[((0,) * 6, True)][0]
+
+    def to_bytes(self) -> bytes:
+        """
+        The table as a JSON header, holding the keys, the rules and the
+        report, followed by the raw action and value arrays of every key
+        """
+        keys = sorted(self.actions)
+        header = json.dumps({
+            "max_turn_sum": self.max_turn_sum,
+            "rules": self.rules.params(),
+            "report": None if self.report is None else list(self.report),
+            "keys": [[*counts, can_roll] for counts, can_roll in keys],
+            "byteorder": sys.byteorder,
+        }).encode()
+        return b"".join((
+            _POLICY_HEADER.pack(_MAGIC, _VERSION, len(header)),
+            header,
+            *(self.actions[k].tobytes() for k in keys),
+            *(self.values[k].tobytes() for k in keys),
+        ))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TurnPolicy":
+        """
+        Rebuild a table from `to_bytes`
+
+        Raises
+        ------
+        ValueError
+            If `data` is not a complete table
+        """
+        try:
+            magic, version, n_header = _POLICY_HEADER.unpack_from(data)
+        except struct.error:
+            raise ValueError("Not a farkle turn policy") from None
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Not a farkle turn policy")
+        offset = _POLICY_HEADER.size
+        header = json.loads(bytes(data[offset:offset + n_header]).decode())
+        offset += n_header
+
+        n = header["max_turn_sum"] // STEP + 1
+        keys = [(tuple(k[:6]), bool(k[6])) for k in header["keys"]]
+        if len(data) != offset + len(keys) * n * 9:
+            raise ValueError("The turn policy is cut short")
+        actions = {}
+        for key in keys:
+            actions[key] = array("B", data[offset:offset + n])
+            offset += n
+        values = {}
+        for key in keys:
+            values[key] = array("d", data[offset:offset + 8 * n])
+            if header["byteorder"] != sys.byteorder:
+                values[key].byteswap()
+            offset += 8 * n
+        report = header["report"]
+        return cls(
+            actions,
+            values,
+            header["max_turn_sum"],
+            None if report is None else SolveReport(*report),
+            _rule_set(header["rules"]),
+        )
+
+    def save(self, path: str):
+        """Write the table to `path`, see `to_bytes`"""
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "TurnPolicy":
+        """Load a table written by `save`"""
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+def solve(
+        max_turn_sum: int = 20_000,
+        tol: float = 1e-9,
+        max_sweeps: int = 10,
+        rules: Optional[RuleSet] = None,
+) -> TurnPolicy:
+    """
+    Compute the expected-value optimal policy for a single turn
+
+    Parameters
+    ----------
+    max_turn_sum: int, default=20_000
+        Turn sums above this are treated as banked. Rolling stays worthwhile
+        with six dice until roughly 16,000 points, so the default covers
+        every decision the optimal policy faces
+    tol: float, default=1e-9
+        Stop once no value changes by more than this in a sweep
+    max_sweeps: int, default=10
+        The maximum number of value iteration sweeps
+    rules: Optional[RuleSet]
+        The scoring rules to solve for, `farkle.scoring.DEFAULT_RULES` when
+        not given. Every point value must be a multiple of 50
+
+    Returns
+    -------
+    policy: TurnPolicy
+        The solved policy, with the convergence report in `policy.report`
+    """
+    rules = DEFAULT_RULES if rules is None else rules
+    point_values = [a.value for a in rules.actions] + [rules.hot_dice_bonus]
+    if any(v % STEP for v in point_values):
+        raise ValueError(f"Every point value must be a multiple of {STEP}")
+    roll_index = rules.action_index(ROLL)
+    stop_index = rules.action_index(STOP)
+
+    n = max_turn_sum // STEP + 1
+    rolling_keys = list(all_dice_counts())
+
+    def transition(counts: DiceCounts, action: Action):
+        # the action index, the dice left and the points added in steps
+        left, _, value = play_counts(counts, 0, action, rules)
+        return rules.action_index(action), left, value // STEP
+
+    # every decision point, with the actions available and the dice they leave
+    transitions = {
+        counts: [transition(counts, a) for a in rules.options(counts)]
+        for counts in rolling_keys
+    }
+    probabilities = [
+        [(counts, float(p)) for counts, p in roll_probabilities(n_dice).items()]
+        for n_dice in range(7)
+    ]
+
+    # values[key][k] for turn sum k * STEP
+    values = {(c, r): [0.0] * n for c in rolling_keys for r in (False, True)}
+    actions = {key: array("B", bytes(n)) for key in values}
+
+    def after_play(counts: DiceCounts, k: int) -> float:
+        # value of a state reached by scoring, where the dice may be rolled
+        if k >= n:
+            return float(k * STEP)
+        return values[(counts, True)][k]
+
+    residuals = []
+    for _ in range(max_sweeps):
+        residual = 0.0
+        for k in range(n - 1, -1, -1):
+            turn_sum = float(k * STEP)
+
+            # just rolled: some dice must be scored, otherwise the turn is lost
+            for counts in rolling_keys:
+                best, best_action = 0.0, 0
+                for i, rest, v in transitions[counts]:
+                    value = after_play(rest, k + v)
+                    if value > best:
+                        best, best_action = value, i
+                residual = max(residual, abs(values[(counts, False)][k] - best))
+                values[(counts, False)][k] = best
+                actions[(counts, False)][k] = best_action
+
+            # the expected value of rolling each number of dice
+            roll_value = [0.0] * 7
+            for n_dice in range(1, 7):
+                roll_value[n_dice] = sum(
+                    p * values[(counts, False)][k] for counts, p in probabilities[n_dice]
+                )
+
+            # after scoring: keep scoring, roll the remaining dice or stop
+            for counts in rolling_keys:
+                best, best_action = turn_sum, stop_index
+                can_roll = dice_to_roll(counts)
+                if roll_value[can_roll] > best:
+                    best, best_action = roll_value[can_roll], roll_index
+                for i, rest, v in transitions[counts]:
+                    value = after_play(rest, k + v)
+                    if value > best:
+                        best, best_action = value, i
+                residual = max(residual, abs(values[(counts, True)][k] - best))
+                values[(counts, True)][k] = best
+                actions[(counts, True)][k] = best_action
+
+        residuals.append(residual)
+        if residual <= tol:
+            break
+
+    report = SolveReport(len(residuals), residuals, residuals[-1] <= tol)
+    return TurnPolicy(
+        actions,
+        {key: array("d", v) for key, v in values.items()},
+        (n - 1) * STEP,
+        report,
+        rules,
+    )
+
+
+@lru_cache(maxsize=None)
+def default_policy(
+        rules: RuleSet = DEFAULT_RULES, cache_dir: Optional[str] = None
+) -> TurnPolicy:
+    """
+    The policy `solve` finds for `rules` with its default settings
+
+    Parameters
+    ----------
+    rules: RuleSet, default=DEFAULT_RULES
+        The scoring rules to solve for
+    cache_dir: Optional[str]
+        Where the solved tables are saved, see `farkle.odds`. The table is
+        solved without being saved when the directory can not be written to
+
+    Returns
+    -------
+    policy: TurnPolicy
+        The policy is cached and must not be modified
+    """
+    path = _cache_path(cache_dir, rules, f"policy-v{_VERSION}", ".bin")
+    try:
+        policy = TurnPolicy.load(path)
+        if policy.rules == rules:
+            return policy
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    policy = solve(rules=rules)
+    try:
+        _write_atomic(path, policy.to_bytes())
+    except OSError:
+        pass
+    return policy
+
+
+class OptimalFarklePlayer(FarklePlayer):
+    """
+    Plays the action that maximizes the expected points banked this turn
+
+    Parameters
+    ----------
+    policy: Optional[TurnPolicy]
+        A solved table, for example from `TurnPolicy.load`. When not given
+        the table of `default_policy` for `rules` is used
+    rules: Optional[RuleSet]
+        The scoring rules of the games played, `policy.rules` or
+        `farkle.scoring.DEFAULT_RULES` when not given
+
+    Raises
+    ------
+    ValueError
+        If `policy` was solved for other rules, here or when asked to act in
+        a game played with other rules
+    """
+    name = "optimal_robot"
+
+    def __init__(self, policy: Optional[TurnPolicy] = None, rules: Optional[RuleSet] = None):
+        if policy is None:
+            policy = default_policy(DEFAULT_RULES if rules is None else rules)
+        elif rules is not None and rules != policy.rules:
+            raise ValueError(f"The policy was solved for {policy.rules!r}, not {rules!r}")
+        self.policy = policy
+
+    def act(self, state: State, choices: List[Action]) -> Action:
+        if state.rules != self.policy.rules:
+            raise ValueError(
+                f"The policy was solved for {self.policy.rules!r}, "
+                f"the game is played with {state.rules!r}"
+            )
+        action = self.policy.best_action(state)
+        if action in choices:
+            return action
+        # the policy stops below the opening score, play the best action left
+        return max(choices, key=lambda a: self.policy.action_value(state, a))
@@ -0,0 +1,170 @@
+"""
+Evaluate a whole grid of threshold players at once
+
+`sweep_thresholds` plays every setting of a grid of `ThresholdFarklePlayer`
+thresholds against a fixed opponent in one `farkle.batch.BatchFarkle` per
+chunk of settings, with the games of every setting rolling the same keyed
+dice. The differences between settings then come from the thresholds and not
+from the dice, and the chunks can be spread over a pool of processes without
+changing the results.
+
+A grid built by `threshold_grid` from one list of values per number of dice
+gives results that reshape into a surface, for example::
+
+    values = [[300], [300], [200, 300, 400], [300], [250, 350], [300]]
+    result = sweep_thresholds(threshold_grid(values), 10_000, seed=0)
+    surface = result.win_rate.reshape([len(v) for v in values])
+"""
+import random
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import product
+from numbers import Integral
+from typing import NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+from .batch import BatchFarkle, threshold_policy
+
+
+def threshold_grid(values: Sequence[Union[int, Sequence[int]]]) -> np.ndarray:
+    """
+    Every combination of thresholds
+
+    Parameters
+    ----------
+    values: Sequence[int or Sequence[int]]
+        The thresholds to try with 1, 2, ... 6 dice left to roll. A single
+        number is kept fixed
+
+    Returns
+    -------
+    grid: np.ndarray
+        An ``(n_settings, 6)`` array, the last number of dice varying fastest
+    """
+    if len(values) != 6:
+        raise ValueError("Need thresholds for each number of dice, from 1 to 6")
+    axes = [[v] if isinstance(v, Integral) else list(v) for v in values]
+    return np.array(list(product(*axes)), dtype=np.int64).reshape(-1, 6)
+
+
+class SweepResult(NamedTuple):
+    """
+    Attributes
+    ----------
+    thresholds: np.ndarray
+        The ``(n_settings, 6)`` settings swept
+    n_games: int
+        The number of games played by each setting
+    win_rate: np.ndarray
+        The share of the games won by each setting, ties split evenly
+    win_std_error: np.ndarray
+        The standard error of each win rate
+    mean_score: np.ndarray
+        The mean final score of each setting
+    """
+    thresholds: np.ndarray
+    n_games: int
+    win_rate: np.ndarray
+    win_std_error: np.ndarray
+    mean_score: np.ndarray
+
+
+def _play_settings(
+        thresholds: np.ndarray,
+        opponent: np.ndarray,
+        n_games: int,
+        n_players: int,
+        points_to_win: int,
+        seed: int,
+):
+    # the win shares and scores of a chunk of settings, one row per setting
+    n_settings = len(thresholds)
+    n = n_settings * n_games
+    game = np.tile(np.arange(n_games), n_settings)
+    # the setting plays seat g % n_players of game g, the opponent the others
+    seat = game % n_players
+    tables = np.broadcast_to(opponent, (n_players, n, 6)).copy()
+    tables[seat, np.arange(n)] = np.repeat(thresholds, n_games, axis=0)
+    policies = [threshold_policy(t) for t in tables]
+
+    sim = BatchFarkle(n, n_players, policies, points_to_win, seed=seed, game_ids=game)
+    sim.play()
+    scores = sim.scores
+    mine = scores[np.arange(n), seat]
+    best = scores.max(axis=1)
+    wins = (mine == best) / (scores == best[:, None]).sum(axis=1)
+    return wins.reshape(n_settings, n_games), mine.reshape(n_settings, n_games)
+
+
+def sweep_thresholds(
+        grid,
+        n_games: int,
+        opponent: Union[int, Sequence[int]] = 300,
+        n_players: int = 2,
+        points_to_win: int = 10_000,
+        seed: Optional[int] = None,
+        batch_size: int = 100_000,
+        n_workers: int = 1,
+) -> SweepResult:
+    """
+    Play every threshold setting of `grid` against the same opponents
+
+    Game ``g`` of every setting rolls the same dice, keyed by ``g``, the
+    turn and the roll within the turn, and the setting plays seat
+    ``g % n_players`` so the first player advantage is shared out evenly.
+
+    Parameters
+    ----------
+    grid: array_like
+        An ``(n_settings, 6)`` array of thresholds, see `threshold_grid`
+    n_games: int
+        The number of games played by each setting, at least 2 for the
+        standard errors
+    opponent: int or Sequence[int], default=300
+        The thresholds of the player in every other seat
+    n_players: int, default=2
+        The number of players in each game
+    points_to_win: int, default=10_000
+        The score needed to end a game
+    seed: Optional[int]
+        Seeds the dice. A random seed is chosen if not given
+    batch_size: int, default=100_000
+        About the number of games simulated at once by one `BatchFarkle`.
+        Settings are split into chunks of that many games
+    n_workers: int, default=1
+        The number of processes to play chunks in. Chunks are played in this
+        process when 1
+
+    Returns
+    -------
+    result: SweepResult
+    """
+    if n_games < 2:
+        raise ValueError("Need at least 2 games per setting to estimate the standard error")
+    grid = np.asarray(grid, dtype=np.int64).reshape(-1, 6)
+    opponent = np.broadcast_to(np.asarray(opponent, dtype=np.int64), (6,))
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(63)
+
+    per_chunk = max(1, batch_size // n_games)
+    chunks = [grid[i:i + per_chunk] for i in range(0, len(grid), per_chunk)]
+    play = partial(
+        _play_settings, opponent=opponent, n_games=n_games, n_players=n_players,
+        points_to_win=points_to_win, seed=seed,
+    )
+    if n_workers <= 1:
+        results = list(map(play, chunks))
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(play, chunks))
+
+    wins = np.concatenate([w for w, _ in results])
+    scores = np.concatenate([s for _, s in results])
+    return SweepResult(
+        grid,
+        n_games,
+        wins.mean(axis=1),
+        wins.std(axis=1, ddof=1) / np.sqrt(n_games),
+        scores.mean(axis=1),
+    )
@@ -0,0 +1,243 @@
+"""
+Run many games of Farkle in parallel across a pool of processes
+"""
+import os
+import pickle
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import starmap
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from .gameplay import Farkle, FarklePlayer
+from .rng import DiceRNG
+
+PlayerFactory = Callable[[], FarklePlayer]
+
+
+class TournamentResult(NamedTuple):
+    """
+    Aggregated outcome of a tournament
+
+    Attributes
+    ----------
+    n_games: int
+        The number of games played
+    wins: List[float]
+        The number of games won by each seat. A game won jointly by several
+        players is split evenly between them
+    scores: List[List[int]]
+        The final score of each seat, one list per seat with one entry per game
+    game_lengths: List[int]
+        The number of turns played in each game
+    """
+    n_games: int
+    wins: List[float]
+    scores: List[List[int]]
+    game_lengths: List[int]
+
+    @property
+    def win_rates(self) -> List[float]:
+        return [w / self.n_games for w in self.wins]
+
+
+def _combine(n_players: int, chunks) -> TournamentResult:
+    n_games = 0
+    wins = [0.0] * n_players
+    scores: List[List[int]] = [[] for _ in range(n_players)]
+    game_lengths: List[int] = []
+    for chunk in chunks:
+        n_games += chunk.n_games
+        for i in range(n_players):
+            wins[i] += chunk.wins[i]
+            scores[i].extend(chunk.scores[i])
+        game_lengths.extend(chunk.game_lengths)
+
+    return TournamentResult(n_games, wins, scores, game_lengths)
+
+
+def _play_chunk(
+        factories: Sequence[PlayerFactory],
+        n_games: int,
+        points_to_win: int,
+        seed: int,
+        chunk: int,
+) -> TournamentResult:
+    # every chunk rolls dice from its own child stream of the tournament seed.
+    # Players that draw from the module level generator get a reproducible
+    # stream too, as each chunk is alone in its process while it runs. The
+    # generator is put back afterwards, as chunks also run in the caller's
+    # process
+    saved = random.getstate()
+    random.seed(repr((seed, chunk)))
+    try:
+        return _play_games(factories, n_games, points_to_win, DiceRNG(seed, spawn_key=(chunk,)))
+    finally:
+        random.setstate(saved)
+
+
+def _play_games(
+        factories: Sequence[PlayerFactory], n_games: int, points_to_win: int, rng: DiceRNG
+) -> TournamentResult:
+    n_players = len(factories)
+    wins = [0.0] * n_players
+    scores: List[List[int]] = [[] for _ in range(n_players)]
+    game_lengths = []
+    for _ in range(n_games):
+        game = Farkle([f() for f in factories], points_to_win=points_to_win, rng=rng)
+        game.play_fast()
+        final = game.state.scores
+        best = max(final)
+        winners = [i for i in range(n_players) if final[i] == best]
+        for i in winners:
+            wins[i] += 1 / len(winners)
+        for i in range(n_players):
+            scores[i].append(final[i])
+        game_lengths.append(game.state.current_round)
+
+    return TournamentResult(n_games, wins, scores, game_lengths)
+
+
+def _factory_name(factory: PlayerFactory) -> str:
+    # how the factory is found in the worker processes, so a checkpoint can
+    # tell the players of a run apart. Callables without a qualified name,
+    # such as a `functools.partial`, are told apart by their repr
+    qualname = getattr(factory, "__qualname__", None)
+    if qualname is None:
+        return repr(factory)
+    return f"{factory.__module__}.{qualname}"
+
+
+def _read_checkpoint(path: str) -> Optional[tuple]:
+    # the settings of the run followed by (chunk, result) pairs. Returns them
+    # with the end of the last complete pair, a pair cut short by an
+    # interruption is dropped. A file without complete settings was cut
+    # short before any chunk was saved, and counts as no checkpoint
+    if not os.path.exists(path):
+        return None
+    done: Dict[int, TournamentResult] = {}
+    with open(path, "rb") as f:
+        try:
+            settings = pickle.load(f)
+        except (EOFError, pickle.UnpicklingError):
+            return None
+        end = f.tell()
+        while True:
+            try:
+                chunk, result = pickle.load(f)
+            except (EOFError, pickle.UnpicklingError):
+                break
+            done[chunk] = result
+            end = f.tell()
+    return settings, done, end
+
+
+def run_tournament(
+        factories: Sequence[PlayerFactory],
+        n_games: int,
+        n_workers: Optional[int] = None,
+        points_to_win: int = 10_000,
+        seed: Optional[int] = None,
+        chunk_size: int = 250,
+        checkpoint: Optional[str] = None,
+) -> TournamentResult:
+    """
+    Play `n_games` games between the players built by `factories`
+
+    The games are split into chunks that are played on a
+    `ProcessPoolExecutor`. Each chunk rolls its dice from an independent
+    `DiceRNG` stream derived from `seed` and the chunk number only, so results
+    are reproducible and do not depend on `n_workers`. Each chunk also
+    reseeds the module level `random` generator while it runs, for players
+    such as `RandomFarklePlayer` that draw from it, and restores its state
+    when it is done.
+
+    Parameters
+    ----------
+    factories: Sequence[PlayerFactory]
+        One zero argument callable per seat that creates a fresh player. They
+        are sent to the worker processes, so they must be picklable (a
+        `FarklePlayer` subclass or a module level function, not a lambda)
+    n_games: int
+        The total number of games to play
+    n_workers: Optional[int]
+        The number of worker processes. Defaults to the number of CPUs. With
+        ``n_workers=1`` the games are played in the calling process, without
+        a pool
+    points_to_win: int, default=10_000
+        Passed on to `Farkle`
+    seed: Optional[int]
+        The tournament seed. A random seed is chosen if not given
+    chunk_size: int, default=250
+        The number of games given to a worker at a time
+    checkpoint: Optional[str]
+        A file that the result of every chunk is appended to as soon as it
+        is done. Running the same tournament again with the same file skips
+        the chunks already in it, so an interrupted run resumes where it
+        stopped with the same result it would have had. The seed is saved
+        too, so it need not be given to resume a run that chose its own. The
+        module and qualified name of every factory are saved with the other
+        settings, and a run with other players does not resume from the file
+
+    Returns
+    -------
+    result: TournamentResult
+        The win counts, final scores and game lengths of every seat
+    """
+    if n_games < 1:
+        raise ValueError("Need at least one game")
+    done: Dict[int, TournamentResult] = {}
+    saved = _read_checkpoint(checkpoint) if checkpoint is not None else None
+    if saved is not None:
+        done = saved[1]
+        if seed is None:
+            seed = saved[0]["seed"]
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+
+    settings = {
+        "n_players": len(factories),
+        "players": [_factory_name(f) for f in factories],
+        "n_games": n_games,
+        "points_to_win": points_to_win,
+        "seed": seed,
+        "chunk_size": chunk_size,
+    }
+    if saved is not None:
+        if saved[0] != settings:
+            raise ValueError(f"{checkpoint} belongs to a different tournament: {saved[0]}")
+        os.truncate(checkpoint, saved[2])
+
+    sizes = [min(chunk_size, n_games - start) for start in range(0, n_games, chunk_size)]
+    args = [
+        (factories, size, points_to_win, seed, i)
+        for (i, size) in enumerate(sizes)
+        if i not in done
+    ]
+
+    if checkpoint is None:
+        if n_workers == 1:
+            return _combine(len(factories), starmap(_play_chunk, args))
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            return _combine(len(factories), pool.map(_play_chunk, *zip(*args)))
+
+    with open(checkpoint, "ab" if saved is not None else "wb") as f:
+        if saved is None:
+            pickle.dump(settings, f)
+
+        def save(chunk, result):
+            pickle.dump((chunk, result), f)
+            f.flush()
+            done[chunk] = result
+
+        if n_workers == 1:
+            for a in args:
+                save(a[-1], _play_chunk(*a))
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                futures = {pool.submit(_play_chunk, *a): a[-1] for a in args}
+                for future in as_completed(futures):
+                    save(futures[future], future.result())
+
+    return _combine(len(factories), (done[i] for i in range(len(sizes))))
@@ -0,0 +1,241 @@
+"""
+A compact, append-only record of the steps of a `Farkle` game
+
+Each step is stored as a fixed width binary record of 13 bytes: the action,
+the number of dice that could be rolled, the six dice counts and the turn sum
+of the state the action was played in. The round and the scores are not
+stored; they are recovered by replaying the stop and bankrupt actions from
+the start of the game, so full `State` objects are only built when a step is
+read.
+
+Trajectories can be written to a file, many after one another, and read back
+through a memory map without copying the records. The header of each one
+records the `RuleSet` the game was played with.
+"""
+import io
+import json
+import mmap
+import struct
+from typing import BinaryIO, Iterator, List, Optional, Sequence, Tuple, Union
+
+from . import gameplay
+from .instrument import action_type
+from .scoring import Action, _action_key, _rule_set
+
+_RECORD = struct.Struct("<HB6BI")
+_MAGIC = b"FKTR"
+_HEADER = struct.Struct("<4sBHIIQ")  # magic, version, n_players, round, n_extra, n_steps
+_VERSION = 2
+
+# the round and scores are remembered every so many steps to speed up reads
+_CHECKPOINT_EVERY = 1024
+
+
+class Trajectory(object):
+    """
+    The steps of one game, as ``(state, action)`` pairs
+
+    Parameters
+    ----------
+    n_players: int
+        The number of players in the game
+    start: Optional[State]
+        The state the game started from. A fresh `State` when not given
+    """
+
+    def __init__(self, n_players: int, start: Optional["gameplay.State"] = None):
+        if start is None:
+            start = gameplay.State(n_players)
+        self.n_players = n_players
+        self.rules = start.rules
+        self.start_round = start.current_round
+        self.start_scores = tuple(start.scores)
+        self._data: Union[bytearray, memoryview] = bytearray()
+        # actions outside of `rules.actions` get the ids after it
+        self._extra: List[Action] = []
+        self._ids = {}
+        self._checkpoints = [(self.start_round, self.start_scores)]
+
+    def __len__(self) -> int:
+        return len(self._data) // _RECORD.size
+
+    def __eq__(self, other):
+        if not isinstance(other, Trajectory):
+            return NotImplemented
+        return (
+            self.n_players == other.n_players
+            and self.rules == other.rules
+            and self.start_round == other.start_round
+            and self.start_scores == other.start_scores
+            and list(self) == list(other)
+        )
+
+    def __repr__(self):
+        return f"Trajectory({self.n_players} players, {len(self)} steps)"
+
+    @property
+    def nbytes(self) -> int:
+        """The size of the step records"""
+        return len(self._data)
+
+    def _action_id(self, action: Action) -> int:
+        key = _action_key(action)
+        if key not in self._ids:
+            try:
+                self._ids[key] = self.rules.action_index(action)
+            except ValueError:
+                self._extra.append(action)
+                self._ids[key] = len(self.rules.actions) + len(self._extra) - 1
+        return self._ids[key]
+
+    def _action(self, action_id: int) -> Action:
+        actions = self.rules.actions
+        if action_id < len(actions):
+            return actions[action_id]
+        return self._extra[action_id - len(actions)]
+
+    def append(self, state: "gameplay.State", action: Action):
+        """Record that `action` was played in `state`"""
+        if not isinstance(self._data, bytearray):
+            raise TypeError("A trajectory read from a file can not be appended to")
+        self._data += _RECORD.pack(
+            self._action_id(action), state.can_roll, *state.dice_counts, state.turn_sum
+        )
+
+    def _records(self, start: int, stop: int):
+        data = self._data
+        for i in range(start, stop):
+            yield _RECORD.unpack_from(data, i * _RECORD.size)
+
+    def _apply(self, current_round: int, scores: List[int], record) -> int:
+        # update the scores in place and return the round after `record`
+        kind = action_type(self._action(record[0]))
+        if kind == "stop":
+            scores[current_round % self.n_players] += record[8]
+        if kind in ("stop", "bankrupt"):
+            current_round += 1
+        return current_round
+
+    def _step(
+            self, current_round: int, scores: List[int], record
+    ) -> Tuple["gameplay.State", Action]:
+        state = gameplay.State._make(
+            self.n_players,
+            current_round,
+            tuple(scores),
+            record[1],
+            tuple(record[2:8]),
+            record[8],
+            self.rules,
+        )
+        return state, self._action(record[0])
+
+    def __iter__(self) -> Iterator[Tuple["gameplay.State", Action]]:
+        current_round, scores = self.start_round, list(self.start_scores)
+        for record in self._records(0, len(self)):
+            yield self._step(current_round, scores, record)
+            current_round = self._apply(current_round, scores, record)
+
+    def __getitem__(self, i: int) -> Tuple["gameplay.State", Action]:
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("trajectory index out of range")
+
+        k = i // _CHECKPOINT_EVERY
+        while len(self._checkpoints) <= k:
+            last = len(self._checkpoints) - 1
+            current_round, scores = self._checkpoints[last]
+            scores = list(scores)
+            for record in self._records(
+                    last * _CHECKPOINT_EVERY, (last + 1) * _CHECKPOINT_EVERY
+            ):
+                current_round = self._apply(current_round, scores, record)
+            self._checkpoints.append((current_round, tuple(scores)))
+
+        current_round, scores = self._checkpoints[k]
+        scores = list(scores)
+        for record in self._records(k * _CHECKPOINT_EVERY, i):
+            current_round = self._apply(current_round, scores, record)
+        return self._step(current_round, scores, next(self._records(i, i + 1)))
+
+    def dump(self, f: Union[str, BinaryIO]):
+        """
+        Write the trajectory to `f`, a path or a binary file. Writing several
+        trajectories to the same open file stores them one after another
+        """
+        if isinstance(f, str):
+            with open(f, "wb") as fh:
+                return self.dump(fh)
+
+        extra = json.dumps({
+            "rules": self.rules.params(),
+            "actions": [[dict(a.used), a.name, a.value] for a in self._extra],
+        }).encode()
+        f.write(_HEADER.pack(
+            _MAGIC, _VERSION, self.n_players, self.start_round, len(extra), len(self)
+        ))
+        f.write(struct.pack(f"<{self.n_players}q", *self.start_scores))
+        f.write(extra)
+        f.write(self._data)
+
+    def to_bytes(self) -> bytes:
+        """The trajectory as written by `dump`"""
+        f = io.BytesIO()
+        self.dump(f)
+        return f.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Trajectory":
+        """Read a trajectory from `to_bytes`. Unlike `load` it can be appended to"""
+        out, _ = cls._from_buffer(data, 0)
+        out._data = bytearray(out._data)
+        return out
+
+    @classmethod
+    def _from_buffer(cls, buffer: Sequence, offset: int) -> Tuple["Trajectory", int]:
+        magic, version, n_players, start_round, n_extra, n_steps = _HEADER.unpack_from(
+            buffer, offset
+        )
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Not a farkle trajectory")
+        offset += _HEADER.size
+        scores = struct.unpack_from(f"<{n_players}q", buffer, offset)
+        offset += 8 * n_players
+        extra = json.loads(bytes(buffer[offset:offset + n_extra]).decode())
+        offset += n_extra
+
+        out = cls(n_players, gameplay.State(n_players, _rule_set(extra["rules"])))
+        out.start_round = start_round
+        out.start_scores = scores
+        out._checkpoints = [(start_round, scores)]
+        out._extra = [Action({int(k): v for k, v in used.items()}, name, value)
+                      for used, name, value in extra["actions"]]
+        end = offset + n_steps * _RECORD.size
+        out._data = memoryview(buffer)[offset:end]
+        return out, end
+
+    @classmethod
+    def load_all(cls, path: str, use_mmap: bool = True) -> Iterator["Trajectory"]:
+        """
+        Read every trajectory stored in the file at `path`
+
+        With `use_mmap` the records are read lazily through a read-only memory
+        map of the file instead of being loaded into memory
+        """
+        with open(path, "rb") as f:
+            if use_mmap:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                buffer = f.read()
+
+        offset = 0
+        while offset < len(buffer):
+            trajectory, offset = cls._from_buffer(buffer, offset)
+            yield trajectory
+
+    @classmethod
+    def load(cls, path: str, use_mmap: bool = True) -> "Trajectory":
+        """Read the first trajectory stored in the file at `path`"""
+        return next(cls.load_all(path, use_mmap))
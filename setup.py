@@ -24,6 +24,7 @@ setup(
     long_description=read("README.rst"),
     packages=find_packages(exclude=("tests",)),
     install_requires=[],
+    extras_require={"numpy": ["numpy"], "parquet": ["pyarrow"]},
     classifiers=[
         "Development Status :: 2 - Pre-Alpha",
         "License :: OSI Approved :: MIT License",
@@ -0,0 +1,111 @@
+import random
+
+from farkle import Dice, Farkle, RandomFarklePlayer, State, ThresholdFarklePlayer
+from farkle.scoring import ACTIONS, all_dice_counts, scoring_options
+from pytest import importorskip, raises
+
+np = importorskip("numpy")
+batch = importorskip("farkle.batch")
+
+
+def test_legal_mask_matches_enumerate_options():
+    counts = np.array(list(all_dice_counts()))
+    for can_roll in (0, 3):
+        mask = batch.legal_mask(counts, np.full(len(counts), can_roll))
+        for row, c in zip(mask, counts):
+            s = State(2)
+            s.rolled_dice = [Dice(f + 1) for f in range(6) for _ in range(c[f])]
+            s.can_roll = can_roll
+            want = s.enumerate_options()
+            got = [ACTIONS[i] for i in np.flatnonzero(row)]
+            assert len(got) == len(want)
+            assert all(a in want for a in got)
+
+
+def test_illegal_action_raises():
+    def always_stop(sim, rows, mask):
+        return np.full(len(rows), batch.STOP_INDEX)
+
+    sim = batch.BatchFarkle(10, 2, always_stop, seed=0)
+    with raises(ValueError):
+        sim.step()
+        sim.step()
+
+
+def test_matches_farkle_statistics():
+    n, points = 2000, 2000
+    sim = batch.BatchFarkle(
+        n, 2, batch.random_policy(np.random.default_rng(0)), points_to_win=points, seed=1
+    )
+    winners = sim.play()
+    assert winners.any(axis=1).all()
+    assert (sim.current_round % 2 == 0).all()
+
+    random.seed(2)
+    rounds, scores = [], []
+    for _ in range(n):
+        game = Farkle([RandomFarklePlayer(), RandomFarklePlayer()], points_to_win=points)
+        game.play()
+        rounds.append(game.state.current_round)
+        scores.append(game.state.scores)
+
+    for a, b in [(sim.current_round, np.array(rounds)), (sim.scores, np.array(scores))]:
+        se = np.sqrt(a.var(axis=0) / n + b.var(axis=0) / n)
+        assert (np.abs(a.mean(axis=0) - b.mean(axis=0)) < 5 * se).all()
+
+
+def test_threshold_policy_matches_player():
+    thresholds = (50, 100, 200, 300, 400, 500)
+    player = ThresholdFarklePlayer(thresholds)
+    game = Farkle([RandomFarklePlayer(0), RandomFarklePlayer(1)], rng=0)
+    game.play()
+    states = [state for state, _ in game.history if state.enumerate_options()]
+
+    sim = batch.BatchFarkle(len(states), 2, batch.random_policy(), seed=0)
+    sim.dice[:] = [s.dice_counts for s in states]
+    sim.can_roll[:] = [s.can_roll for s in states]
+    sim.turn_sum[:] = [s.turn_sum for s in states]
+    rows = np.arange(len(states))
+    mask = batch.legal_mask(sim.dice, sim.can_roll)
+    # one table for all games or one row per game
+    for table in (thresholds, np.tile(thresholds, (len(states), 1))):
+        actions = batch.threshold_policy(table)(sim, rows, mask)
+        for state, i in zip(states, actions):
+            assert ACTIONS[i] == player.act(state, state.enumerate_options())
+    with raises(ValueError):
+        batch.threshold_policy([300] * 5)
+
+
+def test_threshold_policy_scores_like_the_player():
+    # every multiset that scores, including ties such as four 1's
+    counts = [c for c in all_dice_counts() if any(c) and scoring_options(c)]
+    player = ThresholdFarklePlayer(300)
+    sim = batch.BatchFarkle(len(counts), 2, batch.random_policy(), seed=0)
+    sim.dice[:] = counts
+    sim.can_roll[:] = 0
+    rows = np.arange(len(counts))
+    legal = batch.legal_mask(sim.dice, sim.can_roll)
+    actions = batch.threshold_policy([300] * 6)(sim, rows, legal)
+    for c, i in zip(counts, actions):
+        state = State(2)
+        state.rolled_dice = [Dice(f + 1) for f in range(6) for _ in range(c[f])]
+        state.can_roll = 0
+        assert ACTIONS[i] == player.act(state, state.enumerate_options())
+
+
+def test_game_ids_key_the_dice():
+    def play(policy, ids):
+        sim = batch.BatchFarkle(len(ids), 2, policy, points_to_win=1000, seed=3, game_ids=ids)
+        sim.play()
+        return sim
+
+    ids = np.array([0, 1, 0, 1])
+    sim = play(batch.threshold_policy([300] * 6), ids)
+    assert (sim.scores[0] == sim.scores[2]).all()
+    assert (sim.scores[1] == sim.scores[3]).all()
+    assert (sim.scores[0] != sim.scores[1]).any()
+
+    faces = batch.keyed_faces(7, np.zeros(60_000), np.arange(60_000), np.zeros(60_000))
+    assert (np.abs(np.bincount(faces.ravel()) / faces.size - 1 / 6) < 0.01).all()
+    with raises(ValueError):
+        batch.BatchFarkle(4, 2, batch.random_policy(), game_ids=[0, 1])
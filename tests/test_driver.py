@@ -0,0 +1,35 @@
+from farkle import Farkle, RandomFarklePlayer
+from farkle.driver import play_batched
+
+
+class CountingPlayer(RandomFarklePlayer):
+    def __init__(self, seed):
+        super().__init__(seed)
+        self.batches = []
+
+    def act_batch(self, states, choices_list):
+        self.batches.append(len(states))
+        return super().act_batch(states, choices_list)
+
+
+def test_play_batched():
+    player = CountingPlayer(0)
+    games = [Farkle([player, player], points_to_win=2000, rng=i) for i in range(50)]
+    results = play_batched(games)
+
+    assert len(results) == 50
+    assert all(any(winners.values()) for winners in results)
+    assert max(player.batches) == 50
+    assert sum(player.batches) < sum(len(g._history) for g in games)
+
+
+def test_decisions_match_play():
+    def game(seed):
+        return Farkle([RandomFarklePlayer(seed), RandomFarklePlayer(seed + 1)], rng=seed)
+
+    played = game(3)
+    winners = played.play()
+    batched = game(3)
+    assert play_batched([batched]) == [winners]
+    assert batched.state == played.state
+    assert batched._history == played._history
@@ -0,0 +1,58 @@
+from pytest import approx, importorskip, raises
+
+from farkle import Farkle, RandomFarklePlayer, State
+from farkle.rng import DiceRNG
+
+np = importorskip("numpy")
+encoding = importorskip("farkle.encoding")
+
+
+def states():
+    game = Farkle([RandomFarklePlayer(i) for i in range(3)], rng=0)
+    game.play()
+    return [state for state, _ in game.history]
+
+
+def test_layout():
+    encoder = encoding.StateEncoder(3, points_to_win=1000)
+    state = State(3).roll(DiceRNG(1))
+    state.scores = (100, 200, 300)
+    state.current_round = 4
+
+    row = encoder.encode(state)
+    assert row.shape == (encoder.size,) == (42 + 3 + 2,)
+    dice = row[encoder.layout["dice"]].reshape(6, 7)
+    assert (dice.sum(axis=1) == 1).all()
+    assert tuple(dice.argmax(axis=1)) == state.dice_counts
+    # seat 1 is to act, the others follow in seat order
+    assert row[encoder.layout["scores"]] == approx([0.2, 0.3, 0.1])
+    assert row[encoder.layout["turn_sum"]] == approx([0])
+    assert row[encoder.layout["can_roll"]] == approx([0])
+
+    buffer = encoder.empty()
+    assert encoder.encode(State(3), buffer) is buffer
+    assert buffer[encoder.layout["can_roll"]] == approx([1])
+
+
+def test_batch_matches_single():
+    encoder = encoding.StateEncoder(3)
+    batch = states()
+    buffer = encoder.empty(len(batch) + 5)
+    rows = encoder.encode_batch(batch, buffer)
+    assert rows.shape == (len(batch), encoder.size)
+    assert np.shares_memory(rows, buffer)
+    for state, row in zip(batch, rows):
+        assert (encoder.encode(state) == row).all()
+    with raises(ValueError):
+        encoder.encode_batch(batch, encoder.empty(3))
+
+
+def test_cache():
+    plain = encoding.StateEncoder(3)
+    cached = encoding.StateEncoder(3, cache_size=10)
+    batch = states()
+    for state in batch + batch:
+        assert (cached.encode(state) == plain.encode(state)).all()
+        assert len(cached._cache) <= 10
+    cached.clear_cache()
+    assert not cached._cache
@@ -0,0 +1,67 @@
+from farkle.scoring import ACTIONS
+from pytest import importorskip, raises
+
+np = importorskip("numpy")
+env_module = importorskip("farkle.env")
+
+
+def test_random_agent():
+    env = env_module.FarkleVectorEnv(8, n_players=3, agent_seat=1, points_to_win=1500, seed=0)
+    obs, mask = env.reset()
+    assert obs.shape == (8, env.observation_size)
+    assert mask.shape == (8, len(ACTIONS))
+    assert mask.any(axis=1).all()
+    # every game starts with the agent's first roll
+    assert (obs[:, 3] == 0).all()
+    assert (obs[:, 5:].sum(axis=1) == 6).all()
+
+    rng = np.random.default_rng(1)
+    banked = np.zeros(8)
+    finished = 0
+    for _ in range(2000):
+        actions = np.array([rng.choice(np.flatnonzero(row)) for row in mask])
+        obs2, mask2, reward, done = env.step(actions)
+        assert obs2 is obs and mask2 is mask
+        banked += reward
+        for i in np.flatnonzero(done):
+            finished += 1
+            assert banked[i] >= 0
+            banked[i] = 0
+        assert mask.any(axis=1).all()
+    assert finished > 0
+
+
+def test_reproducible():
+    def run(seed):
+        env = env_module.FarkleVectorEnv(4, n_players=3, points_to_win=1500, seed=seed)
+        obs, mask = env.reset()
+        seen = []
+        for _ in range(200):
+            # the first legal action, so only the dice and opponents vary
+            obs, mask, _, _ = env.step(mask.argmax(axis=1))
+            seen.append(obs.copy())
+        return np.array(seen)
+
+    assert (run(0) == run(0)).all()
+    assert (run(0) != run(1)).any()
+
+
+def test_illegal_action():
+    env = env_module.FarkleVectorEnv(2, seed=0)
+    _, mask = env.reset()
+    bad = np.array([np.flatnonzero(~row)[0] for row in mask])
+    with raises(ValueError):
+        env.step(bad)
+
+
+def test_games_ending_before_the_agent_acts():
+    # with so few points to win, some games end with the agent going bankrupt
+    # on its only roll, and must be restarted until it has a decision
+    env = env_module.FarkleVectorEnv(200, agent_seat=1, points_to_win=50, seed=0)
+    obs, mask = env.reset()
+    assert mask.any(axis=1).all()
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        actions = np.array([rng.choice(np.flatnonzero(row)) for row in mask])
+        obs, mask, reward, done = env.step(actions)
+        assert mask.any(axis=1).all()
@@ -0,0 +1,98 @@
+import random
+from functools import partial
+
+from pytest import raises
+
+from farkle import RandomFarklePlayer
+from farkle.evaluation import (
+    League, common_random_games, paired_difference, play_pair, sprt,
+)
+from farkle.gameplay import FarklePlayer
+
+
+class Banker(FarklePlayer):
+    """Scores the most it can and stops at 300 points"""
+    name = "banker"
+
+    def act(self, state, choices):
+        names = [a.name for a in choices]
+        if "stop" in names and state.turn_sum >= 300:
+            return choices[names.index("stop")]
+        scoring = [a for a in choices if a.used]
+        if scoring and state.can_roll == 0:
+            return max(scoring, key=lambda a: a.value)
+        return choices[names.index("roll")] if "roll" in names else choices[0]
+
+
+def test_play_pair_swaps_seats():
+    # identical players win from the same seat, as the dice are the same
+    assert play_pair(Banker, Banker, seed=1, points_to_win=2000) == (1.0, 0.0)
+    random_player = partial(RandomFarklePlayer, 0)
+    pair = play_pair(Banker, random_player, seed=1, points_to_win=2000)
+    assert set(pair) <= {0.0, 0.5, 1.0}
+    assert play_pair(Banker, random_player, seed=1, points_to_win=2000) == pair
+
+
+def test_common_random_games():
+    random.seed(0)
+    configurations = [[Banker, Banker], [Banker, Banker], [Banker, RandomFarklePlayer]]
+    same, again, weaker = common_random_games(configurations, 40, seed=3, points_to_win=2000)
+    assert len(same) == len(weaker) == 40
+    # the dice only depend on the game, the turn and the roll
+    assert same == again
+    assert paired_difference(same, again) == (0.0, 0.0)
+
+    diff, error = paired_difference(weaker, same)
+    assert diff > 2 * error > 0
+    with raises(ValueError):
+        paired_difference(same, weaker[:-1])
+
+
+def test_sprt():
+    random.seed(0)
+    better = sprt(Banker, RandomFarklePlayer, points_to_win=2000, seed=0)
+    assert better.decision == "H1"
+    assert better.n_games < 100
+    assert better.score > 0.75
+
+    same = sprt(Banker, Banker, p0=0.5, p1=0.6, points_to_win=2000, seed=0, max_games=2000)
+    assert same.decision == "H0"
+    assert abs(same.score - 0.5) < 0.05
+
+    with raises(ValueError):
+        sprt(Banker, Banker, p0=0.6, p1=0.5)
+
+
+def test_sprt_false_positive_rate():
+    # equal players should be declared better in no more than about alpha
+    # of the tests, even though the two games of a pair are correlated
+    random.seed(0)
+    results = [
+        sprt(RandomFarklePlayer, RandomFarklePlayer, p1=0.6, points_to_win=500, seed=i)
+        for i in range(200)
+    ]
+    assert all(r.decision is not None for r in results)
+    assert sum(r.decision == "H1" for r in results) / len(results) < 0.1
+
+
+def test_league():
+    random.seed(0)
+    league = League(
+        {"random": RandomFarklePlayer, "banker": Banker, "random2": RandomFarklePlayer},
+        points_to_win=2000, seed=0,
+    )
+    league.run(30)
+    assert league.standings()[0][0] == "banker"
+    assert sum(league.games.values()) == 60
+    # the two random players are evenly matched so they get the most games
+    assert max(league.games, key=league.games.get) == ("random", "random2")
+
+    # a pair can be named in either order
+    assert league.information("banker", "random") == league.information("random", "banker")
+    before = league.games["random", "banker"]
+    league.play("banker", "random")
+    assert league.games["random", "banker"] == before + 2
+    with raises(ValueError):
+        league.play("banker", "banker")
+    with raises(ValueError):
+        league.information("banker", "nobody")
@@ -1,5 +1,13 @@
-from farkle import Farkle, State, Action, Farkle, Dice
-from pytest import fixture
+import copy
+import pickle
+import random
+
+from farkle import (
+    Farkle, State, Action, Farkle, Dice, RandomFarklePlayer, RuleSet, ThresholdFarklePlayer,
+)
+from farkle.rng import DiceRNG
+from farkle.scoring import ROLL, STOP
+from pytest import fixture, raises
 
 
 @fixture
@@ -64,6 +72,35 @@ def is_same_state(s1, s2):
     return True
 
 
+class TestDice:
+    def test_flyweight(self):
+        assert Dice(3) is Dice(3)
+        assert Dice(3) == Dice(3)
+        assert Dice(3) != Dice(4)
+        assert Dice().value in range(1, 7)
+        assert copy.deepcopy(Dice(2)) is Dice(2)
+        assert pickle.loads(pickle.dumps(Dice(6))) is Dice(6)
+
+    def test_immutable(self):
+        with raises(AttributeError):
+            Dice(1).value = 2
+
+    def test_invalid(self):
+        for value in (0, 7, "1"):
+            with raises(ValueError):
+                Dice(value)
+
+    def test_roll(self):
+        rng = DiceRNG(0)
+        rolled = [Dice(1).roll(rng) for _ in range(100)]
+        assert all(d is Dice(d.value) for d in rolled)
+        assert Dice(1).value == 1
+
+    def test_rolled_dice_are_shared(self):
+        s = State(2).roll()
+        assert all(d is Dice(d.value) for d in s.rolled_dice)
+
+
 class TestState:
     def test_current_player(self):
         # two player game
@@ -189,7 +226,7 @@ class TestState:
 
     def test_enumerate_finds_three_singles(self):
         s = State(2)
-        s.can_rol = 0
+        s.can_roll = 0
 
         for num in range(1, 7):
             other = 2 if num != 2 else 3
@@ -245,3 +282,171 @@ class TestState:
         actions2 = s.enumerate_options()
         assert roll in actions2
         assert stop in actions2
+
+    def test_play_dice_not_rolled(self, two_player_scored_1):
+        with raises(ValueError):
+            two_player_scored_1.play_dice(Action({1: 1}, "1", 100))
+
+    def test_equality(self, two_player_scored_1):
+        s = State(2)
+        s.can_roll = 5
+        s.rolled_dice = [Dice(5), Dice(4), Dice(5), Dice(3), Dice(2)]
+        s.turn_sum = 100
+        assert s == two_player_scored_1
+        assert s.key() == two_player_scored_1.key()
+        assert s.turn_key() == ((0, 1, 1, 1, 2, 0), 5, 100)
+        assert s.dice_counts == (0, 1, 1, 1, 2, 0)
+
+        s.scores = {0: 100, 1: 0}
+        assert s.scores == (100, 0)
+        assert s != two_player_scored_1
+        assert s.key() != two_player_scored_1.key()
+        assert s.turn_key() == two_player_scored_1.turn_key()
+
+    def test_transitions_do_not_modify(self, two_player_just_rolled):
+        s = two_player_just_rolled
+        before = copy.copy(s)
+        s.play_dice(Action({5: 2}, "Two 5's", 100))
+        s.end_turn()
+        assert s == before
+
+    def test_min_opening_score(self):
+        rules = RuleSet(min_opening_score=500)
+        s = State(2, rules)
+        s.can_roll, s.rolled_dice, s.turn_sum = 5, [Dice(2)], 100
+        assert s.rules is rules
+        assert [a.name for a in s.enumerate_options()] == ["roll"]
+
+        s.turn_sum = 500
+        assert [a.name for a in s.enumerate_options()] == ["roll", "stop"]
+        s.turn_sum = 100
+        s.scores = (50, 0)
+        assert [a.name for a in s.enumerate_options()] == ["roll", "stop"]
+
+    def test_hot_dice_bonus(self, two_player_can_score_all):
+        s = State(2, RuleSet(hot_dice_bonus=250))
+        s.can_roll, s.rolled_dice, s.turn_sum = 5, [Dice(1)], 300
+        after = s.play_dice(Action({1: 1}, "1", 100))
+        assert after.can_roll == 6
+        assert after.turn_sum == 650
+        assert after.rules == s.rules
+
+        plain = two_player_can_score_all.play_dice(Action({1: 1}, "1", 100))
+        assert plain.turn_sum == 400
+        assert plain != after
+
+    def test_to_bytes(self, two_player_scored_1):
+        s = two_player_scored_1
+        s.scores = (2500, 12_000)
+        assert len(s.to_bytes()) == 35
+        assert State.from_bytes(s.to_bytes()) == s
+        assert pickle.loads(pickle.dumps(s)) == s
+
+        variant = State(3, RuleSet(three_pairs=750)).roll()
+        assert State.from_bytes(variant.to_bytes()) == variant
+        assert State.from_bytes(variant.to_bytes()).rules == variant.rules
+        # decoding does not compile the rules again
+        data = variant.to_bytes()
+        assert State.from_bytes(data).rules is State.from_bytes(data).rules
+        data = pickle.dumps(variant.rules)
+        assert pickle.loads(data) is pickle.loads(data)
+
+
+class TestFarkle:
+    def test_play_fast_matches_play(self):
+        for seed in range(5):
+            random.seed(seed)
+            slow = Farkle([RandomFarklePlayer() for _ in range(3)], points_to_win=2000)
+            winners = slow.play()
+
+            random.seed(seed)
+            fast = Farkle([RandomFarklePlayer() for _ in range(3)], points_to_win=2000)
+            assert fast.play_fast() == winners
+            assert fast.state == slow.state
+            assert len(fast.history) == 0
+
+    def test_rules(self):
+        rules = RuleSet(three_pairs=750, min_opening_score=350)
+        game = Farkle([RandomFarklePlayer(0), RandomFarklePlayer(1)], rng=0, rules=rules)
+        game.play()
+        assert game.state.rules is rules
+        for state, action in game.history:
+            assert state.rules is rules
+            if action.name == "Three pairs":
+                assert action.value == 750
+            if action.name == "stop" and state.scores[state.current_player] == 0:
+                assert state.turn_sum >= 350
+
+    def test_resume_from_bytes(self):
+        game = Farkle([RandomFarklePlayer(0), RandomFarklePlayer(1)], rng=2)
+        for _ in range(6):
+            game.step(ROLL)
+            game.player_turn()
+
+        resumed = pickle.loads(pickle.dumps(game))
+        assert resumed.state == game.state
+        assert resumed.history == game.history
+        assert resumed.rng == game.rng
+        assert resumed.play() == game.play()
+        assert resumed.history == game.history
+
+        players = [RandomFarklePlayer(0), RandomFarklePlayer(1)]
+        copy = Farkle.from_bytes(game.to_bytes(), players)
+        assert copy.players is players
+        assert copy.state == game.state and copy.rng == game.rng
+        with raises(ValueError):
+            Farkle.from_bytes(game.to_bytes(), players[:1])
+        with raises(ValueError):
+            Farkle.from_bytes(b"x" * 40, players)
+
+        data = game.to_bytes()
+        for cut in (4, 20, len(data) - 1):
+            with raises(ValueError):
+                Farkle.from_bytes(data[:cut], players)
+        data = game.state.to_bytes()
+        for cut in (0, 10, len(data) - 1):
+            with raises(ValueError):
+                State.from_bytes(data[:cut])
+        with raises(ValueError):
+            DiceRNG.from_bytes(game.rng.to_bytes()[:-1])
+
+    def test_combinations(self):
+        rules = RuleSet(combinations=True)
+        game = Farkle([RandomFarklePlayer(0), RandomFarklePlayer(1)], rng=0, rules=rules)
+        game.play()
+        assert any(" + " in action.name for _, action in game.history)
+        for state, action in game.history:
+            if action.used:
+                assert action in rules.options(state.dice_counts)
+
+
+class TestThresholdFarklePlayer:
+    def test_scores_the_most(self, two_player_just_rolled):
+        player = ThresholdFarklePlayer(0)
+        choices = two_player_just_rolled.enumerate_options()
+        action = player.act(two_player_just_rolled, choices)
+        assert action.value == max(a.value for a in choices)
+
+    def test_threshold_by_dice_left(self):
+        player = ThresholdFarklePlayer([100, 200, 300, 400, 500, 600])
+        s = State(2)
+        s.turn_sum = 350
+        s.can_roll = 3
+        assert player.act(s, s.enumerate_options()) == STOP
+        s.can_roll = 4
+        assert player.act(s, s.enumerate_options()) == ROLL
+        # stop is not offered before the opening score
+        s = State(2, RuleSet(min_opening_score=500))
+        s.turn_sum = 350
+        s.can_roll = 3
+        assert player.act(s, s.enumerate_options()) == ROLL
+
+        with raises(ValueError):
+            ThresholdFarklePlayer([300] * 5)
+
+    def test_plays_games(self):
+        game = Farkle([ThresholdFarklePlayer(300), RandomFarklePlayer(0)], 2000, rng=0)
+        game.play()
+        for state, action in game.history:
+            if state.current_player == 0 and action == STOP:
+                assert state.turn_sum >= 300
@@ -0,0 +1,34 @@
+from farkle import Farkle, RandomFarklePlayer
+from farkle.instrument import Instrumentation
+
+
+def test_counts_and_timers():
+    inst = Instrumentation()
+    steps = []
+    inst.on_step(lambda game, state, action, new_state: steps.append(action))
+
+    game = Farkle([RandomFarklePlayer(1), RandomFarklePlayer(2)], rng=3, instrumentation=inst)
+    game.play()
+
+    assert sum(inst.counts.values()) == len(steps) == len(game._history)
+    assert inst.counts["roll"] > 0
+    assert inst.counts["score"] > 0
+    turns = inst.counts["stop"] + inst.counts["bankrupt"]
+    assert turns == game.state.current_round
+    assert inst.act_time > 0
+    assert inst.options_time > 0
+    assert inst.transition_time > 0
+
+    inst.reset()
+    assert sum(inst.counts.values()) == 0
+    assert len(inst.callbacks) == 1
+
+
+def test_same_game_with_and_without():
+    plain = Farkle([RandomFarklePlayer(1), RandomFarklePlayer(2)], rng=3)
+    plain.play()
+    timed = Farkle(
+        [RandomFarklePlayer(1), RandomFarklePlayer(2)], rng=3, instrumentation=Instrumentation()
+    )
+    timed.play()
+    assert plain.state == timed.state
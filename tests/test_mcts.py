@@ -0,0 +1,87 @@
+from farkle import Action, Dice, Farkle, RandomFarklePlayer, RuleSet, State
+from farkle.mcts import MCTSFarklePlayer
+from pytest import raises
+
+
+def _state(faces, can_roll, turn_sum, rules=None):
+    s = State(2, rules)
+    s.rolled_dice = [Dice(f) for f in faces]
+    s.can_roll = can_roll
+    s.turn_sum = turn_sum
+    return s
+
+
+def test_stops_with_a_big_turn_sum():
+    player = MCTSFarklePlayer(iterations=2_000, rng=0)
+    s = _state([3], can_roll=1, turn_sum=3000)
+    choices = s.enumerate_options()
+    assert player.act(s, choices) == Action({}, "stop", 0)
+
+
+def test_rolls_with_nothing_at_stake():
+    player = MCTSFarklePlayer(iterations=2_000, rng=0)
+    s = _state([], can_roll=6, turn_sum=50)
+    assert player.act(s, s.enumerate_options()) == Action({}, "roll", 0)
+
+
+def test_prefers_the_straight():
+    player = MCTSFarklePlayer(iterations=2_000, rng=0)
+    s = _state([1, 2, 3, 4, 5, 6], can_roll=0, turn_sum=0)
+    action = player.act(s, s.enumerate_options())
+    assert action.name == "1-2-3-4-5-6"
+
+
+def test_tree_is_reused():
+    player = MCTSFarklePlayer(iterations=200, rng=1)
+    s = _state([1, 5, 2], can_roll=3, turn_sum=300)
+    player.act(s, s.enumerate_options())
+    visits = player.table[s.turn_key()].visits
+    player.act(s, s.enumerate_options())
+    assert player.table[s.turn_key()].visits == visits + 200
+
+
+def test_time_limit():
+    player = MCTSFarklePlayer(iterations=None, time_limit=0.01, rng=2)
+    s = State(2).roll(player.rng)
+    choices = s.enumerate_options()
+    if choices:
+        assert player.act(s, choices) in choices
+    with raises(ValueError):
+        MCTSFarklePlayer(iterations=None)
+
+
+def test_beats_random():
+    wins = 0
+    for seed in range(10):
+        game = Farkle(
+            [MCTSFarklePlayer(iterations=100, rng=seed), RandomFarklePlayer(seed)],
+            points_to_win=2000,
+            rng=seed,
+        )
+        game.play_fast()
+        wins += game.state.scores[0] > game.state.scores[1]
+    assert wins >= 8
+
+
+def test_rule_variants():
+    for rules in (
+            RuleSet(combinations=True),
+            RuleSet(three_pairs=750, hot_dice_bonus=500),
+            RuleSet(min_opening_score=1000),
+    ):
+        for seed in range(3):
+            game = Farkle(
+                [MCTSFarklePlayer(iterations=50, rng=seed), RandomFarklePlayer(seed)],
+                points_to_win=2000,
+                rng=seed,
+                rules=rules,
+            )
+            game.play()
+            assert all(a in rules.actions for _, a in game.history)
+
+
+def test_plays_the_opening_score():
+    player = MCTSFarklePlayer(iterations=500, rng=3)
+    s = _state([], can_roll=6, turn_sum=3000, rules=RuleSet(min_opening_score=5000))
+    assert player.act(s, s.enumerate_options()) == Action({}, "roll", 0)
+    assert all(a != player.rules.action_index(Action({}, "stop", 0)) for a in player.search(s))
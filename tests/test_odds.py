@@ -0,0 +1,55 @@
+import os
+from fractions import Fraction
+
+from pytest import raises
+
+from farkle import odds
+from farkle.scoring import ACTIONS, Action, RuleSet
+
+
+def test_known_values(tmp_path):
+    table = odds.odds_table(str(tmp_path))
+    assert table[1].farkle == Fraction(2, 3)
+    assert table[2].farkle == Fraction(4, 9)
+    assert table[6].farkle == Fraction(5, 216)  # 0.02315
+    assert table[1].best_score == {0: Fraction(2, 3), 50: Fraction(1, 6), 100: Fraction(1, 6)}
+
+    for n, row in table.items():
+        assert sum(row.best_score.values()) == 1
+        assert row.best_score[0] == row.farkle
+        assert all(ACTIONS[i].value > 0 for i in row.action_probability)
+
+    straight = Action({i: 1 for i in range(1, 7)}, "1-2-3-4-5-6", 3000)
+    assert table[6].action_value(straight) == Fraction(720, 6 ** 6) * 3000
+    assert table[5].action_value(straight) == 0
+
+
+def test_best_score():
+    assert odds.best_score((2, 0, 0, 0, 1, 0)) == 250
+    assert odds.best_score((3, 0, 0, 0, 0, 0)) == 1000
+    assert odds.best_score((0, 2, 2, 0, 0, 2)) == 1500
+    assert odds.best_score((0, 2, 1, 1, 0, 2)) == 0
+
+
+def test_disk_cache(tmp_path):
+    computed = odds.odds_table(str(tmp_path))
+    files = os.listdir(tmp_path)
+    assert len(files) == 1 and files[0].endswith(".json")
+
+    odds.odds_table.cache_clear()
+    assert odds.odds_table(str(tmp_path)) == computed
+    assert odds.roll_odds(3, str(tmp_path)) == computed[3]
+    with raises(ValueError):
+        odds.roll_odds(0, str(tmp_path))
+
+
+def test_combinations(tmp_path):
+    rules = RuleSet(combinations=True)
+    table = odds.odds_table(str(tmp_path), rules)
+    default = odds.odds_table(str(tmp_path))
+    for n in range(1, 7):
+        # combining groups changes the actions, not what a roll is worth
+        assert table[n].best_score == default[n].best_score
+        assert table[n].farkle == default[n].farkle
+    assert table[2].action_value(Action({1: 1, 5: 1}, "1 + 5", 150)) == Fraction(2, 36) * 150
+    assert default[2].action_value(Action({1: 1, 5: 1}, "1 + 5", 150)) == 0
@@ -0,0 +1,88 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from pytest import importorskip, raises
+
+from farkle import Farkle, RandomFarklePlayer, RuleSet
+from farkle.scoring import ACTIONS
+
+np = importorskip("numpy")
+replay = importorskip("farkle.replay")
+
+
+def game(seed, **kwargs):
+    # a played game of seeded random players
+    out = Farkle([RandomFarklePlayer(seed), RandomFarklePlayer(seed + 1)], rng=seed, **kwargs)
+    out.play()
+    return out
+
+
+def fill(buffer, i):
+    played = game(i)
+    buffer.writer(i).add_game(played)
+    return len(played.history)
+
+
+def test_add_game():
+    played = game(1)
+    with replay.SharedReplayBuffer(1000) as buffer:
+        buffer.writer(0).add_game(played)
+        assert len(buffer) == len(played.history)
+
+        records = buffer.records[0, :len(buffer)]
+        steps = list(played.history)
+        for record, (state, action) in zip(records, steps):
+            assert replay.decode_state(record["state"]) == state
+            assert replay.decode_action(record) == action
+        assert replay.decode_state(records[-1]["next_state"]) == played.state
+        assert records["done"].sum() == 1 and records[-1]["done"]
+        assert records["reward"].sum() == sum(played.state.scores)
+
+        batch = buffer.sample(64, np.random.default_rng(0))
+        assert batch.dtype == buffer.dtype
+        assert (batch["action"] < len(ACTIONS)).all()
+
+
+def test_ring_wraps():
+    played = game(2)
+    with replay.SharedReplayBuffer(10) as buffer:
+        writer = buffer.writer(0)
+        writer.add_game(played)
+        assert len(buffer) == 10
+        last = replay.decode_state(buffer.records[0, (len(played.history) - 1) % 10]["next_state"])
+        assert last == played.state
+        with raises(ValueError):
+            buffer.writer(1)
+
+
+def test_rule_variants():
+    rules = RuleSet(three_pairs=750, combinations=True)
+    played = game(3, rules=rules)
+    default = game(3)
+    with replay.SharedReplayBuffer(1000, rules=rules) as buffer:
+        with raises(ValueError):
+            buffer.writer(0).add_game(default)
+        assert len(buffer) == 0
+
+        buffer.writer(0).add_game(played)
+        attached = replay.SharedReplayBuffer.attach(buffer.name)
+        assert attached.rules == rules
+        records = attached.records[0, :len(buffer)]
+        for record, (state, action) in zip(records, played.history):
+            assert replay.decode_state(record["state"], attached.rules) == state
+            assert replay.decode_action(record, attached.rules) == action
+        attached.close()
+
+    with replay.SharedReplayBuffer(10) as buffer:
+        with raises(ValueError):
+            buffer.writer(0).add_game(played)
+        assert len(buffer) == 0
+
+
+def test_workers():
+    with replay.SharedReplayBuffer(1000, n_writers=3) as buffer:
+        with ProcessPoolExecutor(3) as pool:
+            lengths = list(pool.map(fill, [buffer] * 3, range(3)))
+
+        assert buffer.sizes().tolist() == lengths
+        batch = buffer.sample(500, np.random.default_rng(0))
+        assert len(np.unique(batch["state"]["scores"], axis=0)) > 1
@@ -0,0 +1,71 @@
+import os
+
+from pytest import importorskip, mark, raises
+
+from farkle import Farkle, RandomFarklePlayer
+from farkle.results import ResultWriter, read_chunks, read_records, stream_results
+
+
+def games(n):
+    for seed in range(n):
+        yield Farkle([RandomFarklePlayer(seed), RandomFarklePlayer(seed + 1)], rng=seed)
+
+
+def test_stream_results():
+    records = list(stream_results(games(3), steps=True))
+    game_records = [r for table, r in records if table == "games"]
+    assert [r["game"] for r in game_records] == [0, 1, 2]
+    assert records[-1][0] == "games"
+
+    game = next(games(1))
+    winners = game.play()
+    first = game_records[0]
+    assert [first["won_0"], first["won_1"]] == [int(winners[0]), int(winners[1])]
+    assert (first["score_0"], first["score_1"]) == game.state.scores
+    assert first["rounds"] == game.state.current_round
+    steps = [r for table, r in records if table == "steps" and r["game"] == 0]
+    assert len(steps) == first["steps"] == len(game.history)
+    assert [s["turn_sum"] for s in steps] == [s.turn_sum for s, _ in game.history]
+
+
+@mark.parametrize("format", ["csv", "npz", "parquet"])
+def test_write_and_read(tmp_path, format):
+    if format == "npz":
+        importorskip("numpy")
+    if format == "parquet":
+        importorskip("pyarrow")
+
+    records = list(stream_results(games(20), steps=True))
+    directory = str(tmp_path)
+    with ResultWriter(directory, format, chunk_size=7) as writer:
+        writer.write_all(iter(records))
+
+    assert len([f for f in os.listdir(directory) if f.startswith("games-")]) == 3
+    assert list(read_records(directory, "games")) == [r for t, r in records if t == "games"]
+    steps = [r for t, r in records if t == "steps"]
+    assert list(read_records(directory, "steps", format)) == steps
+    assert sum(len(c["game"]) for c in read_chunks(directory, "games")) == 20
+
+
+def test_mismatched_records(tmp_path):
+    with ResultWriter(str(tmp_path), chunk_size=2) as writer:
+        with raises(ValueError):
+            writer.write("games", {})
+        writer.write("games", {"game": 0, "score_0": 100, "score_1": 50})
+        # a three player game does not fit the two player table
+        with raises(ValueError):
+            writer.write("games", {"game": 1, "score_0": 0, "score_1": 0, "score_2": 0})
+        with raises(ValueError):
+            writer.write("games", {"game": 1, "score_0": 0})
+        writer.write("games", {"score_1": 0, "score_0": 0, "game": 1})
+        # nor after a chunk was written
+        with raises(ValueError):
+            writer.write("games", {"game": 2, "score_0": 0, "score_2": 0})
+    assert list(read_records(str(tmp_path), "games")) == [
+        {"game": 0, "score_0": 100, "score_1": 50}, {"game": 1, "score_0": 0, "score_1": 0},
+    ]
+
+
+def test_unknown_format(tmp_path):
+    with raises(ValueError):
+        ResultWriter(str(tmp_path), "xlsx")
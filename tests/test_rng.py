@@ -0,0 +1,118 @@
+import pickle
+import random
+
+from pytest import importorskip, raises
+
+from farkle import Farkle, RandomFarklePlayer, ThresholdFarklePlayer
+from farkle.rng import CommonDiceRNG, DiceRNG
+
+
+def test_reproducible():
+    a, b = DiceRNG(5), DiceRNG(5)
+    assert [a.roll_counts(6) for _ in range(2000)] == [b.roll_counts(6) for _ in range(2000)]
+    assert DiceRNG(5).faces(20) != DiceRNG(6).faces(20)
+
+
+def test_numpy_seeds():
+    np = importorskip("numpy")
+    rng = DiceRNG(np.int64(5), spawn_key=(np.uint8(1),))
+    assert rng.faces(100) == DiceRNG(5, spawn_key=(1,)).faces(100)
+    assert type(rng.seed) is int
+    assert DiceRNG.from_bytes(rng.to_bytes()) == rng
+    with raises(TypeError):
+        DiceRNG(5.0)
+
+
+def test_default_seed_follows_random():
+    random.seed(1)
+    a = DiceRNG()
+    random.seed(1)
+    assert DiceRNG().seed == a.seed
+
+
+def test_faces():
+    rng = DiceRNG(0)
+    faces = rng.faces(60_000)
+    assert set(faces) == {1, 2, 3, 4, 5, 6}
+    for face in range(1, 7):
+        assert abs(faces.count(face) / 60_000 - 1 / 6) < 0.01
+
+    counts = rng.roll_counts(4)
+    assert len(counts) == 6
+    assert sum(counts) == 4
+
+
+def test_spawn():
+    parent = DiceRNG(3)
+    first, second = parent.spawn(2)
+    assert first.spawn_key == (0,)
+    assert second.spawn_key == (1,)
+    assert parent.spawn()[0].spawn_key == (2,)
+    assert first.faces(20) != second.faces(20)
+    assert DiceRNG(3, spawn_key=(1,)).faces(20) == DiceRNG(3).spawn(2)[1].faces(20)
+
+
+def test_replay_game():
+    def play(seed):
+        game = Farkle([RandomFarklePlayer(seed), RandomFarklePlayer(seed + 1)], rng=seed)
+        game.play_fast()
+        return game.state
+
+    assert play(10) == play(10)
+    assert play(10) != play(11)
+
+
+def test_state_round_trip():
+    rng = DiceRNG(4)
+    rng.faces(7)
+    rng.randrange(10)
+    rng.spawn(2)
+
+    def from_bytes(r):
+        return DiceRNG.from_bytes(r.to_bytes())
+
+    def from_pickle(r):
+        return pickle.loads(pickle.dumps(r))
+
+    for restore in (from_bytes, from_pickle):
+        copy = restore(rng)
+        assert copy == rng
+        assert copy.faces(5000) == rng.faces(5000)
+        assert copy.randrange(100) == rng.randrange(100)
+        assert copy.spawn()[0].spawn_key == rng.spawn()[0].spawn_key
+
+
+def test_common_dice_keyed_by_turn_and_roll():
+    a, b = CommonDiceRNG(4, spawn_key=(0,)), CommonDiceRNG(4, spawn_key=(0,))
+    # the second roll of a turn does not depend on how many dice were rolled first
+    a.roll_counts(6, turn=0)
+    b.roll_counts(1, turn=0)
+    assert a.roll_counts(3, turn=0) == b.roll_counts(3, turn=0)
+    # nor does a turn depend on the rolls or turns before it
+    a.roll_counts(6, turn=0)
+    assert [a.roll_counts(6, turn=2) for _ in range(20)] == [
+        b.roll_counts(6, turn=2) for _ in range(20)
+    ]
+    assert a.roll_counts(6) == b.roll_counts(6)
+    with raises(ValueError):
+        a.roll_counts(6, turn=1)
+
+    assert CommonDiceRNG(4, spawn_key=(1,)).faces(6) != CommonDiceRNG(4, spawn_key=(0,)).faces(6)
+    assert all(isinstance(child, CommonDiceRNG) for child in a.spawn(2))
+
+    restored = DiceRNG.from_bytes(a.to_bytes())
+    assert isinstance(restored, CommonDiceRNG)
+    assert restored == a
+    assert restored.roll_counts(6, turn=3) == a.roll_counts(6, turn=3)
+    assert pickle.loads(pickle.dumps(a)) == a
+
+
+def test_common_dice_restart_with_the_game():
+    game = Farkle([ThresholdFarklePlayer(300), ThresholdFarklePlayer(500)], rng=CommonDiceRNG(6))
+    game.play()
+    first = game.state
+    game.reset()
+    game.play()
+    assert game.state == first
+    with raises(ValueError):
+        game.rng.roll_counts(6, turn=1)
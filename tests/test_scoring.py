@@ -0,0 +1,120 @@
+import pickle
+
+from farkle import Action, RuleSet, scoring_options
+from farkle.scoring import (
+    ACTIONS, DEFAULT_RULES, action_index, all_dice_counts, dice_to_roll, play_counts,
+    remove_used,
+)
+from pytest import raises
+
+
+def test_all_dice_counts():
+    counts = list(all_dice_counts())
+    assert len(counts) == 924
+    assert len(set(counts)) == 924
+    assert all(sum(c) <= 6 for c in counts)
+
+
+def test_scoring_options_accepts_sequences():
+    want = (Action({1: 1}, "1", 100), Action({5: 1}, "5", 50))
+    assert scoring_options([1, 0, 0, 0, 1, 0]) == want
+    assert scoring_options((1, 0, 0, 0, 1, 0)) == want
+
+
+def test_scoring_options_is_shared():
+    assert scoring_options([0, 2, 2, 2, 0, 0]) is scoring_options((0, 2, 2, 2, 0, 0))
+
+
+def test_scoring_options_no_score():
+    assert scoring_options([0, 2, 1, 1, 0, 2]) == ()
+    assert scoring_options([0] * 6) == ()
+
+
+def test_scoring_options_straight():
+    actions = scoring_options([1] * 6)
+    assert Action({i: 1 for i in range(1, 7)}, "1-2-3-4-5-6", 3000) in actions
+
+
+def test_scoring_options_invalid():
+    with raises(ValueError):
+        scoring_options([7, 0, 0, 0, 0, 0])
+    with raises(ValueError):
+        scoring_options([1, 1, 1])
+
+
+def test_rule_set():
+    rules = RuleSet(three_pairs=750, four_of_a_kind=0, straight=2500)
+    assert rules.options([0, 2, 2, 2, 0, 0]) == (Action({2: 2, 3: 2, 4: 2}, "Three pairs", 750),)
+    assert all(a.name != "Four 2's" for a in rules.options([0, 4, 0, 0, 0, 0]))
+    # turned off combinations keep their index but are worth nothing
+    assert all(a.value == 0 for a in rules.actions if a.name.startswith("Four"))
+    assert all(a.value == 750 for a in rules.actions if a.name == "Three pairs")
+    assert rules.options([1] * 6)[-1].value == 2500
+    assert [action_index(a) for a in rules.actions] == list(range(len(ACTIONS)))
+
+    assert RuleSet().table == {c: scoring_options(c) for c in all_dice_counts()}
+    assert RuleSet() == DEFAULT_RULES
+    assert rules != DEFAULT_RULES
+    assert pickle.loads(pickle.dumps(rules)) == rules
+    assert pickle.loads(pickle.dumps(DEFAULT_RULES)) is DEFAULT_RULES
+    with raises(ValueError):
+        rules.options([1, 1, 1])
+
+    # the table is compiled from the rules, so they can not change afterwards
+    with raises(AttributeError):
+        rules.three_pairs = 1500
+    with raises(AttributeError):
+        rules.table = {}
+    with raises(AttributeError):
+        del rules.straight
+    assert rules.params()["three_pairs"] == 750
+
+
+def test_combinations():
+    rules = RuleSet(combinations=True)
+    options = rules.options([3, 2, 0, 0, 1, 0])
+    assert Action({1: 3, 5: 1}, "Three 1's + 5", 1050) in options
+    assert Action({1: 2, 5: 1}, "1 + 1 + 5", 250) in options
+    # the best split of the three 1's is kept, not 1 + 1 + 1
+    assert Action({1: 3}, "Three 1's", 1000) in options
+    assert all(a.name != "1 + 1 + 1" for a in options)
+    assert rules.options([0, 3, 0, 0, 0, 0]) == (Action({2: 3}, "Three 2's", 200),)
+    assert rules.options([0, 2, 1, 1, 0, 2]) == ()
+
+    for counts, options in rules.table.items():
+        kept = [tuple(a.used.get(i, 0) for i in range(1, 7)) for a in options]
+        assert len(set(kept)) == len(kept)
+        assert all(k <= c for used in kept for k, c in zip(used, counts))
+        if options:
+            best = max(a.value for a in options)
+            assert best >= max(a.value for a in scoring_options(counts))
+
+    assert [action_index(a) for a in rules.actions[:len(ACTIONS)]] == list(range(len(ACTIONS)))
+    assert rules.action_index(Action({1: 3, 5: 1}, "Three 1's + 5", 1050)) >= len(ACTIONS)
+
+
+def test_remove_used():
+    three_ones = Action({1: 3}, "Three 1s", 1000)
+    assert remove_used((3, 0, 1, 0, 2, 0), three_ones) == (0, 0, 1, 0, 2, 0)
+    assert remove_used([3, 0, 0, 0, 0, 0], three_ones) == (0,) * 6
+    assert dice_to_roll((0,) * 6) == 6
+    assert dice_to_roll((0, 0, 1, 0, 2, 0)) == 3
+    with raises(ValueError):
+        remove_used((2, 0, 0, 0, 0, 0), three_ones)
+
+
+def test_play_counts():
+    three_ones = Action({1: 3}, "Three 1s", 1000)
+    rules = RuleSet(hot_dice_bonus=500)
+    assert play_counts((3, 0, 1, 0, 0, 0), 50, three_ones, rules) == ((0, 0, 1, 0, 0, 0), 1, 1050)
+    assert play_counts((3, 0, 0, 0, 0, 0), 50, three_ones, rules) == ((0,) * 6, 6, 1550)
+    assert play_counts((3, 0, 0, 0, 0, 0), 50, three_ones, DEFAULT_RULES)[2] == 1050
+
+
+def test_actions_are_read_only():
+    action = scoring_options([1, 0, 0, 0, 0, 0])[0]
+    with raises(TypeError):
+        action.used[1] = 2
+    assert scoring_options([1, 0, 0, 0, 0, 0])[0].used == {1: 1}
+    assert pickle.loads(pickle.dumps(action)) == action
+    assert action._replace(value=0).used == {1: 1}
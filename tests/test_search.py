@@ -0,0 +1,49 @@
+import random
+
+from pytest import raises
+
+from farkle import Action, Farkle, RandomFarklePlayer, RuleSet, State
+from farkle.search import SearchState
+from farkle.scoring import ROLL
+
+
+def test_apply_matches_game():
+    rules = RuleSet(hot_dice_bonus=300, min_opening_score=400)
+    game = Farkle([RandomFarklePlayer(0), RandomFarklePlayer(1)], rng=0, rules=rules)
+    game.play()
+    steps = list(game.history) + [(game.state, None)]
+
+    search = SearchState(2, rules)
+    for (state, action), (after, _) in zip(steps, steps[1:]):
+        assert search.to_state() == state
+        assert search.options() == state.enumerate_options()
+        # the rolls of the game are replayed as outcomes
+        search.apply(action, after.dice_counts if action == ROLL else None)
+    assert search.to_state() == game.state
+    assert search.depth == len(game.history)
+
+    for state, action in reversed(steps[:-1]):
+        assert search.undo() == action
+        assert search.to_state() == state
+    assert search.depth == 0
+
+
+def test_random_walk_and_rewind():
+    rng = random.Random(1)
+    search = SearchState.from_state(State(3), rng=2)
+    start = search.to_state()
+    for _ in range(500):
+        options = search.options() or [Action({}, "bankrupt", 0)]
+        search.apply(rng.choice(options))
+    assert search.current_round > 0
+    while search.depth:
+        search.undo()
+    assert search.to_state() == start
+
+
+def test_illegal_play():
+    search = SearchState(2, rng=0)
+    search.apply(ROLL, (0, 2, 2, 2, 0, 0))
+    with raises(ValueError):
+        search.apply(Action({1: 1}, "1", 100))
+    assert search.depth == 1
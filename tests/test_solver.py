@@ -0,0 +1,99 @@
+import os
+import random
+
+from farkle import Farkle, RandomFarklePlayer, RuleSet, solver
+from farkle.solver import OptimalFarklePlayer, TurnPolicy, default_policy, solve
+from pytest import fixture, raises
+
+
+@fixture(scope="module")
+def policy():
+    return solve(max_turn_sum=3000)
+
+
+def test_solve_converges(policy):
+    assert policy.report.converged
+    assert policy.report.residuals[-1] == 0
+    assert 500 < policy.turn_value < 700
+
+
+class CheckedPlayer(OptimalFarklePlayer):
+    def act(self, state, choices):
+        action = super().act(state, choices)
+        assert action in choices
+        return action
+
+
+def test_best_action_is_legal(policy):
+    random.seed(0)
+    for _ in range(20):
+        Farkle([CheckedPlayer(policy), CheckedPlayer(policy)], points_to_win=5000).play()
+
+
+def test_rule_variants():
+    for rules in (RuleSet(min_opening_score=1000), RuleSet(three_pairs=0)):
+        policy = solve(max_turn_sum=3000, rules=rules)
+        assert policy.rules == rules
+        for seed in range(5):
+            game = Farkle(
+                [CheckedPlayer(policy), RandomFarklePlayer(seed)], 3000, rng=seed, rules=rules
+            )
+            game.play()
+            assert all(a.name != "Three pairs" or rules.three_pairs for _, a in game.history)
+
+    with raises(ValueError):
+        OptimalFarklePlayer(policy, rules=RuleSet())
+    with raises(ValueError):
+        Farkle([OptimalFarklePlayer(policy), RandomFarklePlayer(0)], rng=0).play()
+
+
+def test_save_load(policy, tmp_path):
+    path = tmp_path / "policy.pkl"
+    policy.save(path)
+    loaded = TurnPolicy.load(path)
+    assert loaded.turn_value == policy.turn_value
+    assert loaded.actions == policy.actions
+    assert loaded.rules == policy.rules
+    assert loaded.values == policy.values
+    assert loaded.report == policy.report
+
+    data = policy.to_bytes()
+    for bad in (data[:-1], data[:5], b"not a policy"):
+        with raises(ValueError):
+            TurnPolicy.from_bytes(bad)
+
+
+def test_disk_cache(policy, tmp_path, monkeypatch):
+    solved = []
+
+    def small_solve(rules):
+        solved.append(rules)
+        return solve(max_turn_sum=3000, rules=rules)
+
+    monkeypatch.setattr(solver, "solve", small_solve)
+    rules = RuleSet(hot_dice_bonus=500)
+    for _ in range(2):
+        default_policy.cache_clear()
+        assert default_policy(cache_dir=str(tmp_path)).actions == policy.actions
+        assert default_policy(rules, str(tmp_path)).rules == rules
+    assert solved == [RuleSet(), rules]
+    assert len(os.listdir(tmp_path)) == 2
+
+    # a damaged file is solved again
+    for name in os.listdir(tmp_path):
+        with open(tmp_path / name, "wb") as f:
+            f.write(b"\x80\x04junk")
+    default_policy.cache_clear()
+    assert default_policy(cache_dir=str(tmp_path)).actions == policy.actions
+    assert len(solved) == 3
+    default_policy.cache_clear()
+
+
+def test_beats_random(policy):
+    random.seed(1)
+    wins = 0
+    for _ in range(50):
+        game = Farkle([OptimalFarklePlayer(policy), RandomFarklePlayer()], points_to_win=2000)
+        winners = game.play()
+        wins += winners[0] and game.state.scores[0] >= game.state.scores[1]
+    assert wins > 40
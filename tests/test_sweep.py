@@ -0,0 +1,45 @@
+from pytest import importorskip, raises
+
+from farkle import ThresholdFarklePlayer
+
+np = importorskip("numpy")
+sweep = importorskip("farkle.sweep")
+
+
+def test_threshold_grid():
+    grid = sweep.threshold_grid([300, 300, [200, 300, 400], 300, [250, 350], 300])
+    assert grid.shape == (6, 6)
+    assert grid[1].tolist() == [300, 300, 200, 300, 350, 300]
+    assert set(grid[:, 2]) == {200, 300, 400}
+    with raises(ValueError):
+        sweep.threshold_grid([300] * 5)
+
+    # numpy integers are single thresholds too
+    grid = sweep.threshold_grid([np.int64(300)] * 5 + [np.arange(200, 500, 100)])
+    assert grid[:, 5].tolist() == [200, 300, 400]
+
+
+def test_threshold_player_from_grid():
+    grid = sweep.threshold_grid([300] * 6)
+    assert ThresholdFarklePlayer(grid[0, 0]).thresholds == (300,) * 6
+    assert ThresholdFarklePlayer(grid[0]).thresholds == (300,) * 6
+
+
+def test_sweep_thresholds():
+    grid = [[300] * 6, [10_000] * 6]
+    result = sweep.sweep_thresholds(grid, 400, points_to_win=2000, seed=0)
+    assert result.win_rate.shape == result.mean_score.shape == (2,)
+    # the same thresholds as the opponent win about half the games
+    assert abs(result.win_rate[0] - 0.5) < 4 * result.win_std_error[0]
+    # never banking never scores
+    assert result.win_rate[1] == result.mean_score[1] == 0
+
+    # the dice are keyed by game, so chunking and workers change nothing
+    chunked = sweep.sweep_thresholds(
+        grid, 400, points_to_win=2000, seed=0, batch_size=100, n_workers=2
+    )
+    assert (chunked.win_rate == result.win_rate).all()
+    assert (chunked.mean_score == result.mean_score).all()
+
+    with raises(ValueError):
+        sweep.sweep_thresholds(grid, 1, seed=0)
@@ -0,0 +1,82 @@
+import os
+import pickle
+import random
+
+from pytest import raises
+
+from farkle import RandomFarklePlayer, ThresholdFarklePlayer
+from farkle.tournament import run_tournament
+
+
+def test_run_tournament():
+    result = run_tournament(
+        [RandomFarklePlayer] * 3, 20, n_workers=2, points_to_win=1000, seed=1, chunk_size=6
+    )
+    assert result.n_games == 20
+    assert abs(sum(result.wins) - 20) < 1e-9
+    assert abs(sum(result.win_rates) - 1) < 1e-9
+    assert [len(s) for s in result.scores] == [20, 20, 20]
+    assert len(result.game_lengths) == 20
+    assert all(n % 3 == 0 for n in result.game_lengths)
+
+
+def test_run_tournament_reproducible():
+    kwargs = dict(points_to_win=1000, seed=3, chunk_size=4)
+    serial = run_tournament([RandomFarklePlayer] * 2, 10, n_workers=1, **kwargs)
+    parallel = run_tournament([RandomFarklePlayer] * 2, 10, n_workers=2, **kwargs)
+    assert serial == parallel
+
+
+def test_run_tournament_leaves_random_alone():
+    random.seed(7)
+    run_tournament([RandomFarklePlayer] * 2, 4, n_workers=1, points_to_win=500, seed=0)
+    after = random.random()
+    random.seed(7)
+    assert random.random() == after
+
+    with raises(ValueError):
+        run_tournament([RandomFarklePlayer] * 2, 0, n_workers=1)
+
+
+class ThresholdPlayer(ThresholdFarklePlayer):
+    def __init__(self):
+        super().__init__(500)
+
+
+def test_checkpoint_resume(tmp_path):
+    path = str(tmp_path / "run.ckpt")
+    kwargs = dict(points_to_win=1000, chunk_size=4, checkpoint=path)
+    full = run_tournament([RandomFarklePlayer] * 2, 10, n_workers=2, seed=5, **kwargs)
+    assert full == run_tournament(
+        [RandomFarklePlayer] * 2, 10, n_workers=1, points_to_win=1000, seed=5, chunk_size=4
+    )
+
+    # keep the settings and the first chunk, then cut into the second
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        pickle.load(f)
+        pickle.load(f)
+        keep = f.tell() + 10
+    os.truncate(path, keep)
+    assert keep < size
+
+    resumed = run_tournament([RandomFarklePlayer] * 2, 10, n_workers=1, **kwargs)
+    assert resumed == full
+    assert run_tournament([RandomFarklePlayer] * 2, 10, **kwargs) == full
+
+    # a mismatched checkpoint is left as it is
+    size = os.path.getsize(path)
+    os.truncate(path, size - 3)
+    with raises(ValueError):
+        run_tournament([RandomFarklePlayer] * 2, 12, **kwargs)
+    assert os.path.getsize(path) == size - 3
+
+    # so is a checkpoint of other players
+    with raises(ValueError):
+        run_tournament([RandomFarklePlayer, ThresholdPlayer], 10, **kwargs)
+    assert os.path.getsize(path) == size - 3
+
+    # a run killed while writing the settings starts over
+    for partial in (0, 5):
+        os.truncate(path, partial)
+        assert run_tournament([RandomFarklePlayer] * 2, 10, seed=5, **kwargs) == full
@@ -0,0 +1,84 @@
+import pytest
+
+from farkle import Action, Farkle, RandomFarklePlayer, RuleSet, State
+from farkle import trajectory
+from farkle.instrument import Instrumentation
+from farkle.scoring import ROLL, STOP
+from farkle.trajectory import Trajectory
+
+
+def played_game(seed):
+    # the game and every (state, action) pair it went through
+    inst = Instrumentation()
+    steps = []
+    inst.on_step(lambda game, state, action, new_state: steps.append((state, action)))
+    game = Farkle(
+        [RandomFarklePlayer(seed), RandomFarklePlayer(seed + 1)],
+        rng=seed,
+        instrumentation=inst,
+    )
+    game.play()
+    return game, steps
+
+
+def test_history_matches_steps():
+    game, steps = played_game(1)
+    assert len(game.history) == len(steps)
+    assert list(game.history) == steps
+    assert game.history.nbytes == 13 * len(steps)
+
+
+def test_random_access(monkeypatch):
+    monkeypatch.setattr(trajectory, "_CHECKPOINT_EVERY", 7)
+    game, steps = played_game(2)
+    history = game.history
+    for i in [0, 6, 7, 50, 13, len(steps) - 1, 8]:
+        assert history[i] == steps[i]
+    assert history[-1] == steps[-1]
+    with pytest.raises(IndexError):
+        history[len(steps)]
+
+
+def test_dump_and_load(tmp_path):
+    games = [played_game(seed)[0] for seed in range(3)]
+    path = str(tmp_path / "games.fktr")
+    with open(path, "wb") as f:
+        for game in games:
+            game.history.dump(f)
+
+    for use_mmap in (True, False):
+        loaded = list(Trajectory.load_all(path, use_mmap=use_mmap))
+        assert loaded == [game.history for game in games]
+        assert Trajectory.load(path, use_mmap=use_mmap)[5] == games[0].history[5]
+
+    with pytest.raises(TypeError):
+        loaded[0].append(State(2), ROLL)
+
+
+def test_actions_outside_the_catalogue(tmp_path):
+    custom = Action({5: 2}, "double five", 150)
+    history = Trajectory(2)
+    state = State(2)
+    history.append(state, ROLL)
+    state = state.roll()
+    history.append(state, custom)
+    history.append(state, STOP)
+
+    path = str(tmp_path / "custom.fktr")
+    history.dump(path)
+    loaded = Trajectory.load(path)
+    assert [action for _, action in loaded] == [ROLL, custom, STOP]
+    assert loaded == history
+
+
+def test_rules(tmp_path):
+    rules = RuleSet(three_pairs=750, hot_dice_bonus=500)
+    game = Farkle([RandomFarklePlayer(0), RandomFarklePlayer(1)], rng=0, rules=rules)
+    game.play()
+
+    path = str(tmp_path / "variant.fktr")
+    game.history.dump(path)
+    loaded = Trajectory.load(path)
+    assert loaded.rules == rules
+    assert loaded == game.history
+    assert loaded[0][0].rules == rules